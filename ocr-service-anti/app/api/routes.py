@@ -3,20 +3,28 @@ API Routes for OCR Service
 
 Endpoints:
 - POST /ocr - Process prescription image
+- POST /ocr/jobs - Queue a prescription image, returns a job id at once
+- GET /ocr/jobs/{job_id} - Job status, stage progress and result
 - POST /ocr/analyze - Quality analysis only
 - GET /health - Health check
 - GET /info - Service info
 """
 
+import asyncio
+import shutil
+from datetime import datetime
 from typing import Optional
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends
+from fastapi import APIRouter, File, UploadFile, Form, Header, HTTPException, Depends
 from fastapi.responses import JSONResponse
 
-from app.core.pipeline import OCRPipeline
-from app.core.exceptions import OCRServiceError
+from app.core.pipeline import OCRPipeline, PIPELINE_STAGES
+from app.core.exceptions import OCRServiceError, JobNotFoundError
 from app.core.logging import get_logger, set_request_id
 from app.core.config import settings
-from app.schemas.responses import OCRResponse, QualityMetrics, HealthResponse, ErrorResponse
+from app.intake.upload import spool_upload
+from app.jobs import JobManager, Job
+from app.jobs.store import SUCCEEDED
+from app.schemas.responses import OCRResponse, QualityMetrics, HealthResponse, ErrorResponse, JobResponse
 from app.schemas.requests import OCRRequest
 
 logger = get_logger(__name__)
@@ -35,6 +43,50 @@ def get_pipeline() -> OCRPipeline:
     return _pipeline
 
 
+# Job manager instance (singleton)
+_job_manager: Optional[JobManager] = None
+
+
+async def get_job_manager() -> JobManager:
+    """Get or create the job manager (its workers start with the app)."""
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = JobManager(get_pipeline())
+    return _job_manager
+
+
+async def start_job_manager() -> JobManager:
+    """Create the job manager and start its workers, resuming unfinished jobs (app startup)."""
+    manager = await get_job_manager()
+    manager.start()
+    return manager
+
+
+async def stop_job_manager() -> None:
+    """Stop the job workers (app shutdown); jobs cut short resume on the next start."""
+    global _job_manager
+    if _job_manager is not None:
+        await _job_manager.stop()
+        _job_manager = None
+
+
+def _job_response(job: Job) -> JobResponse:
+    """Convert a stored job to its API response."""
+    done = sum(1 for stage in PIPELINE_STAGES if stage in job.stage_times)
+    return JobResponse(
+        job_id=job.job_id,
+        status=job.status,
+        filename=job.filename,
+        stage_times=job.stage_times,
+        progress=1.0 if job.status == SUCCEEDED else done / len(PIPELINE_STAGES),
+        created_at=datetime.fromtimestamp(job.created_at),
+        updated_at=datetime.fromtimestamp(job.updated_at),
+        expires_at=datetime.fromtimestamp(job.expires_at),
+        result=job.result,
+        error=job.error
+    )
+
+
 @router.post(
     "/ocr",
     response_model=OCRResponse,
@@ -51,6 +103,11 @@ async def process_ocr(
         default=False,
         description="Skip preprocessing if image is clean"
     ),
+    deadline_ms: Optional[float] = Form(
+        default=None,
+        gt=0,
+        description="Latency budget in ms; optional work that does not fit is downgraded or skipped (see meta.degradations)"
+    ),
     pipeline: OCRPipeline = Depends(get_pipeline)
 ):
     """
@@ -66,16 +123,15 @@ async def process_ocr(
     logger.info(f"OCR request received: {file.filename}")
     
     try:
-        # Read image bytes
-        image_bytes = await file.read()
-        
-        # Process through pipeline
-        result = await pipeline.process(
-            image_bytes=image_bytes,
-            filename=file.filename or "image.jpg",
-            languages=languages,
-            skip_enhancement=skip_enhancement
-        )
+        # Stream the upload to disk (size-limited) and process from there
+        async with spool_upload(file) as image_path:
+            result = await pipeline.process(
+                image_path=image_path,
+                filename=file.filename or "image.jpg",
+                languages=languages,
+                skip_enhancement=skip_enhancement,
+                deadline_ms=deadline_ms
+            )
         
         return result
         
@@ -96,6 +152,90 @@ async def process_ocr(
         )
 
 
+@router.post(
+    "/ocr/jobs",
+    response_model=JobResponse,
+    status_code=202,
+    summary="Queue prescription image",
+    description=(
+        "Upload a prescription image for background OCR. Returns a job id at once; "
+        "poll GET /ocr/jobs/{job_id}. Retries with the same Idempotency-Key header "
+        "return the existing job."
+    )
+)
+async def submit_ocr_job(
+    file: UploadFile = File(..., description="Prescription image file"),
+    languages: Optional[str] = Form(
+        default=None,
+        description="Override languages (e.g., 'eng+khm+fra')"
+    ),
+    skip_enhancement: bool = Form(
+        default=False,
+        description="Skip preprocessing if image is clean"
+    ),
+    idempotency_key: Optional[str] = Header(
+        default=None,
+        description="Client key; a retried upload with the same key attaches to the existing job"
+    ),
+    manager: JobManager = Depends(get_job_manager)
+):
+    """
+    Queue a prescription image for OCR and return its job.
+    """
+    logger.info(f"OCR job request received: {file.filename}")
+    
+    existing = manager.find(idempotency_key)
+    if existing is not None:
+        logger.info(f"Retried upload attaches to job {existing.job_id}")
+        return _job_response(existing)
+    
+    filename = file.filename or "image.jpg"
+    try:
+        # Full queue: reject before the upload takes disk space
+        manager.check_capacity()
+        async with spool_upload(file) as spooled:
+            upload_path = manager.upload_path(filename)
+            await asyncio.to_thread(shutil.move, spooled, upload_path)
+        
+        job, _ = manager.submit(
+            upload_path,
+            filename=filename,
+            languages=languages,
+            skip_enhancement=skip_enhancement,
+            idempotency_key=idempotency_key
+        )
+    except OCRServiceError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.to_dict()
+        )
+    
+    return _job_response(job)
+
+
+@router.get(
+    "/ocr/jobs/{job_id}",
+    response_model=JobResponse,
+    summary="Get OCR job",
+    description="Job status, per-stage progress, and the OCR result once it succeeded."
+)
+async def get_ocr_job(
+    job_id: str,
+    manager: JobManager = Depends(get_job_manager)
+):
+    """
+    Get the status, progress and result of an OCR job.
+    """
+    job = manager.get(job_id)
+    if job is None:
+        error = JobNotFoundError(
+            message=f"Job not found or expired: {job_id}",
+            details={"job_id": job_id}
+        )
+        raise HTTPException(status_code=error.status_code, detail=error.to_dict())
+    return _job_response(job)
+
+
 @router.post(
     "/ocr/analyze",
     response_model=QualityMetrics,
@@ -118,12 +258,11 @@ async def analyze_quality(
     logger.info(f"Quality analysis request: {file.filename}")
     
     try:
-        image_bytes = await file.read()
-        
-        result = await pipeline.analyze_quality_only(
-            image_bytes=image_bytes,
-            filename=file.filename or "image.jpg"
-        )
+        async with spool_upload(file) as image_path:
+            result = await pipeline.analyze_quality_only(
+                image_path=image_path,
+                filename=file.filename or "image.jpg"
+            )
         
         return result
         
@@ -156,7 +295,8 @@ async def health_check():
         languages = []
         
         try:
-            languages = pytesseract.get_languages()
+            # Subprocess call: keep it off the event loop
+            languages = await asyncio.to_thread(pytesseract.get_languages)
         except Exception:
             tesseract_available = False
         
@@ -192,6 +332,8 @@ async def service_info():
         "supported_formats": settings.supported_formats,
         "min_dpi": settings.min_dpi,
         "active_model": settings.active_model,
+        "pipelines": _pipeline.load() if _pipeline is not None else None,
+        "stage_cache": _pipeline.cache.stats() if _pipeline is not None and _pipeline.cache else None,
         "layers": [
             "1. Image Intake & Validation",
             "2. Quality Analysis",
@@ -13,6 +13,8 @@ This is what gets sent to the AI for enhancement.
 
 from typing import List, Dict, Any, Optional
 
+from pydantic import BaseModel
+
 from app.core.config import settings
 from app.core.logging import get_logger
 from app.schemas.responses import (
@@ -29,6 +31,7 @@ from app.schemas.responses import (
     TableBlock,
     TableCell,
 )
+from app.intake.validator import ImageValidator
 from app.postprocess.cleaner import TextCleaner
 from app.layout.detector import LayoutBlock
 
@@ -81,6 +84,11 @@ class JSONBuilder:
             raw_text=raw_text
         )
         
+        # Map coordinates from a reduced decode back to the original image
+        reduction = getattr(context, "decode_reduction", 1)
+        if reduction > 1:
+            self._scale_bboxes(response, reduction, set())
+        
         logger.info(
             f"Built response: {len(blocks)} blocks, "
             f"{sum(len(b.lines) for b in blocks)} lines"
@@ -94,20 +102,15 @@ class JSONBuilder:
         languages = settings.default_languages.split('+')
         
         # Get image size
-        image_size = {}
-        if context.pil_image:
-            image_size = {
-                "width": context.pil_image.size[0],
-                "height": context.pil_image.size[1]
-            }
-        elif context.cv_image is not None:
-            h, w = context.cv_image.shape[:2]
-            image_size = {"width": w, "height": h}
+        image_size = self._original_size(context)
         
         # Get DPI
-        dpi = None
-        if context.quality_metrics:
-            dpi = context.quality_metrics.get("dpi")
+        dpi = getattr(context, "dpi", None)
+        
+        # Latency budget, if the request had a deadline
+        budget = getattr(context, "budget", None)
+        deadline_ms = budget.deadline_ms if budget is not None else None
+        deadline_met = budget.remaining_ms() >= 0 if budget is not None else None
         
         return ProcessingMeta(
             languages=languages,
@@ -115,9 +118,46 @@ class JSONBuilder:
             processing_time_ms=context.total_time_ms,
             model_version=settings.active_model,
             stage_times=context.stage_times,
-            image_size=image_size
+            image_size=image_size,
+            decode_reduction=getattr(context, "decode_reduction", 1),
+            processing_path=getattr(context, "processing_path", "full"),
+            skipped_stages=getattr(context, "skipped_stages", []),
+            cached_stages=getattr(context, "cached_stages", []),
+            deadline_ms=deadline_ms,
+            deadline_met=deadline_met,
+            degradations=list(budget.degradations) if budget is not None else [],
+            ocr_calls=getattr(context, "ocr_calls", 0),
+            language_usage=getattr(context, "language_usage", {}),
+            block_times=getattr(context, "block_times", [])
+        )
+    
+    def _original_size(self, context) -> Dict[str, int]:
+        """Upright size of the uploaded image (read before the PIL header is freed)."""
+        image_size = getattr(context, "image_size", None)
+        if image_size:
+            return image_size
+        return ImageValidator.original_size(
+            getattr(context, "pil_image", None),
+            getattr(context, "cv_image", None),
+            getattr(context, "decode_reduction", 1)
         )
     
+    def _scale_bboxes(self, node: Any, factor: int, seen: set) -> None:
+        """Scale every bounding box in the response in place (each once)."""
+        if isinstance(node, BoundingBox):
+            if id(node) not in seen:
+                seen.add(id(node))
+                node.x *= factor
+                node.y *= factor
+                node.width *= factor
+                node.height *= factor
+        elif isinstance(node, BaseModel):
+            for name in type(node).model_fields:
+                self._scale_bboxes(getattr(node, name), factor, seen)
+        elif isinstance(node, (list, tuple)):
+            for item in node:
+                self._scale_bboxes(item, factor, seen)
+    
     def _build_quality(self, context) -> QualityMetrics:
         """Build quality metrics from analysis."""
         qm = context.quality_metrics or {}
@@ -132,7 +172,7 @@ class JSONBuilder:
             contrast=contrast_map.get(qm.get("contrast", "ok"), ContrastLevel.OK),
             contrast_score=qm.get("contrast_score", 0.0),
             skew_angle=qm.get("skew_angle", 0.0),
-            dpi=qm.get("dpi"),
+            dpi=getattr(context, "dpi", None),
             is_grayscale=qm.get("is_grayscale", False)
         )
     
@@ -164,12 +204,7 @@ class JSONBuilder:
         # Get cleaned results
         ocr_results = context.cleaned_results or context.ocr_results or []
         
-        for i, ocr_block in enumerate(ocr_results):
-            # Get corresponding layout block info
-            layout_block = None
-            if context.layout_blocks and i < len(context.layout_blocks):
-                layout_block = context.layout_blocks[i]
-            
+        for ocr_block in ocr_results:
             # Build text lines
             lines = []
             for line in ocr_block.lines:
@@ -190,14 +225,10 @@ class JSONBuilder:
                 )
                 lines.append(text_line)
             
-            # Determine block type
-            block_type = ocr_block.block_type
-            if layout_block:
-                block_type = layout_block.type
-            
-            # Build block
+            # Block type comes from its layout block (QR codes are not OCR'd,
+            # so layout_blocks and ocr_results are not index-aligned)
             block = Block(
-                type=block_type,
+                type=ocr_block.block_type,
                 bbox=BoundingBox(
                     x=ocr_block.x,
                     y=ocr_block.y,
@@ -0,0 +1,74 @@
+"""
+Per-request latency budget.
+
+A request may carry a deadline (deadline_ms). The budget tracks the time
+left and decides whether optional work still fits, leaving room for the
+OCR the pipeline has committed to; work that does not fit is downgraded
+or skipped and recorded as a degradation, so the response says what was
+traded for latency.
+
+Costs are estimates per megapixel of the decoded image, measured on one
+core; they only need to be right within a factor of two to keep the
+p99 near the deadline.
+"""
+
+import time
+from typing import List, Optional, Tuple
+
+# Estimated cost of each step, ms per megapixel
+STEP_COST_MS_PER_MP = {
+    "denoise": 1400.0,          # fastNlMeansDenoising (h=10, 7x7 template, 21x21 search)
+    "sharpen": 10.0,            # Unsharp mask
+    "qr_detection": 50.0,       # pyzbar on the color image
+    "layout_analysis": 60.0,    # Tables and text regions (morphology)
+    "block_ocr": 600.0,         # One Tesseract call per block (or composite)
+    "page_ocr": 400.0,          # One Tesseract call on the whole page
+}
+
+# OCR plans: steps still to run after enhancement
+PER_BLOCK_OCR = ("layout_analysis", "block_ocr")
+PAGE_OCR = ("page_ocr",)
+
+# Degradations reported in ProcessingMeta
+DENOISE_MEDIAN = "denoise_median"  # NL-means replaced by a 3x3 median filter
+SKIP_SHARPENING = "skip_sharpening"
+SKIP_QR_DETECTION = "skip_qr_detection"
+WHOLE_PAGE_OCR = "whole_page_ocr"  # Layout analysis skipped, one OCR call
+
+
+class LatencyBudget:
+    """
+    Time left for one request and the degradations made to stay in it.
+
+    Optional steps are afforded only if they fit together with the
+    reserve (the OCR plan still to run).
+    """
+
+    def __init__(self, deadline_ms: float, started: Optional[float] = None):
+        self.deadline_ms = deadline_ms
+        self.started = time.perf_counter() if started is None else started
+        self.megapixels = 0.0
+        self.reserve: Tuple[str, ...] = PER_BLOCK_OCR
+        self.degradations: List[str] = []
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def remaining_ms(self) -> float:
+        return self.deadline_ms - self.elapsed_ms()
+
+    def estimate_ms(self, *steps: str) -> float:
+        """Estimated cost of steps on the current image."""
+        return sum(STEP_COST_MS_PER_MP[step] for step in steps) * self.megapixels
+
+    def afford(self, step: str) -> bool:
+        """True if step fits in the time left, reserve included."""
+        return self.estimate_ms(step, *self.reserve) <= self.remaining_ms()
+
+    def afford_plan(self, plan: Tuple[str, ...]) -> bool:
+        """True if an OCR plan fits in the time left."""
+        return self.estimate_ms(*plan) <= self.remaining_ms()
+
+    def degrade(self, name: str) -> None:
+        if name not in self.degradations:
+            self.degradations.append(name)
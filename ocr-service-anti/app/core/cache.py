@@ -0,0 +1,117 @@
+"""
+Stage output cache.
+
+The mobile app calls /ocr/analyze to preview quality and then uploads the
+same bytes to /ocr. Outputs of the early stages (validation, quality,
+preprocessing, layout) are kept in memory, keyed by the image hash, the
+settings each stage reads and the keys of the stages it depends on, so a
+later request redoes only the stages downstream of what changed.
+
+Entries are bounded by total size (LRU eviction) and expire after a TTL.
+"""
+
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+# Size charged for values that are not arrays or containers
+OBJECT_BYTES = 512
+
+
+def digest(*parts: Any) -> str:
+    """Short stable hash of reprs (stage names, settings, upstream keys)."""
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(repr(part).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def hash_bytes(chunks: Iterable[bytes]) -> str:
+    """Hash of an upload, read in chunks."""
+    h = hashlib.blake2b(digest_size=16)
+    for chunk in chunks:
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def size_of(value: Any) -> int:
+    """Approximate memory held by a cached value."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(size_of(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(size_of(v) for v in value.values())
+    return max(sys.getsizeof(value), OBJECT_BYTES)
+
+
+class StageCache:
+    """
+    LRU cache of stage outputs with a memory bound and TTL.
+
+    Cached arrays are made read-only, since later requests share them.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Outputs stored under key, if present and not expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[2])
+
+    def put(self, key: str, outputs: Dict[str, Any]) -> None:
+        """Store outputs; entries larger than the whole cache are skipped."""
+        size = sum(size_of(v) for v in outputs.values())
+        if size > self.max_bytes:
+            return
+        for value in outputs.values():
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, size, dict(outputs))
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
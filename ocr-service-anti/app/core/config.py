@@ -37,11 +37,110 @@ class Settings(BaseSettings):
         description="Default OCR languages"
     )
     
+    ocr_block_workers: int = Field(
+        default=4,
+        description="Layout blocks OCR'd concurrently (Tesseract subprocesses); 1 runs them in sequence"
+    )
+    
+    # Stage cache (/ocr/analyze then /ocr on the same image reuses work)
+    stage_cache: bool = Field(
+        default=True,
+        description="Cache validation, quality, preprocessing and layout outputs by image hash and settings"
+    )
+    stage_cache_max_mb: int = Field(
+        default=256,
+        description="Memory bound of the stage cache in MB (least recently used entries are evicted)"
+    )
+    stage_cache_ttl_seconds: int = Field(
+        default=600,
+        description="Seconds a cached stage output stays valid"
+    )
+    
+    # Quality-driven fast path
+    fast_path: bool = Field(
+        default=True,
+        description="Skip enhancement and text layout (one whole-page OCR call) when all quality metrics are good"
+    )
+    
+    # Admission control (pipelines run off the event loop)
+    pipeline_workers: int = Field(
+        default=2,
+        description="Pipelines whose CPU-bound layers run at once, on threads off the event loop"
+    )
+    max_in_flight_pipelines: int = Field(
+        default=8,
+        description="Pipelines admitted at once (running or queued for a worker); more are rejected with SERVICE_BUSY"
+    )
+    
+    # Asynchronous jobs (POST /ocr/jobs)
+    job_workers: int = Field(
+        default=2,
+        description="Background workers running queued OCR jobs"
+    )
+    job_queue_size: int = Field(
+        default=100,
+        description="Jobs waiting for a worker at once; more uploads are rejected with SERVICE_BUSY"
+    )
+    job_dir: Path = Field(
+        default=Path("./data/jobs"),
+        description="Directory of the job database and queued uploads"
+    )
+    job_ttl_seconds: int = Field(
+        default=86400,
+        description="Seconds a job and its result are kept after it was created or finished"
+    )
+    
+    # Small-block coalescing (one Tesseract call per composite canvas)
+    coalesce_blocks: bool = Field(
+        default=True,
+        description="Stack small blocks onto one canvas and OCR it once with the full language set"
+    )
+    coalesce_max_block_height: int = Field(
+        default=150,
+        description="Text blocks up to this height in pixels are coalesced; taller blocks get their own call"
+    )
+    coalesce_gap: int = Field(
+        default=20,
+        description="Whitespace in pixels between blocks on a composite canvas"
+    )
+    coalesce_max_canvas_height: int = Field(
+        default=3000,
+        description="Composite canvas height in pixels at which a new canvas is started"
+    )
+    
+    # Script detection (narrows the language set per Tesseract call)
+    script_detection: bool = Field(
+        default=False,
+        description="Run Tesseract OSD on each block read alone and read it with only the languages its script needs (composite canvases keep the full set); off until scripts/benchmark_script.py shows OSD plus the narrowed pass beats the full set"
+    )
+    script_min_confidence: float = Field(
+        default=2.0,
+        description="OSD script confidence below which a block keeps the full language set"
+    )
+    script_text_height: int = Field(
+        default=20,
+        description="Text height in pixels blocks are downsampled to for OSD"
+    )
+    script_min_components: int = Field(
+        default=12,
+        description="Blocks with fewer glyph components keep the full language set"
+    )
+    
     # DPI Settings
     min_dpi: int = Field(default=150, description="Minimum acceptable DPI")
     preferred_dpi: int = Field(default=300, description="Preferred DPI for OCR")
     
+    # Layout analysis
+    layout_max_side: int = Field(
+        default=1600,
+        description="Tables and text regions are found on the binary image reduced to at most this long side (0 = full resolution)"
+    )
+    
     # Quality Thresholds
+    quality_thumbnail_side: int = Field(
+        default=1024,
+        description="Skew is estimated on a grayscale copy with at most this long side"
+    )
     blur_threshold_low: float = Field(
         default=100.0,
         description="Laplacian variance below this is considered blurry"
@@ -68,6 +167,20 @@ class Settings(BaseSettings):
         description="Supported image formats"
     )
     
+    # Reduced-resolution decoding of oversized JPEG photos
+    decode_mode: str = Field(
+        default="reduced",
+        description="'reduced' decodes large JPEGs at 1/2, 1/4 or 1/8 scale when text allows; 'full' disables it"
+    )
+    decode_target_text_height: int = Field(
+        default=40,
+        description="Smallest text height in pixels a reduced decode may produce"
+    )
+    decode_min_side: int = Field(
+        default=1600,
+        description="Smallest long side in pixels a reduced decode may produce"
+    )
+    
     # Model Settings
     custom_model_path: Path = Field(
         default=Path("./training_data/models"),
@@ -33,6 +33,20 @@ class OCRServiceError(Exception):
         }
 
 
+# Admission Control Errors
+class ServiceBusyError(OCRServiceError):
+    """Too many pipelines in flight; the request was not admitted."""
+    error_code = "SERVICE_BUSY"
+    status_code = 503
+
+
+# Job Errors
+class JobNotFoundError(OCRServiceError):
+    """Job does not exist or has expired."""
+    error_code = "JOB_NOT_FOUND"
+    status_code = 404
+
+
 # Layer 1: Image Intake & Validation Errors
 class ImageValidationError(OCRServiceError):
     """Errors during image validation (Layer 1)."""
@@ -50,6 +64,12 @@ class ImageTooSmallError(ImageValidationError):
     error_code = "IMAGE_TOO_SMALL"
 
 
+class ImageTooLargeError(ImageValidationError):
+    """Image file exceeds the upload size limit."""
+    error_code = "IMAGE_TOO_LARGE"
+    status_code = 413
+
+
 class ImageCorruptedError(ImageValidationError):
     """Image file is corrupted or unreadable."""
     error_code = "IMAGE_CORRUPTED"
@@ -1,18 +1,38 @@
 """
 Pipeline orchestrator for the OCR Service.
-Coordinates all 7 layers in sequence with timing and error handling.
+Coordinates all 7 layers with timing and error handling. Layers 1-6 are
+a stage graph (app.core.stages): QR decode, quality analysis and the DPI
+lookup only need the decoded image, so they run concurrently, and
+intermediates are freed as soon as no later stage reads them. Outputs of
+the early stages are cached by image hash and settings (app.core.cache).
+
+Layers are CPU-bound (OpenCV, Tesseract subprocesses), so they run on a
+dedicated thread pool instead of the event loop, and a semaphore caps the
+pipelines in flight; requests beyond the cap are rejected with
+ServiceBusyError rather than queued without bound.
+
+A request with a deadline carries a LatencyBudget through the layers;
+optional work that no longer fits is downgraded or skipped.
 """
 
 import time
-from typing import Optional, Dict, Any
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, Callable
 from dataclasses import dataclass, field
 from pathlib import Path
 
 import numpy as np
 from PIL import Image
 
+from app.core.config import settings
+from app.core.cache import StageCache, digest, hash_bytes
+from app.core.budget import LatencyBudget, PER_BLOCK_OCR, PAGE_OCR, WHOLE_PAGE_OCR
 from app.core.logging import get_logger, set_request_id
-from app.core.exceptions import OCRServiceError
+from app.core.stages import Stage, StageGraph
+from app.core.exceptions import OCRServiceError, ServiceBusyError
 from app.intake.validator import ImageValidator
 from app.quality.analyzer import QualityAnalyzer
 from app.preprocess.enhancer import ImageEnhancer
@@ -24,29 +44,72 @@ from app.schemas.responses import OCRResponse, QualityMetrics, ProcessingMeta
 
 logger = get_logger(__name__)
 
+# Layers timed in stage_times, in the order they run
+PIPELINE_STAGES = (
+    "validation",
+    "quality_analysis",
+    "qr_detection",
+    "preprocessing",
+    "layout_analysis",
+    "ocr_extraction",
+    "postprocessing",
+)
+
+# Context attributes the JSON builder reads; the stage graph keeps them
+RESPONSE_INPUTS = (
+    "decode_reduction",
+    "quality_metrics",
+    "processing_path",
+    "layout_blocks",
+    "ocr_results",
+    "cleaned_results",
+)
+
 
 @dataclass
 class PipelineContext:
     """Context object passed through all pipeline stages."""
     
-    # Input
-    image_bytes: bytes
-    filename: str
+    # Input (encoded bytes, or the path of a spooled upload)
+    image_bytes: Optional[bytes] = None
+    filename: str = "image.jpg"
+    image_path: Optional[Path] = None
     
     # Request tracking
     request_id: str = ""
+    budget: Optional[LatencyBudget] = None  # Set when the request has a deadline
+    
+    # Request options
+    languages: Optional[str] = None
+    skip_enhancement: bool = False
     
     # Stage outputs
     pil_image: Optional[Image.Image] = None
     cv_image: Optional[np.ndarray] = None
+    decode_reduction: int = 1  # cv_image is 1/decode_reduction of the original
+    dpi: Optional[int] = None
+    image_size: Dict[str, int] = field(default_factory=dict)  # Upright original size
     quality_metrics: Optional[Dict[str, Any]] = None
+    qr_blocks: Optional[list] = None
+    processing_path: str = "full"  # "fast" for clean scans
+    whole_page_ocr: bool = False  # Layout analysis skipped, page OCR'd in one call
     preprocessed_image: Optional[np.ndarray] = None
+    binary_image: Optional[np.ndarray] = None
     layout_blocks: list = field(default_factory=list)
     ocr_results: list = field(default_factory=list)
+    skipped_stages: list = field(default_factory=list)
+    ocr_calls: int = 0
+    language_usage: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    block_times: list = field(default_factory=list)
     cleaned_results: list = field(default_factory=list)
     
-    # Timing
+    # Stage cache: key of each context attribute (image hash for the upload)
+    stage_keys: Dict[str, str] = field(default_factory=dict)
+    cached_stages: list = field(default_factory=list)
+    
+    # Timing (progress, if set, gets a copy of stage_times after each layer)
     stage_times: Dict[str, float] = field(default_factory=dict)
+    progress: Optional[Callable[[Dict[str, float]], None]] = None
     total_time_ms: float = 0.0
     
     # Errors
@@ -75,13 +138,113 @@ class OCRPipeline:
         self.ocr_extractor = OCRExtractor()
         self.text_cleaner = TextCleaner()
         self.json_builder = JSONBuilder()
+        self.cache: Optional[StageCache] = None
+        if settings.stage_cache:
+            self.cache = StageCache(
+                max_bytes=settings.stage_cache_max_mb * 1024 * 1024,
+                ttl_seconds=settings.stage_cache_ttl_seconds
+            )
+        self.graph = StageGraph([
+            Stage("validation", self._validate, cached=True,
+                  config=("supported_formats", "min_image_width", "min_image_height",
+                          "max_image_size_mb", "decode_mode", "decode_min_side",
+                          "decode_target_text_height", "preferred_dpi"),
+                  inputs=("image_bytes", "image_path", "filename"),
+                  outputs=("pil_image", "cv_image", "decode_reduction")),
+            Stage("image_info", self._read_image_info, timed=False,
+                  inputs=("pil_image", "cv_image", "decode_reduction"),
+                  outputs=("dpi", "image_size")),
+            Stage("quality_analysis", self._analyze_quality, cached=True,
+                  config=("blur_threshold_low", "blur_threshold_high", "contrast_threshold_low",
+                          "contrast_threshold_high", "quality_thumbnail_side"),
+                  inputs=("cv_image",),
+                  outputs=("quality_metrics",)),
+            Stage("qr_detection", self.layout_detector.detect_qr_codes, cached=True,
+                  inputs=("cv_image",),
+                  outputs=("qr_blocks",)),
+            Stage("routing", self._choose_path, timed=False,
+                  inputs=("quality_metrics",),
+                  outputs=("processing_path", "whole_page_ocr")),
+            Stage("preprocessing", self._preprocess, cached=True,
+                  config=("preferred_dpi", "max_skew_angle"),
+                  inputs=("cv_image", "quality_metrics", "processing_path", "skip_enhancement"),
+                  outputs=("preprocessed_image", "binary_image")),
+            Stage("layout_analysis", self._analyze_layout, cached=True,
+                  config=("layout_max_side",),
+                  inputs=("cv_image", "preprocessed_image", "binary_image", "qr_blocks", "whole_page_ocr"),
+                  outputs=("layout_blocks",)),
+            Stage("ocr_extraction", self._extract_text,
+                  inputs=("cv_image", "preprocessed_image", "layout_blocks", "languages"),
+                  outputs=("ocr_results",)),
+            Stage("postprocessing", self.text_cleaner.clean,
+                  inputs=("ocr_results",),
+                  outputs=("cleaned_results",)),
+        ])
+        
+        # Admission control
+        self.workers = settings.pipeline_workers
+        self.max_in_flight = settings.max_in_flight_pipelines
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="ocr-pipeline"
+        )
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._in_flight = 0
+    
+    def load(self) -> Dict[str, int]:
+        """Pipelines in flight and queued for a worker thread."""
+        return {
+            "in_flight": self._in_flight,
+            "max_in_flight": self.max_in_flight,
+            "workers": self.workers,
+            "queue_depth": max(0, self._in_flight - self.workers),
+        }
+    
+    @asynccontextmanager
+    async def _admit(self, wait: bool = False):
+        """
+        Hold an in-flight slot for one pipeline.
+        
+        Args:
+            wait: Wait for a free slot instead of failing (background jobs)
+        
+        Raises:
+            ServiceBusyError: If all slots are taken and wait is False
+                (details carry the load)
+        """
+        if not wait and self._slots.locked():
+            load = self.load()
+            logger.warning(
+                f"[OCR-PIPELINE-REJECTED] {load['in_flight']} in flight, "
+                f"queue_depth={load['queue_depth']}"
+            )
+            raise ServiceBusyError(
+                message=f"Service busy: {load['in_flight']} pipelines in flight, try again later",
+                details=load
+            )
+        
+        async with self._slots:
+            self._in_flight += 1
+            try:
+                yield
+            finally:
+                self._in_flight -= 1
+    
+    async def _run_blocking(self, func):
+        """Run func on the pipeline thread pool, keeping the request ID for logs."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, contextvars.copy_context().run, func)
     
     async def process(
         self,
-        image_bytes: bytes,
-        filename: str,
+        image_bytes: Optional[bytes] = None,
+        filename: str = "image.jpg",
         languages: Optional[str] = None,
-        skip_enhancement: bool = False
+        skip_enhancement: bool = False,
+        image_path: Optional[Path] = None,
+        progress: Optional[Callable[[Dict[str, float]], None]] = None,
+        deadline_ms: Optional[float] = None,
+        wait_for_slot: bool = False
     ) -> OCRResponse:
         """
         Process an image through all OCR layers.
@@ -91,98 +254,69 @@ class OCRPipeline:
             filename: Original filename
             languages: Override languages (e.g., "eng+khm")
             skip_enhancement: Skip preprocessing if image is already clean
+            image_path: Image file to read instead of image_bytes
+            progress: Called with the stage times so far after each layer
+            deadline_ms: Latency budget; optional work that does not fit
+                is downgraded or skipped (reported in meta.degradations)
+            wait_for_slot: Queue for an in-flight slot (first come, first
+                served) rather than being rejected when all are taken
         
         Returns:
             OCRResponse with structured OCR results
+        
+        Raises:
+            ServiceBusyError: If max_in_flight_pipelines are already running
+                and wait_for_slot is False
         """
+        budget = LatencyBudget(deadline_ms) if deadline_ms else None
+        async with self._admit(wait_for_slot):
+            return await self._process(
+                image_bytes, filename, languages, skip_enhancement, image_path, progress, budget
+            )
+    
+    async def _process(
+        self,
+        image_bytes: Optional[bytes],
+        filename: str,
+        languages: Optional[str],
+        skip_enhancement: bool,
+        image_path: Optional[Path],
+        progress: Optional[Callable[[Dict[str, float]], None]],
+        budget: Optional[LatencyBudget] = None
+    ) -> OCRResponse:
+        """Run all layers for one admitted request."""
         start_time = time.time()
         request_id = set_request_id()
         
         context = PipelineContext(
             image_bytes=image_bytes,
             filename=filename,
-            request_id=request_id
+            image_path=image_path,
+            request_id=request_id,
+            budget=budget,
+            languages=languages,
+            skip_enhancement=skip_enhancement,
+            progress=progress
         )
         
-        image_size_kb = len(image_bytes) / 1024
+        image_size = image_path.stat().st_size if image_path is not None else len(image_bytes)
+        image_size_kb = image_size / 1024
         logger.info(f"[OCR-PIPELINE-START] file={filename}, size={image_size_kb:.1f}KB, languages={languages or 'default'}")
         
         try:
-            # Layer 1: Image Intake & Validation
-            logger.info("[OCR-STAGE-1] Image Intake & Validation - START")
-            context = await self._run_layer(
-                "validation",
-                lambda: self.validator.validate(context),
-                context
-            )
-            if context.pil_image:
-                logger.info(f"[OCR-STAGE-1] COMPLETE - dimensions={context.pil_image.size}")
-            
-            # Layer 2: Quality Analysis
-            logger.info("[OCR-STAGE-2] Quality Analysis - START")
-            context = await self._run_layer(
-                "quality_analysis",
-                lambda: self.quality_analyzer.analyze(context),
-                context
-            )
-            if context.quality_metrics:
-                blur = context.quality_metrics.get('blur_score', 'N/A')
-                contrast = context.quality_metrics.get('contrast', 'N/A')
-                logger.info(f"[OCR-STAGE-2] COMPLETE - blur={blur}, contrast={contrast}")
-            
-            # Layer 3: Preprocessing & Enhancement
-            if not skip_enhancement:
-                logger.info("[OCR-STAGE-3] Preprocessing & Enhancement - START")
-                context = await self._run_layer(
-                    "preprocessing",
-                    lambda: self.enhancer.enhance(context),
-                    context
-                )
-                logger.info("[OCR-STAGE-3] COMPLETE")
-            else:
-                context.preprocessed_image = context.cv_image
-                context.stage_times["preprocessing"] = 0.0
-                logger.info("[OCR-STAGE-3] SKIPPED (skip_enhancement=True)")
-            
-            # Layer 4: Layout Analysis
-            logger.info("[OCR-STAGE-4] Layout Analysis - START")
-            context = await self._run_layer(
-                "layout_analysis",
-                lambda: self.layout_detector.detect(context),
-                context
-            )
-            logger.info(f"[OCR-STAGE-4] COMPLETE - blocks_detected={len(context.layout_blocks)}")
+            await self._hash_upload(context)
             
-            # Layer 5: OCR Extraction
-            logger.info("[OCR-STAGE-5] OCR Extraction - START")
-            context = await self._run_layer(
-                "ocr_extraction",
-                lambda: self.ocr_extractor.extract(context, languages),
-                context
+            # Layers 1-6 as a stage graph: independent stages run together
+            await self.graph.run(
+                context,
+                lambda stage: self._run_stage(stage, context),
+                keep=RESPONSE_INPUTS
             )
-            # Calculate total text length from OCRBlock objects
-            text_len = 0
-            if context.ocr_results:
-                for block in context.ocr_results:
-                    if hasattr(block, 'lines'):
-                        for line in block.lines:
-                            if hasattr(line, 'text'):
-                                text_len += len(line.text)
-            logger.info(f"[OCR-STAGE-5] COMPLETE - results={len(context.ocr_results)}, text_chars={text_len}")
-            
-            # Layer 6: Post-processing
-            logger.info("[OCR-STAGE-6] Post-processing - START")
-            context = await self._run_layer(
-                "postprocessing",
-                lambda: self.text_cleaner.clean(context),
-                context
-            )
-            logger.info(f"[OCR-STAGE-6] COMPLETE - cleaned_results={len(context.cleaned_results)}")
             
             # Layer 7: JSON Builder
             logger.info("[OCR-STAGE-7] JSON Builder - START")
             context.total_time_ms = (time.time() - start_time) * 1000
-            response = self.json_builder.build(context)
+            response = await self._run_blocking(lambda: self.json_builder.build(context))
             
             # Log raw OCR data summary
             raw_text_preview = response.raw_text[:200] + "..." if len(response.raw_text) > 200 else response.raw_text
@@ -208,21 +342,170 @@ class OCRPipeline:
                 details={"stage_times": context.stage_times}
             )
     
+    async def _hash_upload(self, context: PipelineContext) -> None:
+        """Key the upload by its content hash, the root of every stage cache key."""
+        if self.cache is None:
+            return
+        
+        def read_chunks():
+            if context.image_path is None:
+                yield context.image_bytes
+                return
+            with open(context.image_path, "rb") as f:
+                while chunk := f.read(1 << 20):
+                    yield chunk
+        
+        image_hash = await self._run_blocking(lambda: hash_bytes(read_chunks()))
+        context.stage_keys["image_bytes"] = image_hash
+        context.stage_keys["image_path"] = image_hash
+    
+    def _stage_key(self, stage: Stage, context: PipelineContext) -> str:
+        """Cache key: stage, the settings it reads and the keys of its inputs."""
+        return digest(
+            stage.name,
+            [(name, getattr(settings, name)) for name in stage.config],
+            [context.stage_keys.get(attr) or digest(getattr(context, attr, None)) for attr in stage.inputs]
+        )
+    
+    async def _run_stage(self, stage: Stage, context: PipelineContext) -> None:
+        """
+        Run one graph stage on the pipeline thread pool (timed unless it is
+        bookkeeping), or restore its outputs from the stage cache.
+        """
+        use_cache = stage.cached and self.cache is not None
+        if use_cache:
+            key = self._stage_key(stage, context)
+            outputs = self.cache.get(key)
+            if outputs is not None:
+                for attr, value in outputs.items():
+                    setattr(context, attr, value)
+                context.cached_stages.append(stage.name)
+                if stage.timed:
+                    context.stage_times[stage.name] = 0.0
+                    self._report_progress(context)
+                logger.info(f"[OCR-CACHE] {stage.name} - reused")
+        
+        if not use_cache or outputs is None:
+            budget = context.budget
+            degradations = len(budget.degradations) if budget is not None else 0
+            if stage.timed:
+                await self._run_layer(stage.name, lambda: stage.run(context), context)
+            else:
+                await self._run_blocking(lambda: stage.run(context))
+            
+            # Outputs cut down to meet a deadline are not reused
+            degraded = budget is not None and len(budget.degradations) > degradations
+            if use_cache and not degraded:
+                self.cache.put(key, {attr: getattr(context, attr) for attr in stage.outputs})
+        
+        if use_cache:
+            for attr in stage.outputs:
+                context.stage_keys[attr] = key
+        if "cv_image" in stage.outputs and context.budget is not None:
+            context.budget.megapixels = context.cv_image.shape[0] * context.cv_image.shape[1] / 1e6
+    
+    def _validate(self, context: PipelineContext) -> PipelineContext:
+        """Layer 1: Image Intake & Validation."""
+        logger.info("[OCR-STAGE-1] Image Intake & Validation - START")
+        context = self.validator.validate(context)
+        logger.info(f"[OCR-STAGE-1] COMPLETE - dimensions={context.cv_image.shape[1::-1]}")
+        return context
+    
+    def _read_image_info(self, context: PipelineContext) -> PipelineContext:
+        """DPI and upright original size, the last uses of the PIL header."""
+        if context.pil_image is not None:
+            context.dpi = ImageValidator.get_dpi(context.pil_image)
+        context.image_size = ImageValidator.original_size(
+            context.pil_image, context.cv_image, context.decode_reduction
+        )
+        return context
+    
+    def _analyze_quality(self, context: PipelineContext) -> PipelineContext:
+        """Layer 2: Quality Analysis."""
+        logger.info("[OCR-STAGE-2] Quality Analysis - START")
+        context = self.quality_analyzer.analyze(context)
+        if context.quality_metrics:
+            blur = context.quality_metrics.get('blur_score', 'N/A')
+            contrast = context.quality_metrics.get('contrast', 'N/A')
+            logger.info(f"[OCR-STAGE-2] COMPLETE - blur={blur}, contrast={contrast}")
+        return context
+    
+    def _choose_path(self, context: PipelineContext) -> PipelineContext:
+        """Pick the processing path from the quality metrics and latency budget."""
+        # Clean scans take the fast path: no enhancement, no text
+        # layout, one whole-page OCR call
+        fast_path = (
+            settings.fast_path
+            and context.quality_metrics is not None
+            and self.quality_analyzer.is_clean(context.quality_metrics)
+        )
+        if fast_path:
+            context.processing_path = "fast"
+            context.skipped_stages = ["preprocessing", "layout_analysis"]
+            logger.info("[OCR-FAST-PATH] Clean scan - skipping enhancement and text layout")
+        elif context.skip_enhancement:
+            context.skipped_stages = ["preprocessing"]
+        
+        # Per-block OCR needs layout analysis first; without time for
+        # both, read the page in one call
+        context.whole_page_ocr = fast_path
+        budget = context.budget
+        if budget is not None:
+            if not fast_path and not budget.afford_plan(PER_BLOCK_OCR):
+                context.whole_page_ocr = True
+                budget.degrade(WHOLE_PAGE_OCR)
+                context.skipped_stages.append("layout_analysis")
+                logger.info(f"[OCR-BUDGET] {budget.remaining_ms():.0f}ms left - whole-page OCR")
+            budget.reserve = PAGE_OCR if context.whole_page_ocr else PER_BLOCK_OCR
+        return context
+    
+    def _preprocess(self, context: PipelineContext) -> PipelineContext:
+        """Layer 3: Preprocessing & Enhancement (skipped on the fast path or on request)."""
+        if context.processing_path == "fast" or context.skip_enhancement:
+            context.preprocessed_image = context.cv_image
+            reason = "fast path" if context.processing_path == "fast" else "skip_enhancement=True"
+            logger.info(f"[OCR-STAGE-3] SKIPPED ({reason})")
+            return context
+        
+        logger.info("[OCR-STAGE-3] Preprocessing & Enhancement - START")
+        context = self.enhancer.enhance(context)
+        logger.info("[OCR-STAGE-3] COMPLETE")
+        return context
+    
+    def _analyze_layout(self, context: PipelineContext) -> PipelineContext:
+        """Layer 4: Layout Analysis (QR codes only for whole-page OCR)."""
+        logger.info("[OCR-STAGE-4] Layout Analysis - START")
+        if context.whole_page_ocr:
+            context = self.layout_detector.detect_qr_only(context)
+        else:
+            context = self.layout_detector.detect(context)
+        logger.info(f"[OCR-STAGE-4] COMPLETE - blocks_detected={len(context.layout_blocks)}")
+        return context
+    
+    def _extract_text(self, context: PipelineContext) -> PipelineContext:
+        """Layer 5: OCR Extraction."""
+        logger.info("[OCR-STAGE-5] OCR Extraction - START")
+        context = self.ocr_extractor.extract(context, context.languages)
+        text_len = sum(len(line.text) for block in context.ocr_results for line in block.lines)
+        logger.info(f"[OCR-STAGE-5] COMPLETE - results={len(context.ocr_results)}, text_chars={text_len}")
+        return context
+    
     async def _run_layer(
         self,
         layer_name: str,
         layer_func,
         context: PipelineContext
     ) -> PipelineContext:
-        """Run a single layer with timing and error handling."""
+        """Run a single layer on the pipeline thread pool with timing and error handling."""
         start = time.time()
         logger.debug(f"Starting layer: {layer_name}")
         
         try:
-            result = layer_func()
+            result = await self._run_blocking(layer_func)
             elapsed = (time.time() - start) * 1000
             context.stage_times[layer_name] = elapsed
             logger.debug(f"Layer {layer_name} completed in {elapsed:.0f}ms")
+            self._report_progress(context)
             return result
         except Exception as e:
             elapsed = (time.time() - start) * 1000
@@ -230,10 +513,21 @@ class OCRPipeline:
             logger.error(f"Layer {layer_name} failed after {elapsed:.0f}ms: {e}")
             raise
     
+    @staticmethod
+    def _report_progress(context: PipelineContext) -> None:
+        """Pass the stage times so far to the context's progress callback."""
+        if context.progress is None:
+            return
+        try:
+            context.progress(dict(context.stage_times))
+        except Exception as e:
+            logger.warning(f"Progress callback failed: {e}")
+    
     async def analyze_quality_only(
         self,
-        image_bytes: bytes,
-        filename: str
+        image_bytes: Optional[bytes] = None,
+        filename: str = "image.jpg",
+        image_path: Optional[Path] = None
     ) -> QualityMetrics:
         """
         Run only quality analysis without full OCR.
@@ -242,13 +536,19 @@ class OCRPipeline:
         context = PipelineContext(
             image_bytes=image_bytes,
             filename=filename,
+            image_path=image_path,
             request_id=set_request_id()
         )
         
-        # Layer 1: Validation
-        context = self.validator.validate(context)
-        
-        # Layer 2: Quality Analysis
-        context = self.quality_analyzer.analyze(context)
+        async with self._admit():
+            await self._hash_upload(context)
+            
+            # Layers 1-2 only, DPI lookup alongside quality analysis
+            await self.graph.run(
+                context,
+                lambda stage: self._run_stage(stage, context),
+                only=("validation", "image_info", "quality_analysis"),
+                keep=("quality_metrics",)
+            )
         
-        return QualityMetrics(**context.quality_metrics)
+        return QualityMetrics(**context.quality_metrics, dpi=context.dpi)
@@ -0,0 +1,129 @@
+"""
+Stage graph for the pipeline orchestrator.
+
+Each stage declares the context attributes it reads (inputs) and writes
+(outputs). A stage starts as soon as every input produced by another
+stage is available, so stages that do not depend on each other (QR
+decode, quality analysis, DPI lookup) run at the same time. Once every
+stage reading an attribute has finished, the attribute is dropped from
+the context (unless it is kept for the response), so large intermediates
+such as the encoded upload or the PIL header do not live for the whole
+request.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One node of the stage graph."""
+    name: str
+    run: Callable  # run(context) -> context, blocking (called on the pipeline thread pool)
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    timed: bool = True  # Recorded in stage_times
+    cached: bool = False  # Outputs kept in the stage cache
+    config: Tuple[str, ...] = ()  # Settings the outputs depend on (part of the cache key)
+
+
+class StageGraph:
+    """
+    Runs stages in dependency order, independent stages concurrently.
+
+    Inputs no stage produces (the upload) are external and available from
+    the start. Stages are declared in a topological order; a stage may
+    only read outputs of stages declared before it.
+    """
+
+    def __init__(self, stages: Sequence[Stage]):
+        self.stages: Dict[str, Stage] = {}
+        self._producer: Dict[str, str] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage: {stage.name}")
+            for name in stage.inputs:
+                if name not in self._producer and any(name in s.outputs for s in stages):
+                    raise ValueError(f"Stage {stage.name} reads {name} before it is produced")
+            self.stages[stage.name] = stage
+            for name in stage.outputs:
+                self._producer[name] = stage.name
+
+    def upstream(self, name: str) -> List[str]:
+        """Stages name depends on (directly or not), in declaration order."""
+        needed: Set[str] = set()
+        pending = [name]
+        while pending:
+            for attr in self.stages[pending.pop()].inputs:
+                producer = self._producer.get(attr)
+                if producer is not None and producer not in needed:
+                    needed.add(producer)
+                    pending.append(producer)
+        return [s for s in self.stages if s in needed]
+
+    async def run(
+        self,
+        context,
+        run_stage: Callable[[Stage], Awaitable[None]],
+        only: Optional[Iterable[str]] = None,
+        keep: Iterable[str] = ()
+    ) -> None:
+        """
+        Run the graph (or the stages in only) on one context.
+
+        Args:
+            context: PipelineContext the stages read and write
+            run_stage: Coroutine running one stage (timing, thread pool)
+            only: Stage names to run; their upstream stages must be included
+            keep: Attributes still needed after the graph (never freed)
+
+        Raises:
+            The first stage error, after the stages already running finish
+        """
+        names = [s for s in self.stages if only is None or s in set(only)]
+        stages = [self.stages[s] for s in names]
+        keep = set(keep)
+
+        consumers: Dict[str, Set[str]] = {}
+        for stage in stages:
+            for attr in stage.inputs:
+                consumers.setdefault(attr, set()).add(stage.name)
+
+        pending = list(stages)
+        produced: Set[str] = set()
+        finished: Set[str] = set()
+        running: Dict[asyncio.Task, Stage] = {}
+
+        def ready(stage: Stage) -> bool:
+            return all(
+                attr in produced or self._producer.get(attr) not in names
+                for attr in stage.inputs
+            )
+
+        try:
+            while pending or running:
+                for stage in [s for s in pending if ready(s)]:
+                    pending.remove(stage)
+                    running[asyncio.ensure_future(run_stage(stage))] = stage
+                if not running:
+                    raise RuntimeError(f"Stages never became ready: {[s.name for s in pending]}")
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    stage = running.pop(task)
+                    task.result()
+                    produced.update(stage.outputs)
+                    finished.add(stage.name)
+                    self._free(context, stage, consumers, finished, keep)
+        finally:
+            # Let stages already on the thread pool finish before the error propagates
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+    @staticmethod
+    def _free(context, stage: Stage, consumers, finished: Set[str], keep: Set[str]) -> None:
+        """Drop inputs of stage that no unfinished stage reads any more."""
+        for attr in stage.inputs:
+            if attr not in keep and consumers[attr] <= finished:
+                setattr(context, attr, None)
@@ -1,5 +1,6 @@
 """Layer 1: Image Intake & Validation module."""
 
 from app.intake.validator import ImageValidator
+from app.intake.upload import spool_upload, max_request_bytes
 
-__all__ = ["ImageValidator"]
+__all__ = ["ImageValidator", "spool_upload", "max_request_bytes"]
@@ -0,0 +1,126 @@
+"""
+Reduced-resolution decoding for oversized photos.
+
+Phone photos of prescriptions often carry text far taller than OCR needs.
+Such JPEGs are decoded directly at 1/2, 1/4 or 1/8 scale with libjpeg DCT
+scaling (cv2.IMREAD_REDUCED_*), so the full-size image is never built and
+every later layer works on fewer pixels.
+"""
+
+from typing import Optional
+
+import numpy as np
+import cv2
+
+from app.core.config import settings
+
+# OpenCV read flags per reduction factor
+COLOR_READ_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+GRAYSCALE_READ_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+# Reduction of the grayscale probe used to measure text height
+PROBE_REDUCTION = 2
+
+
+def estimate_text_height(gray: np.ndarray) -> Optional[float]:
+    """
+    Estimate the typical text height of a document image.
+
+    Median height of text-sized connected components after adaptive
+    thresholding. Characters may merge into words at low resolution,
+    which leaves their height unchanged.
+
+    Returns None if there are too few text-like components.
+    """
+    height, width = gray.shape[:2]
+    block_size = 2 * (min(height, width) // 30) + 1
+    if block_size < 3:
+        return None
+
+    binary = cv2.adaptiveThreshold(
+        gray, 255,
+        cv2.ADAPTIVE_THRESH_MEAN_C,
+        cv2.THRESH_BINARY_INV,
+        block_size, 10
+    )
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+
+    w = stats[1:, cv2.CC_STAT_WIDTH]
+    h = stats[1:, cv2.CC_STAT_HEIGHT]
+    # Drop specks, ruled lines and large non-text regions
+    text_like = (h >= 3) & (h <= height // 8) & (w >= 2) & (w <= 25 * h)
+    if np.count_nonzero(text_like) < 20:
+        return None
+
+    return float(np.median(h[text_like]))
+
+
+def choose_decode_reduction(
+    text_height: Optional[float],
+    long_side: int,
+    dpi: Optional[float] = None
+) -> int:
+    """
+    Pick the largest decode reduction (1, 2, 4 or 8) that keeps text at
+    least decode_target_text_height pixels tall and the long side at least
+    decode_min_side. Without a text height estimate, a reported DPI above
+    preferred_dpi is used instead.
+    """
+    if text_height is not None:
+        limit = text_height / settings.decode_target_text_height
+    elif dpi:
+        limit = dpi / settings.preferred_dpi
+    else:
+        return 1
+
+    for reduction in (8, 4, 2):
+        if reduction <= limit and long_side / reduction >= settings.decode_min_side:
+            return reduction
+    return 1
+
+
+def decode_reduced(read, long_side: int, dpi: Optional[float], grayscale: bool):
+    """
+    Decode an oversized JPEG at the working resolution OCR needs.
+
+    One grayscale decode at 1/2 scale serves as the probe for measuring
+    text height and, for grayscale images that can be reduced, as the
+    decoded image itself.
+
+    Args:
+        read: Callable taking OpenCV read flags and returning the image
+        long_side: Longest side at full resolution
+        dpi: Reported DPI, if any
+        grayscale: Decode to a single channel instead of BGR
+
+    Returns:
+        Tuple of (image or None if decoding failed, reduction)
+    """
+    probe = read(GRAYSCALE_READ_FLAGS[PROBE_REDUCTION])
+    if probe is None:
+        return None, 1
+
+    small = cv2.resize(probe, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+    text_height = estimate_text_height(small)
+    if text_height is not None:
+        text_height *= PROBE_REDUCTION * 2
+
+    reduction = choose_decode_reduction(text_height, long_side, dpi)
+
+    if reduction < PROBE_REDUCTION or not grayscale:
+        flags = (GRAYSCALE_READ_FLAGS if grayscale else COLOR_READ_FLAGS)[reduction]
+        return read(flags), reduction
+    if reduction > PROBE_REDUCTION:
+        factor = PROBE_REDUCTION / reduction
+        probe = cv2.resize(probe, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+    return probe, reduction
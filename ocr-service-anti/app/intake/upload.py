@@ -0,0 +1,91 @@
+"""
+Upload intake.
+
+Starlette receives and parses the whole multipart body before a route
+runs, buffering each file in a SpooledTemporaryFile (on disk above 1MB).
+Oversized uploads are therefore rejected earlier, on their Content-Length
+(see app.main); the limit here only catches uploads sent without one, once
+they have been received.
+
+The upload is copied in fixed-size chunks to a named temporary file, so
+the validator can decode straight from a path. That is a second disk copy
+of the file, not a bound on what the server receives.
+"""
+
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from fastapi import UploadFile
+
+from app.core.config import settings
+from app.core.exceptions import ImageTooLargeError
+
+# Bytes read from the upload per await
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Allowance for multipart boundaries and form fields on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def max_upload_bytes() -> int:
+    """Largest accepted image file, in bytes."""
+    return int(settings.max_image_size_mb * 1024 * 1024)
+
+
+def max_request_bytes() -> int:
+    """Largest accepted request body (image + multipart overhead), in bytes."""
+    return max_upload_bytes() + MULTIPART_OVERHEAD_BYTES
+
+
+def too_large_error(size: int, max_bytes: int) -> ImageTooLargeError:
+    """Build the error for an upload over the size limit."""
+    return ImageTooLargeError(
+        message=f"Image too large: over {max_bytes / 1024 / 1024:.1f}MB",
+        details={
+            "size_bytes": size,
+            "max_bytes": max_bytes
+        }
+    )
+
+
+@asynccontextmanager
+async def spool_upload(
+    file: UploadFile,
+    max_bytes: Optional[int] = None
+) -> AsyncIterator[Path]:
+    """
+    Copy a received upload to a named temporary file.
+
+    Args:
+        file: Uploaded file
+        max_bytes: Size limit (default: max_image_size_mb)
+
+    Yields:
+        Path of the temporary file, deleted when the context exits
+
+    Raises:
+        ImageTooLargeError: As soon as more than max_bytes have been copied
+    """
+    limit = max_upload_bytes() if max_bytes is None else max_bytes
+    suffix = Path(file.filename or "").suffix
+    fd, name = tempfile.mkstemp(prefix="ocr-upload-", suffix=suffix)
+    path = Path(name)
+
+    try:
+        size = 0
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > limit:
+                    raise too_large_error(size, limit)
+                out.write(chunk)
+
+        yield path
+    finally:
+        path.unlink(missing_ok=True)
@@ -10,7 +10,8 @@ Purpose: Ensure image is processable before OCR
 """
 
 import io
-from typing import Tuple, Optional
+from pathlib import Path
+from typing import Dict, Tuple, Optional
 
 import numpy as np
 from PIL import Image, ExifTags, UnidentifiedImageError
@@ -20,11 +21,13 @@ from app.core.config import settings
 from app.core.logging import get_logger
 from app.core.exceptions import (
     ImageValidationError,
+    ImageTooLargeError,
     UnsupportedFormatError,
     ImageTooSmallError,
     ImageCorruptedError,
     LowResolutionError,
 )
+from app.intake.decode import decode_reduced
 
 logger = get_logger(__name__)
 
@@ -48,22 +51,33 @@ class ImageValidator:
         """
         Validate image and prepare it for processing.
         
+        Checks run on the image header; the pixels are then decoded once,
+        straight into the BGR/grayscale buffer the later layers use, with
+        EXIF orientation applied by the decoder. Reading from
+        context.image_path (a spooled upload) avoids holding the encoded
+        bytes in memory as well.
+        
         Args:
-            context: PipelineContext with image_bytes
+            context: PipelineContext with image_path or image_bytes
         
         Returns:
-            Updated context with pil_image and cv_image
+            Updated context with pil_image (header only), cv_image and
+            decode_reduction
         
         Raises:
             ImageValidationError: If image fails validation
         """
         logger.info(f"Validating image: {context.filename}")
+        image_path = getattr(context, "image_path", None)
         
         # Check file size
-        self._check_file_size(context.image_bytes)
+        if image_path is not None:
+            self._check_file_size(Path(image_path).stat().st_size)
+        else:
+            self._check_file_size(len(context.image_bytes))
         
-        # Load and validate image
-        pil_image = self._load_image(context.image_bytes)
+        # Read image header (no pixel data yet)
+        pil_image = self._open_image(image_path, context.image_bytes)
         
         # Check format
         self._check_format(pil_image, context.filename)
@@ -71,11 +85,9 @@ class ImageValidator:
         # Check dimensions
         self._check_dimensions(pil_image)
         
-        # Fix orientation from EXIF
-        pil_image = self._fix_orientation(pil_image)
-        
-        # Convert to CV2 format
-        cv_image = self._pil_to_cv2(pil_image)
+        # Decode with orientation fixed
+        cv_image, reduction = self._decode(pil_image, image_path, context.image_bytes)
+        pil_image.close()
         
         # Check for completely black/white images
         self._check_not_blank(cv_image)
@@ -83,19 +95,19 @@ class ImageValidator:
         # Update context
         context.pil_image = pil_image
         context.cv_image = cv_image
+        context.decode_reduction = reduction
         
         logger.info(
-            f"Validation passed: {pil_image.size[0]}x{pil_image.size[1]}, "
+            f"Validation passed: {cv_image.shape[1]}x{cv_image.shape[0]}, "
             f"mode={pil_image.mode}"
         )
         
         return context
     
-    def _check_file_size(self, image_bytes: bytes) -> None:
+    def _check_file_size(self, size: int) -> None:
         """Check if file size is within limits."""
-        size = len(image_bytes)
         if size > self.max_size_bytes:
-            raise ImageValidationError(
+            raise ImageTooLargeError(
                 message=f"Image too large: {size / 1024 / 1024:.1f}MB",
                 details={
                     "size_bytes": size,
@@ -103,13 +115,15 @@ class ImageValidator:
                 }
             )
     
-    def _load_image(self, image_bytes: bytes) -> Image.Image:
-        """Load image from bytes."""
+    def _open_image(
+        self,
+        image_path: Optional[Path],
+        image_bytes: Optional[bytes]
+    ) -> Image.Image:
+        """Open image lazily: reads format, size, mode and metadata only."""
         try:
-            img = Image.open(io.BytesIO(image_bytes))
-            # Force load to catch corruption
-            img.load()
-            return img
+            source = image_path if image_path is not None else io.BytesIO(image_bytes)
+            return Image.open(source)
         except UnidentifiedImageError:
             raise ImageCorruptedError(
                 message="Cannot identify image file - may be corrupted"
@@ -119,6 +133,75 @@ class ImageValidator:
                 message=f"Failed to load image: {str(e)}"
             )
     
+    def _decode(
+        self,
+        pil_image: Image.Image,
+        image_path: Optional[Path],
+        image_bytes: Optional[bytes]
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Decode pixels into OpenCV format (BGR or grayscale).
+        
+        OpenCV decodes directly into the final buffer and applies EXIF
+        orientation. Large JPEGs with oversized text are decoded at 1/2,
+        1/4 or 1/8 scale (decode_mode "reduced"). Images with
+        transparency, or formats OpenCV cannot read, go through PIL.
+        
+        Returns:
+            Tuple of (image, reduction factor)
+        """
+        def read(flags: int) -> Optional[np.ndarray]:
+            if image_path is not None:
+                return cv2.imread(str(image_path), flags)
+            return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), flags)
+        
+        if self._can_reduce(pil_image):
+            dpi = pil_image.info.get("dpi")
+            cv_image, reduction = decode_reduced(
+                read,
+                long_side=max(pil_image.size),
+                dpi=float(dpi[0]) if dpi else None,
+                grayscale=pil_image.mode == "L"
+            )
+            if cv_image is not None:
+                if reduction > 1:
+                    logger.info(f"Decoded at 1/{reduction} scale")
+                return cv_image, reduction
+        
+        if pil_image.mode != "RGBA":
+            cv_image = read(cv2.IMREAD_ANYCOLOR)
+            if cv_image is not None:
+                return cv_image, 1
+        
+        image = self._load_image(image_path, image_bytes)
+        image = self._fix_orientation(image)
+        return self._pil_to_cv2(image), 1
+    
+    def _can_reduce(self, pil_image: Image.Image) -> bool:
+        """Whether the image is a JPEG large enough for a reduced decode."""
+        return (
+            settings.decode_mode == "reduced"
+            and pil_image.format == "JPEG"
+            and pil_image.mode in ("L", "RGB")
+            and max(pil_image.size) / 2 >= settings.decode_min_side
+        )
+    
+    def _load_image(
+        self,
+        image_path: Optional[Path],
+        image_bytes: Optional[bytes]
+    ) -> Image.Image:
+        """Fully load image with PIL."""
+        img = self._open_image(image_path, image_bytes)
+        try:
+            # Force load to catch corruption
+            img.load()
+            return img
+        except Exception as e:
+            raise ImageCorruptedError(
+                message=f"Failed to load image: {str(e)}"
+            )
+    
     def _check_format(self, image: Image.Image, filename: str) -> None:
         """Check if image format is supported."""
         # Get format from PIL
@@ -235,9 +318,10 @@ class ImageValidator:
         else:
             gray = cv_image
         
-        # Check for all black or all white
-        mean_val = np.mean(gray)
-        std_val = np.std(gray)
+        # Check for all black or all white (no float64 copy of the image)
+        mean, std = cv2.meanStdDev(gray)
+        mean_val = float(mean[0][0])
+        std_val = float(std[0][0])
         
         if std_val < 5:  # Very uniform image
             if mean_val < 10:
@@ -249,7 +333,29 @@ class ImageValidator:
                     message="Image appears to be blank (all white)"
                 )
     
-    def get_dpi(self, pil_image: Image.Image) -> Optional[int]:
+    @staticmethod
+    def original_size(
+        pil_image: Optional[Image.Image],
+        cv_image: Optional[np.ndarray],
+        reduction: int = 1
+    ) -> Dict[str, int]:
+        """Upright size of the uploaded image."""
+        # Decoded image first: it is upright, the PIL header may not be
+        if cv_image is not None and reduction == 1:
+            h, w = cv_image.shape[:2]
+            return {"width": w, "height": h}
+        
+        if pil_image:
+            w, h = pil_image.size
+            # EXIF orientations 5-8 swap width and height
+            if pil_image.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+                w, h = h, w
+            return {"width": w, "height": h}
+        
+        return {}
+    
+    @staticmethod
+    def get_dpi(pil_image: Image.Image) -> Optional[int]:
         """Extract DPI from image metadata if available."""
         try:
             dpi = pil_image.info.get("dpi")
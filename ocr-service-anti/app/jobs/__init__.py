@@ -0,0 +1,6 @@
+"""Asynchronous OCR jobs: background workers and durable result storage."""
+
+from app.jobs.store import JobStore, Job
+from app.jobs.manager import JobManager
+
+__all__ = ["JobStore", "Job", "JobManager"]
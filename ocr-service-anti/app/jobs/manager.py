@@ -0,0 +1,218 @@
+"""
+Job Manager
+
+Runs OCR jobs in the background so POST /ocr/jobs can answer as soon as
+the upload is on disk:
+- A fixed pool of worker tasks takes queued jobs and runs the pipeline
+- The queue is bounded: past job_queue_size waiting jobs, uploads are
+  rejected with ServiceBusyError before they are spooled to disk
+- Stage progress is written to the store after every layer
+- The app starts the workers on startup, resuming unfinished jobs, and
+  stops them on shutdown (app.main lifespan); expired jobs are evicted
+"""
+
+import asyncio
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.exceptions import OCRServiceError, ServiceBusyError
+from app.jobs.store import JobStore, Job, QUEUED, RUNNING, SUCCEEDED, FAILED
+
+logger = get_logger(__name__)
+
+
+class JobManager:
+    """
+    Queues OCR jobs and runs them on a pool of worker tasks.
+
+    Workers go through OCRPipeline.process, so jobs share the pipeline's
+    thread pool and in-flight cap with synchronous requests; a worker
+    waits in line for a slot rather than being rejected.
+    """
+
+    def __init__(
+        self,
+        pipeline,
+        store: Optional[JobStore] = None,
+        upload_dir: Optional[Path] = None,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None
+    ):
+        self.pipeline = pipeline
+        self.store = store or JobStore(settings.job_dir / "jobs.db", settings.job_ttl_seconds)
+        self.upload_dir = upload_dir or settings.job_dir / "uploads"
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = workers or settings.job_workers
+        self.queue_size = queue_size or settings.job_queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start the workers (needs a running loop) and resume unfinished jobs."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._evict_expired()
+
+        resumed = 0
+        for job in self.store.unfinished():
+            if job.upload_path.exists():
+                self.store.update(job.job_id, status=QUEUED)
+                self._queue.put_nowait(job.job_id)
+                resumed += 1
+            else:
+                self.store.update(job.job_id, status=FAILED, error={
+                    "error_code": "JOB_UPLOAD_LOST",
+                    "message": "Upload was lost before the job could run"
+                })
+
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"ocr-job-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Job workers started: {self.workers} (resumed {resumed} jobs)")
+
+    async def stop(self) -> None:
+        """
+        Cancel the workers and close the store. Jobs cut short go back to
+        queued with their upload kept, and run again on the next start.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.store.close()
+        logger.info("Job workers stopped")
+
+    def upload_path(self, filename: str) -> Path:
+        """Fresh path in the upload directory for a job's image."""
+        return self.upload_dir / f"{uuid.uuid4().hex}{Path(filename).suffix}"
+
+    def find(self, idempotency_key: Optional[str]) -> Optional[Job]:
+        """Live job created with this idempotency key, if any."""
+        return self.store.find_by_key(idempotency_key)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    def check_capacity(self) -> None:
+        """
+        Refuse new jobs while the queue is full.
+
+        Raises:
+            ServiceBusyError: If job_queue_size jobs are waiting for a worker
+        """
+        self.start()
+        queued = self._queue.qsize()
+        if queued >= self.queue_size:
+            logger.warning(f"[OCR-JOB-REJECTED] {queued} jobs queued")
+            raise ServiceBusyError(
+                message=f"Service busy: {queued} jobs queued, try again later",
+                details={"queued_jobs": queued, "job_queue_size": self.queue_size}
+            )
+
+    def submit(
+        self,
+        upload_path: Path,
+        filename: str,
+        languages: Optional[str] = None,
+        skip_enhancement: bool = False,
+        idempotency_key: Optional[str] = None
+    ) -> Tuple[Job, bool]:
+        """
+        Queue a job for an image already moved to upload_path.
+
+        Returns:
+            (job, created); with a known idempotency key the existing job is
+            returned, created is False and upload_path is deleted
+
+        Raises:
+            ServiceBusyError: If the queue is full (upload_path is deleted)
+        """
+        self.start()
+        self._evict_expired()
+
+        if self.find(idempotency_key) is None:
+            try:
+                self.check_capacity()
+            except ServiceBusyError:
+                upload_path.unlink(missing_ok=True)
+                raise
+
+        job, created = self.store.create(
+            job_id=uuid.uuid4().hex,
+            filename=filename,
+            upload_path=upload_path,
+            params={"languages": languages, "skip_enhancement": skip_enhancement},
+            idempotency_key=idempotency_key
+        )
+        if created:
+            self._queue.put_nowait(job.job_id)
+            logger.info(f"Job {job.job_id} queued: {filename}")
+        else:
+            upload_path.unlink(missing_ok=True)
+            logger.info(f"Job {job.job_id} reused for idempotency key {idempotency_key}")
+        return job, created
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.exception(f"Job {job_id} worker error: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = self.store.get(job_id)
+        if job is None or job.status not in (QUEUED, RUNNING):
+            return
+
+        self.store.update(job_id, status=RUNNING, stage_times={})
+
+        def progress(stage_times: Dict[str, float]) -> None:
+            self.store.update(job_id, stage_times=stage_times)
+
+        try:
+            response = await self.pipeline.process(
+                image_path=job.upload_path,
+                filename=job.filename,
+                languages=job.params.get("languages"),
+                skip_enhancement=job.params.get("skip_enhancement", False),
+                progress=progress,
+                wait_for_slot=True
+            )
+
+            # Serializing and writing the full result is the one large write
+            await asyncio.to_thread(
+                self.store.update,
+                job_id,
+                status=SUCCEEDED,
+                stage_times=response.meta.stage_times,
+                result=response.model_dump(mode="json")
+            )
+            logger.info(f"Job {job_id} succeeded")
+        except asyncio.CancelledError:
+            self.store.update(job_id, status=QUEUED, stage_times={})
+            logger.info(f"Job {job_id} interrupted by shutdown, requeued")
+            raise
+        except OCRServiceError as e:
+            self.store.update(job_id, status=FAILED, error=e.to_dict())
+            logger.warning(f"Job {job_id} failed: {e.message}")
+        except Exception as e:
+            self.store.update(job_id, status=FAILED, error={
+                "error_code": "INTERNAL_ERROR",
+                "message": str(e)
+            })
+            logger.exception(f"Job {job_id} failed: {e}")
+
+        # Kept if the worker is cancelled, so the job resumes on restart
+        job.upload_path.unlink(missing_ok=True)
+
+    def _evict_expired(self) -> None:
+        for job in self.store.purge_expired():
+            job.upload_path.unlink(missing_ok=True)
@@ -0,0 +1,199 @@
+"""
+Job Store
+
+Durable state of asynchronous OCR jobs in a local SQLite database:
+- Status and per-stage progress while the pipeline runs
+- The OCR response (JSON) or error once it finishes
+- Idempotency keys, so a retried upload finds its existing job
+- TTL eviction of old jobs
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    idempotency_key TEXT UNIQUE,
+    status TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    upload_path TEXT NOT NULL,
+    params TEXT NOT NULL,
+    stage_times TEXT NOT NULL DEFAULT '{}',
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+
+@dataclass
+class Job:
+    """One asynchronous OCR job."""
+    job_id: str
+    status: str
+    filename: str
+    upload_path: Path
+    params: Dict[str, Any] = field(default_factory=dict)
+    stage_times: Dict[str, float] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Dict[str, Any]] = None
+    idempotency_key: Optional[str] = None
+    created_at: float = 0.0
+    updated_at: float = 0.0
+    expires_at: float = 0.0
+
+
+class JobStore:
+    """
+    SQLite-backed job records.
+
+    One connection is shared and serialized with a lock; every write is a
+    single short statement. WAL with synchronous=NORMAL commits without an
+    fsync (a power loss may drop the last progress updates, never corrupt
+    the database), so progress writes from the event loop stay cheap.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(SCHEMA)
+
+    def create(
+        self,
+        job_id: str,
+        filename: str,
+        upload_path: Path,
+        params: Dict[str, Any],
+        idempotency_key: Optional[str] = None
+    ) -> Tuple[Job, bool]:
+        """
+        Record a new queued job.
+
+        Returns:
+            (job, created); created is False when a live job already holds
+            the idempotency key, and that job is returned instead
+        """
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT INTO jobs (job_id, idempotency_key, status, filename, upload_path, "
+                    "params, created_at, updated_at, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, idempotency_key, QUEUED, filename, str(upload_path),
+                     json.dumps(params), now, now, now + self.ttl_seconds)
+                )
+        except sqlite3.IntegrityError:
+            existing = self.find_by_key(idempotency_key)
+            if existing is not None:
+                return existing, False
+            # The key belonged to an expired job: evict it and retry
+            self.purge_expired()
+            return self.create(job_id, filename, upload_path, params, idempotency_key)
+        return self.get(job_id), True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Live (unexpired) job by id."""
+        return self._fetch_one("job_id = ?", job_id)
+
+    def find_by_key(self, idempotency_key: Optional[str]) -> Optional[Job]:
+        """Live (unexpired) job by idempotency key."""
+        if not idempotency_key:
+            return None
+        return self._fetch_one("idempotency_key = ?", idempotency_key)
+
+    def unfinished(self) -> List[Job]:
+        """Queued or running jobs, oldest first (to resume after a restart)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (QUEUED, RUNNING)
+            ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def update(self, job_id: str, **values: Any) -> None:
+        """
+        Update status, stage_times, result or error of a job.
+
+        Finishing a job (result or error) restarts its TTL.
+        """
+        now = time.time()
+        values["updated_at"] = now
+        if "result" in values or "error" in values:
+            values["expires_at"] = now + self.ttl_seconds
+        for key in ("stage_times", "result", "error"):
+            if key in values and values[key] is not None:
+                values[key] = json.dumps(values[key], ensure_ascii=False)
+
+        columns = ", ".join(f"{key} = ?" for key in values)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE jobs SET {columns} WHERE job_id = ?",
+                (*values.values(), job_id)
+            )
+
+    def purge_expired(self) -> List[Job]:
+        """Delete expired jobs and return them (their uploads may need removing)."""
+        now = time.time()
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE expires_at <= ?", (now,)
+            ).fetchall()
+            self._conn.execute("DELETE FROM jobs WHERE expires_at <= ?", (now,))
+        if rows:
+            logger.info(f"Evicted {len(rows)} expired OCR jobs")
+        return [self._to_job(row) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _fetch_one(self, where: str, value: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT * FROM jobs WHERE {where} AND expires_at > ?",
+                (value, time.time())
+            ).fetchone()
+        return self._to_job(row) if row is not None else None
+
+    @staticmethod
+    def _to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            job_id=row["job_id"],
+            status=row["status"],
+            filename=row["filename"],
+            upload_path=Path(row["upload_path"]),
+            params=json.loads(row["params"]),
+            stage_times=json.loads(row["stage_times"]),
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=json.loads(row["error"]) if row["error"] else None,
+            idempotency_key=row["idempotency_key"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            expires_at=row["expires_at"],
+        )
@@ -10,13 +10,22 @@ Purpose: Detect document structure WITHOUT understanding meaning
 
 NO NLP, NO field extraction, NO medical understanding.
 Only structural analysis.
+
+Morphology cost grows with pixel count and kernel size, so tables and text
+regions are found on the binary image reduced to layout_max_side (any ink
+in a cell keeps it inked, so thin rules survive); block coordinates are
+mapped back to full resolution for OCR.
 """
 
+import math
+
 import numpy as np
 import cv2
 from typing import List, Dict, Any, Tuple, Optional
 from dataclasses import dataclass, field
 
+from app.core.config import settings
+from app.core.budget import SKIP_QR_DETECTION
 from app.core.logging import get_logger
 from app.core.exceptions import LayoutDetectionError
 from app.schemas.responses import BlockType
@@ -61,6 +70,7 @@ class LayoutDetector:
         self.min_block_area = 100  # Minimum area for a valid block
         self.header_ratio = 0.15  # Top 15% is potential header
         self.footer_ratio = 0.15  # Bottom 15% is potential footer
+        self.max_side = settings.layout_max_side
     
     def detect(self, context) -> 'PipelineContext':
         """
@@ -97,19 +107,22 @@ class LayoutDetector:
             
             h, w = binary.shape[:2]
             
+            # Morphology on a reduced copy, blocks in full-resolution pixels
+            binary, factor = self._reduce(binary)
+            
             # Detect different types of blocks
             blocks = []
             
             # Detect QR codes first
-            qr_blocks = self._detect_qr_codes(context.cv_image)
+            qr_blocks = self._qr_blocks(context)
             blocks.extend(qr_blocks)
             
             # Detect tables
-            table_blocks = self._detect_tables(binary, w, h)
+            table_blocks = self._detect_tables(binary, w, h, factor)
             blocks.extend(table_blocks)
             
             # Detect text regions
-            text_blocks = self._detect_text_regions(binary, w, h, table_blocks)
+            text_blocks = self._detect_text_regions(binary, w, h, table_blocks, factor)
             
             # Classify text blocks as header/footer/text
             classified_blocks = self._classify_blocks(text_blocks, h)
@@ -121,7 +134,7 @@ class LayoutDetector:
             # Store in context
             context.layout_blocks = blocks
             
-            logger.info(f"Detected {len(blocks)} layout blocks")
+            logger.info(f"Detected {len(blocks)} layout blocks (analyzed at 1/{factor} scale)")
             
             return context
             
@@ -131,21 +144,116 @@ class LayoutDetector:
                 message=f"Layout detection failed: {str(e)}"
             )
     
+    def detect_qr_only(self, context) -> 'PipelineContext':
+        """
+        Layout for whole-page OCR (fast path or latency budget): QR codes
+        only, the page is OCR'd as a whole.
+        
+        Args:
+            context: PipelineContext with cv_image
+        
+        Returns:
+            Updated context with the QR code layout_blocks
+        """
+        context.layout_blocks = self._qr_blocks(context)
+        logger.info(f"Whole-page layout: {len(context.layout_blocks)} QR codes")
+        return context
+    
+    def detect_qr_codes(self, context) -> 'PipelineContext':
+        """
+        Decode QR codes on the original image.
+        
+        Needs only cv_image, so the pipeline runs it next to quality
+        analysis; detect() then reuses the result.
+        
+        Args:
+            context: PipelineContext with cv_image
+        
+        Returns:
+            Updated context with qr_blocks
+        """
+        context.qr_blocks = self._qr_codes_within_budget(context)
+        return context
+    
+    def _qr_blocks(self, context) -> List[LayoutBlock]:
+        """QR blocks found by detect_qr_codes, or detected now."""
+        qr_blocks = getattr(context, "qr_blocks", None)
+        if qr_blocks is None:
+            qr_blocks = self._qr_codes_within_budget(context)
+        return list(qr_blocks)
+    
+    def _qr_codes_within_budget(self, context) -> List[LayoutBlock]:
+        """QR codes, unless the request's latency budget has no room for them."""
+        budget = getattr(context, "budget", None)
+        if budget is not None and not budget.afford("qr_detection"):
+            budget.degrade(SKIP_QR_DETECTION)
+            logger.info("QR detection skipped (latency budget)")
+            return []
+        return self._detect_qr_codes(context.cv_image)
+    
+    def _reduce(self, binary: np.ndarray) -> Tuple[np.ndarray, int]:
+        """
+        Shrink a binary image (ink = 255) by an integer factor so its long
+        side is at most max_side.
+        
+        Every output pixel covers a factor x factor cell and is inked if
+        any pixel of the cell is, so one-pixel rules and strokes are kept.
+        
+        Returns:
+            (reduced binary, factor); factor 1 returns the image unchanged
+        """
+        factor = math.ceil(max(binary.shape[:2]) / self.max_side) if self.max_side > 0 else 1
+        if factor <= 1:
+            return binary, 1
+        
+        # Pad to a multiple of the factor so INTER_AREA averages whole cells
+        h, w = binary.shape[:2]
+        pad_h, pad_w = -h % factor, -w % factor
+        if pad_h or pad_w:
+            binary = cv2.copyMakeBorder(binary, 0, pad_h, 0, pad_w, cv2.BORDER_CONSTANT, value=0)
+        
+        small = cv2.resize(
+            binary,
+            ((w + pad_w) // factor, (h + pad_h) // factor),
+            interpolation=cv2.INTER_AREA
+        )
+        _, small = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY)
+        return small, factor
+    
+    @staticmethod
+    def _to_full_resolution(
+        rect: Tuple[int, int, int, int],
+        factor: int,
+        img_width: int,
+        img_height: int
+    ) -> Tuple[int, int, int, int]:
+        """Reduced-image rectangle to the full-resolution pixels it covers."""
+        x, y, w, h = rect
+        x0, y0 = x * factor, y * factor
+        x1 = min((x + w) * factor, img_width)
+        y1 = min((y + h) * factor, img_height)
+        return x0, y0, x1 - x0, y1 - y0
+    
     def _detect_tables(
         self, 
         binary: np.ndarray, 
         img_width: int, 
-        img_height: int
+        img_height: int,
+        factor: int = 1
     ) -> List[LayoutBlock]:
         """
         Detect table structures using line detection.
+        
+        binary may be reduced by factor; img_width and img_height are the
+        full-resolution size the returned blocks are in.
         """
         tables = []
+        reduced_height, reduced_width = binary.shape[:2]
         
         # Detect horizontal lines
         horizontal_kernel = cv2.getStructuringElement(
             cv2.MORPH_RECT, 
-            (img_width // 10, 1)
+            (reduced_width // 10, 1)
         )
         horizontal_lines = cv2.morphologyEx(
             binary, 
@@ -157,7 +265,7 @@ class LayoutDetector:
         # Detect vertical lines
         vertical_kernel = cv2.getStructuringElement(
             cv2.MORPH_RECT, 
-            (1, img_height // 10)
+            (1, reduced_height // 10)
         )
         vertical_lines = cv2.morphologyEx(
             binary, 
@@ -177,7 +285,9 @@ class LayoutDetector:
         )
         
         for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
+            x, y, w, h = self._to_full_resolution(
+                cv2.boundingRect(contour), factor, img_width, img_height
+            )
             area = w * h
             
             # Filter by size - tables should be reasonably large
@@ -195,18 +305,22 @@ class LayoutDetector:
         binary: np.ndarray,
         img_width: int,
         img_height: int,
-        exclude_blocks: List[LayoutBlock]
+        exclude_blocks: List[LayoutBlock],
+        factor: int = 1
     ) -> List[LayoutBlock]:
         """
         Detect text regions using morphological operations.
+        
+        binary may be reduced by factor; exclude_blocks and the returned
+        blocks are in full-resolution pixels (img_width x img_height).
         """
         # Create mask of areas to exclude (tables, etc.)
         exclude_mask = np.zeros(binary.shape, dtype=np.uint8)
         for block in exclude_blocks:
             cv2.rectangle(
                 exclude_mask,
-                (block.x, block.y),
-                (block.x + block.width, block.y + block.height),
+                (block.x // factor, block.y // factor),
+                ((block.x + block.width) // factor, (block.y + block.height) // factor),
                 255,
                 -1
             )
@@ -218,8 +332,17 @@ class LayoutDetector:
         )
         
         # Dilate to connect text into blocks
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (20, 5))
-        dilated = cv2.dilate(text_binary, kernel, iterations=3)
+        if factor == 1:
+            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (20, 5))
+            dilated = cv2.dilate(text_binary, kernel, iterations=3)
+        else:
+            # Three 20x5 passes reach as far as one 58x13 pass; scale that
+            # reach, since a per-pass kernel rounds to nothing at small scales
+            kernel = cv2.getStructuringElement(
+                cv2.MORPH_RECT,
+                (math.ceil(58 / factor), math.ceil(13 / factor))
+            )
+            dilated = cv2.dilate(text_binary, kernel)
         
         # Find text region contours
         contours, _ = cv2.findContours(
@@ -230,7 +353,9 @@ class LayoutDetector:
         
         text_blocks = []
         for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
+            x, y, w, h = self._to_full_resolution(
+                cv2.boundingRect(contour), factor, img_width, img_height
+            )
             area = w * h
             
             if area > self.min_block_area:
@@ -3,16 +3,38 @@ OCR Service - FastAPI Application
 A layer-by-layer OCR service for scanning complex Cambodian prescriptions.
 """
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.api.routes import router as api_router
+from app.api.routes import router as api_router, start_job_manager, stop_job_manager
 from app.api.training_routes import router as training_router
 from app.core.config import settings
-from app.core.logging import setup_logging
+from app.core.exceptions import OCRServiceError
+from app.core.logging import setup_logging, get_logger
+from app.intake.upload import max_request_bytes, too_large_error
 
 # Setup logging
 setup_logging()
+logger = get_logger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the OCR job workers for the lifetime of the app."""
+    # Startup: queued and interrupted jobs resume without waiting for a request
+    try:
+        await start_job_manager()
+    except OCRServiceError as e:
+        logger.error(f"OCR job workers not started: {e.message}")
+    
+    yield
+    
+    # Shutdown
+    await stop_job_manager()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -21,6 +43,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -32,6 +55,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+# Routes taking one image, whose request size max_image_size_mb bounds;
+# multi-file routes (e.g., /training/upload) are not limited here
+SINGLE_IMAGE_UPLOAD_PATHS = {"/api/v1/ocr", "/api/v1/ocr/jobs", "/api/v1/ocr/analyze"}
+
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """
+    Reject single-image uploads whose declared Content-Length exceeds the
+    limit before Starlette receives the body. Uploads without a
+    Content-Length are received in full and limited when spooled.
+    """
+    content_length = request.headers.get("content-length")
+    if (
+        request.method == "POST"
+        and request.url.path.rstrip("/") in SINGLE_IMAGE_UPLOAD_PATHS
+        and content_length
+        and content_length.isdigit()
+    ):
+        limit = max_request_bytes()
+        if int(content_length) > limit:
+            error = too_large_error(int(content_length), limit)
+            logger.warning(f"Rejected upload: {error.message}")
+            return JSONResponse(status_code=error.status_code, content={"detail": error.to_dict()})
+    return await call_next(request)
+
+
 # Include routers
 app.include_router(api_router, prefix="/api/v1")
 app.include_router(training_router, prefix="/api/v1/training")
@@ -1,5 +1,6 @@
 """Layer 5: OCR Extraction module."""
 
 from app.ocr.extractor import OCRExtractor
+from app.ocr.script import ScriptDetector, ScriptDecision
 
-__all__ = ["OCRExtractor"]
+__all__ = ["OCRExtractor", "ScriptDetector", "ScriptDecision"]
@@ -0,0 +1,123 @@
+"""
+Small-block coalescing for Layer 5.
+
+Layout analysis keeps every text region above a tiny area, so a page
+yields many single-line blocks (numbers, short Khmer fragments), each of
+which would cost its own Tesseract launch. Small blocks are stacked onto
+one composite canvas, separated by whitespace; the canvas gets one
+recognition call with the full language set, and each word is then
+handed back to the block it came from through the placement offsets.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+
+@dataclass
+class Placement:
+    """Where a source block sits on a composite canvas."""
+    index: int  # Position of the block in the extraction jobs
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+@dataclass
+class Composite:
+    """A canvas of stacked small blocks, OCR'd in one call."""
+    canvas: np.ndarray
+    placements: List[Placement] = field(default_factory=list)
+
+
+def pack_blocks(
+    images: Sequence[np.ndarray],
+    indices: Sequence[int],
+    gap: int,
+    max_height: int
+) -> List[Composite]:
+    """
+    Stack blocks top to bottom onto as few canvases as max_height allows.
+
+    Blocks keep their order, each starts on its own row, and consecutive
+    blocks are separated by gap pixels of background, so Tesseract never
+    joins text of two blocks into one line.
+
+    Args:
+        images: Block images (all grayscale or all BGR)
+        indices: Job index of each image
+        gap: Whitespace between (and around) blocks in pixels
+        max_height: Canvas height at which a new canvas is started
+
+    Returns:
+        Composites covering every block once
+    """
+    groups: List[List[int]] = []
+    height = gap
+    for i, image in enumerate(images):
+        needed = image.shape[0] + gap
+        if not groups or height + needed > max_height:
+            groups.append([])
+            height = gap
+        groups[-1].append(i)
+        height += needed
+
+    composites = []
+    for group in groups:
+        width = max(images[i].shape[1] for i in group) + 2 * gap
+        height = gap + sum(images[i].shape[0] + gap for i in group)
+        canvas = np.full(
+            (height, width) + images[group[0]].shape[2:],
+            _background(images[group[0]]),
+            dtype=images[group[0]].dtype
+        )
+
+        composite = Composite(canvas=canvas)
+        y = gap
+        for i in group:
+            h, w = images[i].shape[:2]
+            canvas[y:y + h, gap:gap + w] = images[i]
+            composite.placements.append(Placement(indices[i], gap, y, w, h))
+            y += h + gap
+        composites.append(composite)
+
+    return composites
+
+
+def assign_words(words: Sequence, composite: Composite) -> Dict[int, List]:
+    """
+    Hand composite words back to their blocks.
+
+    A word belongs to the placement its center falls in; its position is
+    moved to block-local coordinates. Words in the separators are noise
+    and dropped.
+
+    Args:
+        words: Recognized words with x, y, width, height (canvas coordinates)
+        composite: Composite they were read from
+
+    Returns:
+        Job index -> words (block-local coordinates)
+    """
+    assigned: Dict[int, List] = {p.index: [] for p in composite.placements}
+    for word in words:
+        cx = word.x + word.width / 2
+        cy = word.y + word.height / 2
+        for p in composite.placements:
+            if p.x <= cx < p.x + p.width and p.y <= cy < p.y + p.height:
+                word.x -= p.x
+                word.y -= p.y
+                assigned[p.index].append(word)
+                break
+    return assigned
+
+
+def _background(image: np.ndarray) -> int:
+    """Background intensity of a block: the median of its border pixels."""
+    border = np.concatenate([
+        image[0].reshape(-1), image[-1].reshape(-1),
+        image[:, 0].reshape(-1), image[:, -1].reshape(-1)
+    ])
+    return int(np.median(border))
@@ -3,6 +3,10 @@ Layer 5: OCR Extraction (Tesseract)
 
 Purpose: Extract text from image using Tesseract OCR
 - Multi-language support: eng+khm+fra
+- Small blocks coalesced into one Tesseract call per composite canvas
+- Per-call language selection (one script detection pass per block or
+  composite)
+- Calls run concurrently on a bounded thread pool
 - Word-level extraction with confidence scores
 - Bounding box for each word
 - Uses LSTM engine (OEM 1)
@@ -10,10 +14,13 @@ Purpose: Extract text from image using Tesseract OCR
 Tesseract returns raw truth, not meaning.
 """
 
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import cv2
 import pytesseract
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union
 from dataclasses import dataclass, field
 
 from app.core.config import settings, get_tessdata_path
@@ -23,10 +30,17 @@ from app.core.exceptions import (
     TesseractNotFoundError,
     LanguageNotAvailableError
 )
+from app.ocr.coalesce import Composite, pack_blocks, assign_words
+from app.ocr.script import ScriptDetector, ScriptDecision, MIXED
 from app.schemas.responses import BlockType
 
 logger = get_logger(__name__)
 
+# Page segmentation modes: layout blocks are uniform text, a whole page
+# (fast path, or no layout) needs Tesseract's own segmentation
+BLOCK_PSM = 6
+PAGE_PSM = 3
+
 
 @dataclass
 class OCRWord:
@@ -63,6 +77,12 @@ class OCRBlock:
     y: int = 0
     width: int = 0
     height: int = 0
+    languages: str = ""
+    script: str = ""
+    start_ms: float = 0.0
+    detect_ms: float = 0.0
+    ocr_ms: float = 0.0
+    call_blocks: int = 1  # Blocks recognized in the same Tesseract call
 
 
 class OCRExtractor:
@@ -76,6 +96,9 @@ class OCRExtractor:
     def __init__(self):
         self.tesseract_cmd = settings.tesseract_cmd
         self.default_languages = settings.default_languages
+        self.script_detector = ScriptDetector()
+        self.block_workers = settings.ocr_block_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
         
         # Set Tesseract path
         pytesseract.pytesseract.tesseract_cmd = self.tesseract_cmd
@@ -106,7 +129,8 @@ class OCRExtractor:
             languages: Override languages (e.g., "eng+khm")
         
         Returns:
-            Updated context with ocr_results
+            Updated context with ocr_results (in reading order),
+            ocr_calls, language_usage and block_times
         """
         logger.info("Extracting text with Tesseract OCR")
         
@@ -122,51 +146,86 @@ class OCRExtractor:
         tessdata_path = get_tessdata_path()
         
         try:
-            # Extract from each layout block
-            ocr_results = []
+            # Blocks to OCR in reading order: (image, offset, layout block)
+            jobs = []
+            for block in context.layout_blocks or []:
+                if block.type == BlockType.QR_CODE:
+                    # Skip QR codes - already decoded in layout
+                    continue
+                
+                # Extract region
+                x, y, w, h = block.x, block.y, block.width, block.height
+                jobs.append((image[y:y+h, x:x+w], (x, y), block))
+            if not jobs:
+                # No text blocks (fast path or empty layout) - OCR whole image
+                jobs.append((image, (0, 0), None))
+            
+            # Each Tesseract call is a subprocess, so threads overlap them
+            started = time.perf_counter()
+            
+            def run_task(task):
+                return self._run_task(task, jobs, lang, tessdata_path, started)
             
-            if context.layout_blocks:
-                for block in context.layout_blocks:
-                    if block.type == BlockType.QR_CODE:
-                        # Skip QR codes - already decoded in layout
-                        continue
-                    
-                    # Extract region
-                    x, y, w, h = block.x, block.y, block.width, block.height
-                    block_image = image[y:y+h, x:x+w]
-                    
-                    # OCR this block
-                    block_result = self._ocr_region(
-                        block_image, 
-                        lang, 
-                        tessdata_path,
-                        offset=(x, y)
-                    )
+            tasks = self._plan_tasks(jobs)
+            outputs = self._map(run_task, tasks)
+            wall_ms = (time.perf_counter() - started) * 1000
+            
+            # Back to job (reading) order
+            ocr_results: List[OCRBlock] = [None] * len(jobs)
+            osd_calls = 0
+            for output, decision in outputs:
+                osd_calls += decision.osd_calls
+                for index, block_result in output.items():
+                    ocr_results[index] = block_result
+            
+            for block_result, (_, _, block) in zip(ocr_results, jobs):
+                if block is not None:
                     block_result.block_type = block.type
-                    block_result.x = x
-                    block_result.y = y
-                    block_result.width = w
-                    block_result.height = h
-                    
-                    ocr_results.append(block_result)
-            else:
-                # No layout blocks - OCR whole image
-                block_result = self._ocr_region(
-                    image, 
-                    lang, 
-                    tessdata_path,
-                    offset=(0, 0)
-                )
-                ocr_results.append(block_result)
+                    block_result.x = block.x
+                    block_result.y = block.y
+                    block_result.width = block.width
+                    block_result.height = block.height
+                else:
+                    block_result.height, block_result.width = image.shape[:2]
             
             context.ocr_results = ocr_results
+            # Every Tesseract launch: recognition calls and OSD passes
+            context.ocr_calls = len(tasks) + osd_calls
+            context.language_usage = self._language_usage(ocr_results)
+            context.block_times = [
+                {
+                    "block": i,
+                    "languages": block.languages,
+                    "call_blocks": block.call_blocks,
+                    "start_ms": round(block.start_ms, 1),
+                    "detect_ms": round(block.detect_ms, 1),
+                    "ocr_ms": round(block.ocr_ms, 1),
+                }
+                for i, block in enumerate(ocr_results)
+            ]
             
             total_words = sum(
                 len(line.words) 
                 for block in ocr_results 
                 for line in block.lines
             )
-            logger.info(f"Extracted {total_words} words from {len(ocr_results)} blocks")
+            logger.info(
+                f"Extracted {total_words} words from {len(ocr_results)} blocks "
+                f"in {len(tasks)} Tesseract calls (+{osd_calls} script detection)"
+            )
+            if ocr_results:
+                block_ms = [b.detect_ms + b.ocr_ms for b in ocr_results]
+                slowest = int(np.argmax(block_ms))
+                logger.info(
+                    f"Block OCR: {wall_ms:.0f}ms wall for {sum(block_ms):.0f}ms of work on "
+                    f"{min(self.block_workers, len(tasks))} threads; "
+                    f"slowest block {slowest} ({block_ms[slowest]:.0f}ms)"
+                )
+            for languages_used, stats in context.language_usage.items():
+                logger.debug(
+                    f"  - {languages_used}: {stats['blocks']:.0f} blocks, "
+                    f"{stats['ocr_ms']:.0f}ms OCR, {stats['detect_ms']:.0f}ms detection"
+                )
             
             return context
             
@@ -176,23 +235,175 @@ class OCRExtractor:
                 message=f"OCR extraction failed: {str(e)}"
             )
     
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Thread pool shared by all requests, so concurrency stays bounded."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.block_workers,
+                thread_name_prefix="ocr-block"
+            )
+        return self._executor
+    
+    def _map(self, func, items: list) -> list:
+        """Apply func to items on the thread pool, results in item order."""
+        if self.block_workers > 1 and len(items) > 1:
+            return list(self._get_executor().map(func, items))
+        return [func(item) for item in items]
+    
+    def _choose_languages(self, image: np.ndarray, lang: str) -> ScriptDecision:
+        """Languages to read a block with (script detection pre-pass)."""
+        if settings.script_detection and image.size > 0:
+            return self.script_detector.detect(image, lang)
+        return ScriptDecision(script="", languages=lang)
+    
+    def _plan_tasks(
+        self,
+        jobs: List[Tuple[np.ndarray, Tuple[int, int], Any]]
+    ) -> List[Union[int, Composite]]:
+        """
+        Group blocks into Tesseract calls.
+        
+        Small text blocks (up to coalesce_max_block_height) are packed onto
+        composite canvases; every other block is its own call (a job index).
+        Small blocks are packed whatever their script, so composites are
+        read with the full language set (see _run_task).
+        """
+        if not settings.coalesce_blocks:
+            return list(range(len(jobs)))
+        
+        tasks: List[Union[int, Composite]] = []
+        small: List[int] = []
+        for i, (block_image, _, block) in enumerate(jobs):
+            if (
+                block is not None
+                and block.type != BlockType.TABLE
+                and block_image.size > 0
+                and block_image.shape[0] <= settings.coalesce_max_block_height
+            ):
+                small.append(i)
+            else:
+                tasks.append(i)
+        
+        if len(small) == 1:
+            tasks.append(small[0])
+        elif small:
+            tasks.extend(pack_blocks(
+                [jobs[i][0] for i in small],
+                small,
+                gap=settings.coalesce_gap,
+                max_height=settings.coalesce_max_canvas_height
+            ))
+        
+        return tasks
+    
+    def _run_task(
+        self,
+        task: Union[int, Composite],
+        jobs: List[Tuple[np.ndarray, Tuple[int, int], Any]],
+        lang: str,
+        tessdata_path: Optional[str],
+        started: float
+    ) -> Tuple[Dict[int, OCRBlock], ScriptDecision]:
+        """
+        Run one Tesseract call: a single block or a composite.
+        
+        A block read alone gets the languages of its own script detection
+        pass. A composite keeps the requested set without one: OSD names
+        the main script of the canvas, which need not hold for each block
+        (a Khmer fragment among Latin lines would lose khm).
+        start_ms is when the call left the queue, relative to started
+        (the start of the extraction), so block timings show the
+        critical path. Blocks of a composite share its detection and OCR
+        time in proportion to their area.
+        
+        Returns:
+            (job index -> OCRBlock in page coordinates, script decision)
+        """
+        start = time.perf_counter()
+        
+        if not isinstance(task, Composite):
+            block_image, offset, block = jobs[task]
+            decision = self._choose_languages(block_image, lang)
+            ocr_start = time.perf_counter()
+            psm = BLOCK_PSM if block is not None else PAGE_PSM
+            block_result = self._ocr_region(
+                block_image, decision.languages, tessdata_path, offset, psm
+            )
+            block_result.ocr_ms = (time.perf_counter() - ocr_start) * 1000
+            block_result.start_ms = (start - started) * 1000
+            self._set_languages(block_result, decision, 1.0)
+            return {task: block_result}, decision
+        
+        decision = ScriptDecision(script=MIXED, languages=lang, reason="composite canvas")
+        ocr_start = time.perf_counter()
+        words = self._recognize(task.canvas, decision.languages, tessdata_path)
+        ocr_ms = (time.perf_counter() - ocr_start) * 1000
+        
+        results = {}
+        assigned = assign_words(words, task)
+        total_area = sum(p.width * p.height for p in task.placements)
+        for p in task.placements:
+            share = p.width * p.height / total_area
+            block_result = self._build_block(assigned[p.index], jobs[p.index][1])
+            block_result.ocr_ms = ocr_ms * share
+            block_result.start_ms = (start - started) * 1000
+            block_result.call_blocks = len(task.placements)
+            self._set_languages(block_result, decision, share)
+            results[p.index] = block_result
+        return results, decision
+    
+    @staticmethod
+    def _set_languages(block: OCRBlock, decision: ScriptDecision, share: float) -> None:
+        """Record the languages a block was read with and its share of detection time."""
+        block.languages = decision.languages
+        block.script = decision.script
+        block.detect_ms = decision.elapsed_ms * share
+    
+    @staticmethod
+    def _language_usage(blocks: List[OCRBlock]) -> Dict[str, Dict[str, float]]:
+        """Blocks, OCR time and script detection time per language set used."""
+        usage: Dict[str, Dict[str, float]] = {}
+        for block in blocks:
+            stats = usage.setdefault(
+                block.languages,
+                {"blocks": 0, "ocr_ms": 0.0, "detect_ms": 0.0}
+            )
+            stats["blocks"] += 1
+            stats["ocr_ms"] += block.ocr_ms
+            stats["detect_ms"] += block.detect_ms
+        return usage
+    
     def _ocr_region(
         self,
         image: np.ndarray,
         lang: str,
         tessdata_path: Optional[str],
-        offset: Tuple[int, int] = (0, 0)
+        offset: Tuple[int, int] = (0, 0),
+        psm: int = BLOCK_PSM
     ) -> OCRBlock:
         """
         Run OCR on a specific image region.
         """
+        words = self._recognize(image, lang, tessdata_path, psm)
+        return self._build_block(words, offset)
+    
+    def _recognize(
+        self,
+        image: np.ndarray,
+        lang: str,
+        tessdata_path: Optional[str],
+        psm: int = BLOCK_PSM
+    ) -> List[OCRWord]:
+        """
+        Run Tesseract on an image and return its words (image coordinates).
+        """
         if image.size == 0:
-            return OCRBlock()
+            return []
         
         # Tesseract config
         config = [
             "--oem 1",  # LSTM engine
-            "--psm 6",  # Assume uniform block of text
+            f"--psm {psm}",  # 6: uniform block of text, 3: full page
         ]
         if tessdata_path:
             config.append(f"--tessdata-dir {tessdata_path}")
@@ -216,9 +427,7 @@ class OCRExtractor:
             raise
         
         # Parse results into structured format
-        offset_x, offset_y = offset
-        words_by_line: Dict[Tuple[int, int], List[OCRWord]] = {}
-        
+        words = []
         n_boxes = len(data['text'])
         for i in range(n_boxes):
             text = data['text'][i].strip()
@@ -228,23 +437,32 @@ class OCRExtractor:
             if not text or conf < 0:
                 continue
             
-            block_num = data['block_num'][i]
-            line_num = data['line_num'][i]
-            word_num = data['word_num'][i]
-            
-            word = OCRWord(
+            words.append(OCRWord(
                 text=text,
-                x=data['left'][i] + offset_x,
-                y=data['top'][i] + offset_y,
+                x=data['left'][i],
+                y=data['top'][i],
                 width=data['width'][i],
                 height=data['height'][i],
                 confidence=conf / 100.0,
-                block_num=block_num,
-                line_num=line_num,
-                word_num=word_num
-            )
+                block_num=data['block_num'][i],
+                line_num=data['line_num'][i],
+                word_num=data['word_num'][i]
+            ))
+        
+        return words
+    
+    @staticmethod
+    def _build_block(words: List[OCRWord], offset: Tuple[int, int]) -> OCRBlock:
+        """
+        Move words to page coordinates and group them into lines.
+        """
+        offset_x, offset_y = offset
+        words_by_line: Dict[Tuple[int, int], List[OCRWord]] = {}
+        for word in words:
+            word.x += offset_x
+            word.y += offset_y
             
-            key = (block_num, line_num)
+            key = (word.block_num, word.line_num)
             if key not in words_by_line:
                 words_by_line[key] = []
             words_by_line[key].append(word)
@@ -299,10 +517,4 @@ class OCRExtractor:
         Detect the primary script in an image.
         Returns: 'Khmer', 'Latin', or 'Mixed'
         """
-        try:
-            # Use Tesseract OSD (Orientation and Script Detection)
-            osd = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
-            script = osd.get('script', 'Latin')
-            return script
-        except Exception:
-            return 'Mixed'
+        return self.script_detector.detect(image, self.default_languages).script
@@ -0,0 +1,159 @@
+"""
+Script detection pre-pass for Layer 5.
+
+Decides per region whether Tesseract needs the Khmer model, the Latin
+models, or both, so each block is recognized with the smallest language
+set. Every LSTM model in the `lang` string is loaded and decoded for each
+word, so a Latin-only block read with eng+khm+fra pays for a Khmer pass
+it does not need.
+
+The decision is deliberately conservative: it narrows the language set
+only when Tesseract OSD names a script with enough confidence. Small
+blocks, OSD failures and low-confidence answers keep the full set, so a
+wrong guess can cost time but never drop a script the block contains.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import cv2
+import numpy as np
+import pytesseract
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# Languages each OSD script needs. Khmer prescriptions embed Latin drug
+# names and units, so Khmer blocks keep English.
+SCRIPT_LANGUAGES = {
+    "Khmer": ("khm", "eng"),
+    "Latin": ("eng", "fra"),
+}
+
+MIXED = "Mixed"
+
+# OSD gives up below 50 characters by default; blocks are often smaller
+OSD_CONFIG = "--psm 0 -c min_characters_to_try=10"
+
+
+@dataclass
+class ScriptDecision:
+    """Script of a region and the languages to recognize it with."""
+    script: str
+    languages: str
+    confidence: float = 0.0
+    reason: str = ""
+    elapsed_ms: float = 0.0
+    osd_calls: int = 0  # Tesseract OSD launches behind the decision
+
+
+def narrow_languages(requested: str, needed) -> str:
+    """
+    Restrict a Tesseract language string to the languages a script needs.
+
+    Keeps the requested order; falls back to the requested set when none
+    of its languages is needed (e.g., "fra" requested for a Khmer block).
+    """
+    kept = [lang for lang in requested.split("+") if lang in needed]
+    return "+".join(kept) if kept else requested
+
+
+class ScriptDetector:
+    """
+    Classifies the script of an image region with Tesseract OSD.
+
+    The region is binarized once to count text components and measure
+    their height; OSD then runs on a copy downsampled to
+    script_text_height, which is all it needs to tell scripts apart.
+    """
+
+    def __init__(
+        self,
+        min_confidence: Optional[float] = None,
+        text_height: Optional[int] = None,
+        min_components: Optional[int] = None
+    ):
+        self.min_confidence = (
+            settings.script_min_confidence if min_confidence is None else min_confidence
+        )
+        self.text_height = text_height or settings.script_text_height
+        self.min_components = (
+            settings.script_min_components if min_components is None else min_components
+        )
+
+    def detect(self, image: np.ndarray, languages: str) -> ScriptDecision:
+        """
+        Choose the languages for one region.
+
+        Args:
+            image: Region (grayscale or BGR)
+            languages: Requested language set (e.g., "eng+khm+fra")
+
+        Returns:
+            ScriptDecision; script is MIXED and languages is the requested
+            set whenever the script could not be decided
+        """
+        start = time.perf_counter()
+        decision = self._decide(image, languages)
+        decision.elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.debug(
+            f"Script {decision.script} ({decision.confidence:.1f}) -> "
+            f"{decision.languages}: {decision.reason}"
+        )
+        return decision
+
+    def _decide(self, image: np.ndarray, languages: str) -> ScriptDecision:
+        # Copied as detect_script_languages in tesserract-ocr-service-version-1
+        # (app/ocr_engine.py), which shares no code with this service; keep
+        # the two in step.
+        if image.size == 0:
+            return ScriptDecision(MIXED, languages, reason="empty region")
+
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        heights = self._component_heights(binary)
+        if len(heights) < self.min_components:
+            return ScriptDecision(MIXED, languages, reason="too little text")
+
+        # OSD only needs glyph shapes, not detail
+        factor = self.text_height / float(np.median(heights))
+        if factor < 1.0:
+            gray = cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+
+        try:
+            osd = pytesseract.image_to_osd(
+                gray,
+                config=OSD_CONFIG,
+                output_type=pytesseract.Output.DICT
+            )
+        except Exception as e:
+            return ScriptDecision(MIXED, languages, reason=f"OSD failed: {e}", osd_calls=1)
+
+        script = osd.get("script", "")
+        confidence = float(osd.get("script_conf", 0.0))
+        if script not in SCRIPT_LANGUAGES:
+            return ScriptDecision(MIXED, languages, confidence, f"unsupported script {script!r}", osd_calls=1)
+        if confidence < self.min_confidence:
+            return ScriptDecision(MIXED, languages, confidence, f"low confidence for {script}", osd_calls=1)
+
+        return ScriptDecision(
+            script,
+            narrow_languages(languages, SCRIPT_LANGUAGES[script]),
+            confidence,
+            "osd",
+            osd_calls=1
+        )
+
+    @staticmethod
+    def _component_heights(binary: np.ndarray) -> np.ndarray:
+        """Heights of the connected components that look like glyphs."""
+        _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        heights = stats[1:, cv2.CC_STAT_HEIGHT]
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        # Drop specks and ruling lines / frames spanning the region
+        glyphs = (areas >= 4) & (heights >= 3) & (heights < 0.9 * binary.shape[0])
+        return heights[glyphs]
@@ -10,7 +10,9 @@ Purpose: Improve OCR accuracy before Tesseract
 - Resize to optimal DPI
 
 Rule: NEVER destroy text just to make it pretty.
-Preprocessing is dynamic, based on Layer 2 output.
+Preprocessing is dynamic, based on Layer 2 output and, for requests with
+a deadline, on the latency budget left (NL-means denoising is downgraded
+to a median filter and sharpening skipped when they do not fit).
 """
 
 import numpy as np
@@ -18,6 +20,7 @@ import cv2
 from typing import Optional, Tuple
 
 from app.core.config import settings
+from app.core.budget import DENOISE_MEDIAN, SKIP_SHARPENING
 from app.core.logging import get_logger
 from app.core.exceptions import PreprocessingError
 
@@ -50,6 +53,7 @@ class ImageEnhancer:
         
         image = context.cv_image.copy()
         quality = context.quality_metrics or {}
+        budget = getattr(context, "budget", None)
         
         try:
             # Step 1: Deskew if needed
@@ -67,8 +71,13 @@ class ImageEnhancer:
             
             # Step 3: Denoise if needed (before contrast enhancement)
             if quality.get("needs_denoising", False):
-                gray = self._denoise(gray)
-                logger.debug("Applied denoising")
+                if budget is None or budget.afford("denoise"):
+                    gray = self._denoise(gray)
+                    logger.debug("Applied denoising")
+                else:
+                    gray = cv2.medianBlur(gray, 3)
+                    budget.degrade(DENOISE_MEDIAN)
+                    logger.debug("Applied median denoising (latency budget)")
             
             # Step 4: Enhance contrast if needed
             if quality.get("needs_contrast_enhancement", False):
@@ -77,8 +86,12 @@ class ImageEnhancer:
             
             # Step 5: Sharpen if image is blurry
             if quality.get("needs_sharpening", False):
-                gray = self._sharpen(gray)
-                logger.debug("Applied sharpening")
+                if budget is None or budget.afford("sharpen"):
+                    gray = self._sharpen(gray)
+                    logger.debug("Applied sharpening")
+                else:
+                    budget.degrade(SKIP_SHARPENING)
+                    logger.debug("Skipped sharpening (latency budget)")
             
             # Step 6: Adaptive thresholding for binarization
             # Keep both versions - original gray and binarized
@@ -1,5 +1,6 @@
 """Layer 2: Image Quality Analysis module."""
 
 from app.quality.analyzer import QualityAnalyzer
+from app.quality.skew import estimate_skew_angle
 
-__all__ = ["QualityAnalyzer"]
+__all__ = ["QualityAnalyzer", "estimate_skew_angle"]
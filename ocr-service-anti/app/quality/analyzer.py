@@ -8,6 +8,12 @@ Purpose: Decide how aggressive preprocessing should be
 - Skew angle detection
 
 Output controls the preprocessing layer behavior.
+
+Blur, noise and contrast come from one pass over the full-resolution
+grayscale image: one 16-bit Laplacian serves blur and noise, and its
+median is read from a histogram. Thumbnail estimates drifted across the
+thresholds behind the too-blurry rejection and the fast path, so these
+scores stay exact. Skew runs on a copy reduced to quality_thumbnail_side.
 """
 
 import numpy as np
@@ -17,9 +23,13 @@ from typing import Dict, Any, Tuple
 from app.core.config import settings
 from app.core.logging import get_logger
 from app.core.exceptions import QualityAnalysisError, ImageTooBlurryError
+from app.quality.skew import estimate_skew_angle
 
 logger = get_logger(__name__)
 
+# MAD of a normal distribution, in standard deviations
+MAD_TO_SIGMA = 0.6745
+
 
 class QualityAnalyzer:
     """
@@ -37,6 +47,7 @@ class QualityAnalyzer:
         self.blur_threshold_high = settings.blur_threshold_high
         self.contrast_threshold_low = settings.contrast_threshold_low
         self.contrast_threshold_high = settings.contrast_threshold_high
+        self.thumbnail_side = settings.quality_thumbnail_side
     
     def analyze(self, context) -> 'PipelineContext':
         """
@@ -58,29 +69,17 @@ class QualityAnalyzer:
         else:
             gray = cv_image
         
-        # Analyze blur
-        blur_score = self._calculate_blur_score(gray)
+        # Blur, noise and contrast in one pass
+        blur_score, noise_level, contrast_score = self._measure(gray)
         blur_level = self._classify_blur(blur_score)
-        
-        # Analyze contrast
-        contrast_score = self._calculate_contrast_score(gray)
         contrast_level = self._classify_contrast(contrast_score)
         
         # Detect skew angle
         skew_angle = self._detect_skew_angle(gray)
         
-        # Estimate DPI if not available
-        dpi = None
-        if context.pil_image:
-            from app.intake.validator import ImageValidator
-            dpi = ImageValidator().get_dpi(context.pil_image)
-        
         # Check for grayscale
         is_grayscale = len(cv_image.shape) == 2 or cv_image.shape[2] == 1
         
-        # Estimate noise level
-        noise_level = self._estimate_noise(gray)
-        
         # Build quality metrics
         context.quality_metrics = {
             "blur": blur_level,
@@ -88,7 +87,6 @@ class QualityAnalyzer:
             "contrast": contrast_level,
             "contrast_score": contrast_score,
             "skew_angle": skew_angle,
-            "dpi": dpi,
             "is_grayscale": is_grayscale,
             "noise_level": noise_level,
             "needs_deskew": abs(skew_angle) > 0.5,
@@ -112,14 +110,37 @@ class QualityAnalyzer:
         
         return context
     
-    def _calculate_blur_score(self, gray: np.ndarray) -> float:
+    def _measure(self, gray: np.ndarray) -> Tuple[float, float, float]:
         """
-        Calculate blur score using Laplacian variance.
-        Higher score = sharper image.
+        Blur score, noise level and contrast score of a grayscale image.
+        
+        Blur is the Laplacian variance (higher = sharper), noise the
+        median absolute Laplacian (robust to edges), contrast the standard
+        deviation of intensities. A uint8 Laplacian fits in 16 bits, so the
+        values equal those of a float64 Laplacian.
         """
-        laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-        variance = laplacian.var()
-        return float(variance)
+        laplacian = cv2.Laplacian(gray, cv2.CV_16S)
+        _, lap_std = cv2.meanStdDev(laplacian)
+        _, gray_std = cv2.meanStdDev(gray)
+        noise = self._median_abs(laplacian) / MAD_TO_SIGMA
+        
+        return float(lap_std[0, 0]) ** 2, noise, float(gray_std[0, 0])
+    
+    @staticmethod
+    def _median_abs(laplacian: np.ndarray) -> float:
+        """Median of |laplacian| from a histogram (values are small integers)."""
+        # |laplacian| saturated to 8 bits: exact unless the median reaches 255
+        hist = cv2.calcHist([cv2.convertScaleAbs(laplacian)], [0], None, [256], [0, 256])
+        cumulative = np.cumsum(hist.ravel())
+        n = int(cumulative[-1])
+        # Mean of the middle two sorted values, as np.median
+        low = np.searchsorted(cumulative, (n - 1) // 2, side="right")
+        high = np.searchsorted(cumulative, n // 2, side="right")
+        if high >= 255:
+            cumulative = np.cumsum(np.bincount(np.abs(laplacian).ravel()))
+            low = np.searchsorted(cumulative, (n - 1) // 2, side="right")
+            high = np.searchsorted(cumulative, n // 2, side="right")
+        return float(low + high) / 2.0
     
     def _classify_blur(self, score: float) -> str:
         """Classify blur level from score."""
@@ -130,13 +151,6 @@ class QualityAnalyzer:
         else:
             return "high"  # Very blurry
     
-    def _calculate_contrast_score(self, gray: np.ndarray) -> float:
-        """
-        Calculate contrast score using standard deviation.
-        Higher score = more contrast.
-        """
-        return float(np.std(gray))
-    
     def _classify_contrast(self, score: float) -> str:
         """Classify contrast level from score."""
         if score < self.contrast_threshold_low:
@@ -148,63 +162,29 @@ class QualityAnalyzer:
     
     def _detect_skew_angle(self, gray: np.ndarray) -> float:
         """
-        Detect document skew angle using Hough transform.
+        Detect document skew angle on a copy reduced to thumbnail_side.
         Returns angle in degrees.
         """
         try:
-            # Edge detection
-            edges = cv2.Canny(gray, 50, 150, apertureSize=3)
-            
-            # Hough transform
-            lines = cv2.HoughLinesP(
-                edges,
-                rho=1,
-                theta=np.pi / 180,
-                threshold=100,
-                minLineLength=100,
-                maxLineGap=10
-            )
-            
-            if lines is None or len(lines) == 0:
-                return 0.0
-            
-            # Calculate angles
-            angles = []
-            for line in lines:
-                x1, y1, x2, y2 = line[0]
-                if x2 - x1 != 0:
-                    angle = np.degrees(np.arctan((y2 - y1) / (x2 - x1)))
-                    # Only consider near-horizontal lines
-                    if abs(angle) < 45:
-                        angles.append(angle)
-            
-            if not angles:
-                return 0.0
-            
-            # Use median angle (robust to outliers)
-            median_angle = float(np.median(angles))
+            angle = estimate_skew_angle(gray, max_angle=45.0, max_side=self.thumbnail_side)
             
             # Clamp to reasonable range
-            return max(-45.0, min(45.0, median_angle))
+            return max(-45.0, min(45.0, angle))
             
         except Exception as e:
             logger.warning(f"Skew detection failed: {e}")
             return 0.0
     
-    def _estimate_noise(self, gray: np.ndarray) -> float:
+    def is_clean(self, quality_metrics: Dict[str, Any]) -> bool:
         """
-        Estimate noise level using median absolute deviation.
+        True if every metric is in its good band: sharp, normal contrast,
+        low noise and no skew, so no enhancement step would run.
         """
-        try:
-            # Apply Laplacian to detect noise
-            laplacian = cv2.Laplacian(gray, cv2.CV_64F)
-            
-            # Use MAD (Median Absolute Deviation) as robust estimator
-            sigma = np.median(np.abs(laplacian)) / 0.6745
-            
-            return float(sigma)
-        except Exception:
-            return 0.0
+        return (
+            quality_metrics.get("blur") == "low"
+            and quality_metrics.get("contrast") == "ok"
+            and not any(self.get_preprocessing_recommendations(quality_metrics).values())
+        )
     
     def get_preprocessing_recommendations(
         self, 
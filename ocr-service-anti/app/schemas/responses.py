@@ -2,6 +2,7 @@
 Response schemas for the OCR Service API.
 """
 
+from datetime import datetime
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel, Field
 from enum import Enum
@@ -142,6 +143,46 @@ class ProcessingMeta(BaseModel):
         default_factory=dict,
         description="Original image dimensions"
     )
+    decode_reduction: int = Field(
+        default=1,
+        description="Image was decoded at 1/decode_reduction scale; bounding boxes are in original coordinates"
+    )
+    processing_path: str = Field(
+        default="full",
+        description="'fast' (clean scan: enhancement and text layout skipped, whole-page OCR) or 'full'"
+    )
+    skipped_stages: List[str] = Field(
+        default_factory=list,
+        description="Pipeline stages that were skipped"
+    )
+    cached_stages: List[str] = Field(
+        default_factory=list,
+        description="Stages whose outputs were reused from an earlier request on the same image"
+    )
+    deadline_ms: Optional[float] = Field(
+        default=None,
+        description="Latency budget requested for this image"
+    )
+    deadline_met: Optional[bool] = Field(
+        default=None,
+        description="Whether the response was built within deadline_ms"
+    )
+    degradations: List[str] = Field(
+        default_factory=list,
+        description="Work downgraded or skipped to meet the deadline: denoise_median, skip_sharpening, skip_qr_detection, whole_page_ocr"
+    )
+    ocr_calls: int = Field(
+        default=0,
+        description="Tesseract launches: recognition calls plus script detection (OSD) passes; coalesced small blocks share one recognition call and skip OSD"
+    )
+    language_usage: Dict[str, Dict[str, float]] = Field(
+        default_factory=dict,
+        description="Per language set used: blocks, OCR time (ocr_ms) and script detection time (detect_ms)"
+    )
+    block_times: List[Dict[str, Any]] = Field(
+        default_factory=list,
+        description="Per OCR'd block in reading order: languages, call_blocks (blocks sharing its Tesseract call), start_ms (offset into OCR extraction), detect_ms and ocr_ms"
+    )
 
 
 class OCRResponse(BaseModel):
@@ -163,6 +204,43 @@ class OCRResponse(BaseModel):
     )
 
 
+class JobStatus(str, Enum):
+    """State of an asynchronous OCR job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobResponse(BaseModel):
+    """Status, progress and (when done) result of an asynchronous OCR job."""
+    
+    job_id: str = Field(description="Job identifier for GET /ocr/jobs/{job_id}")
+    status: JobStatus = Field(description="Job state")
+    filename: str = Field(description="Uploaded file name")
+    stage_times: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Completed pipeline stages and their time in ms"
+    )
+    progress: float = Field(
+        default=0.0,
+        ge=0.0,
+        le=1.0,
+        description="Fraction of pipeline stages completed"
+    )
+    created_at: datetime = Field(description="When the job was submitted")
+    updated_at: datetime = Field(description="Last status or progress change")
+    expires_at: datetime = Field(description="When the job and its result are evicted")
+    result: Optional[OCRResponse] = Field(
+        default=None,
+        description="OCR result once the job succeeded"
+    )
+    error: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Error (error_code, message, details) if the job failed"
+    )
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
     
@@ -0,0 +1,114 @@
+"""
+Intake memory benchmark.
+
+Measures peak RSS of Layer 1 (upload + validation) for one large phone
+photo, old vs new:
+
+- buffered: the whole upload is read into memory, decoded with PIL,
+  transposed for EXIF orientation, copied to numpy and converted to BGR
+  (the PIL image stays referenced from the context); the blank check
+  runs np.std on the grayscale copy
+- streamed: the upload is spooled to disk in 1MB chunks and
+  ImageValidator decodes the file once with OpenCV (EXIF applied)
+
+Each mode runs in a fresh subprocess and reports the growth of its peak
+RSS over its RSS after imports (the peak is reset through
+/proc/self/clear_refs first, so this needs Linux).
+
+Usage:
+    python scripts/benchmark_intake.py [--width 4000 --height 3000]
+"""
+
+import io
+import sys
+import asyncio
+import argparse
+import subprocess
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import UploadFile  # noqa: E402
+from app.core.pipeline import PipelineContext  # noqa: E402
+from app.intake import ImageValidator, spool_upload  # noqa: E402
+
+
+def _status_mb(field: str) -> float:
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith(field + ":"):
+            return int(line.split()[1]) / 1024
+    raise RuntimeError(f"{field} not in /proc/self/status")
+
+
+def reset_peak_rss() -> float:
+    """Reset the peak RSS to the current RSS and return it (MB)."""
+    Path("/proc/self/clear_refs").write_text("5")
+    return _status_mb("VmRSS")
+
+
+def buffered(path: Path) -> list:
+    image_bytes = path.read_bytes()  # await file.read()
+    pil_image = Image.open(io.BytesIO(image_bytes))
+    pil_image.load()
+    pil_image = ImageOps.exif_transpose(pil_image)
+    cv_image = cv2.cvtColor(np.array(pil_image), cv2.COLOR_RGB2BGR)
+    gray = cv2.cvtColor(cv_image, cv2.COLOR_BGR2GRAY)  # blank check
+    np.mean(gray), np.std(gray)
+    return [image_bytes, pil_image, cv_image]
+
+
+def streamed(path: Path) -> PipelineContext:
+    async def run():
+        with open(path, "rb") as f:
+            async with spool_upload(UploadFile(f, filename=path.name)) as image_path:
+                context = PipelineContext(image_path=image_path, filename=path.name)
+                return ImageValidator().validate(context)
+    return asyncio.run(run())
+
+
+MODES = {"buffered": buffered, "streamed": streamed}
+
+
+def make_photo(path: Path, width: int, height: int) -> None:
+    """Write a noisy JPEG tagged with EXIF orientation 6, as phones do."""
+    rng = np.random.default_rng(0)
+    pixels = np.clip(rng.normal(200, 40, (height, width, 3)), 0, 255).astype(np.uint8)
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.fromarray(pixels).save(path, format="JPEG", quality=92, exif=exif)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--image", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        baseline = reset_peak_rss()
+        MODES[args.mode](args.image)
+        print(f"{_status_mb('VmHWM') - baseline:.1f}")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "photo.jpg"
+        make_photo(path, args.width, args.height)
+        print(f"{args.width}x{args.height} JPEG, {path.stat().st_size / 1024 / 1024:.1f}MB upload")
+
+        for mode in MODES:
+            output = subprocess.check_output(
+                [sys.executable, __file__, "--mode", mode, "--image", str(path)],
+                text=True
+            )
+            print(f"  {mode:<9} peak RSS +{float(output.strip().splitlines()[-1]):7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Layout analysis benchmark.
+
+Scales the sample prescriptions in OCR_Test_Space/images to phone-photo
+and scan sizes, runs them through enhancement and LayoutDetector at full
+resolution and reduced to each --max-sides value, and reports per size:
+
+- time: mean LayoutDetector.detect time over --repeat runs, and one
+  end-to-end pipeline run (Tesseract is stubbed out, so this is
+  everything but recognition)
+- blocks: layout blocks found
+- IoU: area-weighted mean best-match IoU of the full-resolution blocks
+  against the reduced ones (and the reverse), 1.0 = identical layout;
+  weighting by area keeps speckle-sized blocks from dominating
+
+Usage:
+    python scripts/benchmark_layout.py [--sizes 1280 4000 --max-sides 1200 1600]
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.layout.detector import LayoutDetector  # noqa: E402
+from app.preprocess.enhancer import ImageEnhancer  # noqa: E402
+
+IMAGES = Path(__file__).resolve().parents[2] / "OCR_Test_Space" / "images"
+
+# Stand-in for Tesseract: one word per call
+OCR_DATA = {"text": ["x"], "conf": ["90"], "left": [0], "top": [0], "width": [1],
+            "height": [1], "block_num": [1], "line_num": [1], "word_num": [1]}
+
+
+def samples(sizes):
+    """(size, name, BGR image) for every sample and size."""
+    for path in sorted(IMAGES.glob("*.png")):
+        base = cv2.imread(str(path))
+        for size in sizes:
+            scale = size / max(base.shape[:2])
+            interpolation = cv2.INTER_CUBIC if scale > 1 else cv2.INTER_AREA
+            yield size, path.name, cv2.resize(base, None, fx=scale, fy=scale, interpolation=interpolation)
+
+
+def iou(a, b) -> float:
+    x0, y0 = max(a.x, b.x), max(a.y, b.y)
+    x1 = min(a.x + a.width, b.x + b.width)
+    y1 = min(a.y + a.height, b.y + b.height)
+    inter = max(0, x1 - x0) * max(0, y1 - y0)
+    union = a.area + b.area - inter
+    return inter / union if union else 1.0
+
+
+def mean_best_iou(blocks, others) -> float:
+    """Area-weighted mean over blocks of the IoU with the best-matching block in others."""
+    if not blocks:
+        return 1.0 if not others else 0.0
+    best = [max((iou(b, o) for o in others), default=0.0) for b in blocks]
+    return float(np.average(best, weights=[b.area for b in blocks]))
+
+
+def detect(image: np.ndarray, enhanced, max_side: int, repeat: int):
+    """Layout blocks and mean detect time at one max_side."""
+    with patch.object(settings, "layout_max_side", max_side):
+        detector = LayoutDetector()
+    context = SimpleNamespace(
+        cv_image=image, preprocessed_image=enhanced.preprocessed_image,
+        binary_image=enhanced.binary_image, qr_blocks=[], budget=None
+    )
+    start = time.perf_counter()
+    for _ in range(repeat):
+        detector.detect(context)
+    return context.layout_blocks, (time.perf_counter() - start) * 1000 / repeat
+
+
+def pipeline_time(image: np.ndarray, max_side: int) -> float:
+    """End-to-end pipeline time in ms with Tesseract stubbed out."""
+    from app.core.pipeline import OCRPipeline
+
+    with patch.object(settings, "layout_max_side", max_side), \
+         patch.object(settings, "stage_cache", False), \
+         patch.object(settings, "fast_path", False), \
+         patch("app.ocr.extractor.pytesseract.get_tesseract_version", return_value="stub"):
+        pipeline = OCRPipeline()
+    ok, encoded = cv2.imencode(".png", image)
+
+    async def run():
+        with patch.object(settings, "script_detection", False), \
+             patch("app.ocr.extractor.pytesseract.image_to_data", return_value=OCR_DATA):
+            start = time.perf_counter()
+            await pipeline.process(image_bytes=encoded.tobytes(), filename="bench.png")
+            return (time.perf_counter() - start) * 1000
+
+    return asyncio.run(run())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1280, 2000, 3000, 4000])
+    parser.add_argument("--max-sides", type=int, nargs="+", default=[1200, 1600, 2000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-pipeline", action="store_true", help="Skip end-to-end timing")
+    args = parser.parse_args()
+
+    if not IMAGES.exists():
+        sys.exit(f"Missing sample images in {IMAGES}")
+
+    enhancer = ImageEnhancer()
+    print(f"{'size':>5} {'image':>11} {'max side':>8} {'blocks':>6} {'layout ms':>9} "
+          f"{'pipeline ms':>11} {'IoU full->red':>13} {'IoU red->full':>13}")
+    for size, name, image in samples(args.sizes):
+        # Clean-scan metrics, so every variant runs the same enhancement
+        enhanced = enhancer.enhance(SimpleNamespace(cv_image=image, quality_metrics={}))
+        full, full_ms = detect(image, enhanced, 0, args.repeat)
+        full_pipeline = "" if args.no_pipeline else f"{pipeline_time(image, 0):11.0f}"
+        print(f"{size:5d} {name:>11} {'full':>8} {len(full):6d} {full_ms:9.1f} {full_pipeline:>11}")
+
+        for max_side in args.max_sides:
+            if max_side >= size:
+                continue
+            reduced, reduced_ms = detect(image, enhanced, max_side, args.repeat)
+            reduced_pipeline = "" if args.no_pipeline else f"{pipeline_time(image, max_side):11.0f}"
+            print(f"{'':5} {'':>11} {max_side:8d} {len(reduced):6d} {reduced_ms:9.1f} "
+                  f"{reduced_pipeline:>11} {mean_best_iou(full, reduced):13.3f} "
+                  f"{mean_best_iou(reduced, full):13.3f}")
+
+
+if __name__ == "__main__":
+    main()
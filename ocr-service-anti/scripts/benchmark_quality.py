@@ -0,0 +1,117 @@
+"""
+Quality analysis benchmark.
+
+Builds variants of the sample prescriptions in OCR_Test_Space/images at
+phone-photo and scan sizes, with added blur and sensor noise, and reports:
+
+- agreement: how often QualityAnalyzer gives the same blur level,
+  needs_* flags and too-blurry rejection as the float64 reference
+  analysis it replaced, per image size
+- time: QualityAnalyzer.analyze per image size (mean and worst)
+
+Usage:
+    python scripts/benchmark_quality.py [--sizes 1280 4000]
+"""
+
+import sys
+import time
+import argparse
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.exceptions import ImageTooBlurryError  # noqa: E402
+from app.quality import analyzer as quality  # noqa: E402
+from app.quality.analyzer import QualityAnalyzer  # noqa: E402
+
+IMAGES = Path(__file__).resolve().parents[2] / "OCR_Test_Space" / "images"
+
+# Gaussian blur sigma (at 1280px) and noise sigma of the variants
+BLURS = (0, 1, 2, 3, 4, 6)
+NOISES = (0, 2, 4, 6, 8, 15)
+
+FLAGS = ("blur", "needs_denoising", "needs_contrast_enhancement", "needs_sharpening", "rejected")
+
+
+def variants(sizes, seed: int = 0):
+    """(size, gray image) for every sample, size, blur and noise level."""
+    rng = np.random.default_rng(seed)
+    for path in sorted(IMAGES.glob("*.png")):
+        base = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        for size in sizes:
+            scale = size / max(base.shape)
+            interpolation = cv2.INTER_CUBIC if scale > 1 else cv2.INTER_AREA
+            resized = cv2.resize(base, None, fx=scale, fy=scale, interpolation=interpolation)
+            for blur in BLURS:
+                blurred = cv2.GaussianBlur(resized, (0, 0), blur * scale) if blur else resized
+                for noise in NOISES:
+                    if noise:
+                        noisy = blurred + rng.normal(0, noise, blurred.shape)
+                        yield size, np.clip(noisy, 0, 255).astype(np.uint8)
+                    else:
+                        yield size, blurred
+
+
+def reference_metrics(gray: np.ndarray):
+    """Laplacian variance, noise and contrast as computed with float64 arrays."""
+    laplacian = cv2.Laplacian(gray, cv2.CV_64F)
+    noise = float(np.median(np.abs(laplacian)) / quality.MAD_TO_SIGMA)
+    return float(laplacian.var()), noise, float(np.std(gray))
+
+
+def flags(analyzer: QualityAnalyzer, blur_score: float, noise: float, contrast: float):
+    blur = analyzer._classify_blur(blur_score)
+    return {
+        "blur": blur,
+        "needs_denoising": noise > 10,
+        "needs_contrast_enhancement": analyzer._classify_contrast(contrast) == "low",
+        "needs_sharpening": blur in ["medium", "high"],
+        "rejected": blur == "high" and blur_score < analyzer.blur_threshold_high / 2,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[900, 1280, 2000, 3000, 4000])
+    args = parser.parse_args()
+
+    if not IMAGES.exists():
+        sys.exit(f"Missing sample images in {IMAGES}")
+
+    analyzer = QualityAnalyzer()
+    samples = []
+    times = defaultdict(list)
+    for size, gray in variants(args.sizes):
+        # Phone photos arrive as BGR
+        image = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        context = SimpleNamespace(cv_image=image, pil_image=None, quality_metrics=None)
+        start = time.perf_counter()
+        try:
+            analyzer.analyze(context)
+        except ImageTooBlurryError:
+            pass  # Metrics were computed all the same
+        times[size].append((time.perf_counter() - start) * 1000)
+
+        m = context.quality_metrics
+        measured = flags(analyzer, m["blur_score"], m["noise_level"], m["contrast_score"])
+        samples.append((size, measured, flags(analyzer, *reference_metrics(gray))))
+
+    print(f"\n{'size':>5} {'images':>6} " + " ".join(f"{flag:>26}" for flag in FLAGS)
+          + f" {'mean ms':>8} {'max ms':>7}")
+    for size in args.sizes:
+        rows = [s for s in samples if s[0] == size]
+        agreement = [
+            f"{sum(measured[flag] == reference[flag] for _, measured, reference in rows) / len(rows):26.1%}"
+            for flag in FLAGS
+        ]
+        print(f"{size:5d} {len(rows):6d} " + " ".join(agreement)
+              + f" {np.mean(times[size]):8.1f} {np.max(times[size]):7.1f}")
+
+
+if __name__ == "__main__":
+    main()
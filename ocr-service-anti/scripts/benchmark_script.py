@@ -0,0 +1,147 @@
+"""
+Script detection benchmark.
+
+Runs the per-block script detection pre-pass on hand-labeled regions of
+the sample prescriptions in OCR_Test_Space/images (Khmer-only,
+Latin-only and mixed lines) and reports:
+
+- decisions: how many regions were narrowed correctly, kept the full
+  language set, or lost a script they contain (the costly error)
+- time: OCR time per region with the full language set vs the set the
+  detector chose, plus the detection time itself, per language set;
+  SCRIPT_DETECTION only pays off where "saved" is positive
+
+Needs Tesseract with the eng, khm, fra and osd models.
+
+Usage:
+    python scripts/benchmark_script.py [--languages eng+khm+fra --repeat 3]
+"""
+
+import sys
+import time
+import argparse
+from collections import defaultdict
+from pathlib import Path
+
+import cv2
+import pytesseract
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.ocr.script import ScriptDetector, MIXED  # noqa: E402
+
+IMAGES = Path(__file__).resolve().parents[2] / "OCR_Test_Space" / "images"
+
+# (x1, y1, x2, y2) regions labeled by the script they contain
+REGIONS = {
+    "image.png": {
+        "khm": [(60, 1010, 490, 1048), (420, 412, 535, 447), (155, 500, 275, 538),
+                (635, 888, 805, 928), (95, 362, 275, 402), (620, 1015, 845, 1050),
+                (375, 180, 565, 215)],
+        "latin": [(160, 305, 310, 336), (105, 565, 280, 622), (105, 700, 290, 738),
+                  (105, 763, 240, 797), (130, 185, 275, 217), (725, 838, 905, 868),
+                  (105, 645, 260, 675)],
+        "mixed": [(385, 570, 470, 605), (548, 835, 905, 872), (45, 230, 500, 265),
+                  (45, 300, 310, 338)],
+    },
+    "image1.png": {
+        "khm": [(25, 958, 400, 995), (415, 205, 560, 248), (725, 835, 860, 865),
+                (20, 310, 330, 345), (690, 490, 810, 525)],
+        "latin": [(85, 505, 275, 535), (85, 565, 285, 595), (85, 625, 275, 655),
+                  (50, 720, 240, 745), (370, 82, 695, 108), (50, 780, 165, 805)],
+        "mixed": [(20, 278, 385, 305), (590, 270, 835, 300), (20, 372, 290, 398)],
+    },
+    "image2.png": {
+        "khm": [(80, 915, 445, 955), (415, 375, 530, 405), (645, 795, 775, 830),
+                (615, 900, 800, 935)],
+        "latin": [(170, 250, 310, 275), (175, 280, 330, 305), (100, 505, 255, 535),
+                  (100, 575, 220, 605), (100, 640, 220, 670), (700, 760, 850, 790)],
+        "mixed": [(45, 160, 270, 185), (45, 200, 450, 225)],
+    },
+}
+
+# Languages a region of each label cannot do without
+REQUIRED = {"khm": {"khm"}, "latin": {"eng"}, "mixed": {"khm", "eng"}}
+
+
+def ocr_ms(image, languages: str, repeat: int) -> float:
+    """Best-of-repeat image_to_data time (the block OCR call of Layer 5)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pytesseract.image_to_data(image, lang=languages, config="--oem 1 --psm 6")
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--languages", default="eng+khm+fra")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    try:
+        pytesseract.get_tesseract_version()
+    except Exception as e:
+        sys.exit(f"Tesseract is required for this benchmark: {e}")
+
+    detector = ScriptDetector()
+    outcomes = defaultdict(int)
+    # language set -> [regions, full-set OCR ms, chosen-set OCR ms, detection ms]
+    per_set = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+
+    print(f"{'region':32} {'label':6} {'script':6} {'conf':>5} {'languages':12} "
+          f"{'full ms':>8} {'chosen ms':>9} {'detect ms':>9}")
+    for name, labels in REGIONS.items():
+        gray = cv2.imread(str(IMAGES / name), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            sys.exit(f"Missing sample image {IMAGES / name}")
+
+        for label, boxes in labels.items():
+            for x1, y1, x2, y2 in boxes:
+                crop = gray[y1:y2, x1:x2]
+                decision = detector.detect(crop, args.languages)
+                chosen = set(decision.languages.split("+"))
+
+                if not REQUIRED[label] <= chosen:
+                    outcomes["dropped a needed script"] += 1
+                elif decision.script == MIXED:
+                    outcomes["kept full set"] += 1
+                else:
+                    outcomes["narrowed"] += 1
+
+                full = ocr_ms(crop, args.languages, args.repeat)
+                narrowed = full if decision.languages == args.languages else ocr_ms(
+                    crop, decision.languages, args.repeat
+                )
+                stats = per_set[decision.languages]
+                stats[0] += 1
+                stats[1] += full
+                stats[2] += narrowed
+                stats[3] += decision.elapsed_ms
+
+                print(f"{name + str((x1, y1, x2, y2)):32} {label:6} {decision.script:6} "
+                      f"{decision.confidence:5.1f} {decision.languages:12} "
+                      f"{full:8.1f} {narrowed:9.1f} {decision.elapsed_ms:9.1f}")
+
+    print("\nDecisions:")
+    for outcome, count in sorted(outcomes.items()):
+        print(f"  {outcome:24} {count}")
+
+    print(f"\n{'languages':12} {'regions':>7} {'full ms':>9} {'chosen ms':>9} "
+          f"{'detect ms':>9} {'saved':>7}")
+    totals = [0, 0.0, 0.0, 0.0]
+    for languages, stats in sorted(per_set.items()):
+        totals = [a + b for a, b in zip(totals, stats)]
+        saved = stats[1] - stats[2] - stats[3]
+        print(f"{languages:12} {stats[0]:7d} {stats[1]:9.1f} {stats[2]:9.1f} "
+              f"{stats[3]:9.1f} {saved / stats[1]:7.1%}")
+    saved = totals[1] - totals[2] - totals[3]
+    print(f"{'total':12} {totals[0]:7d} {totals[1]:9.1f} {totals[2]:9.1f} "
+          f"{totals[3]:9.1f} {saved / totals[1]:7.1%}")
+    if saved <= 0:
+        print("\nOSD plus the narrowed pass is not faster than the full set: keep SCRIPT_DETECTION=false")
+
+
+if __name__ == "__main__":
+    main()
@@ -45,3 +45,34 @@ def small_image_bytes():
     buffer = io.BytesIO()
     img.save(buffer, format='PNG')
     return buffer.getvalue()
+
+
+@pytest.fixture
+def pipeline_factory():
+    """Build OCRPipelines without Tesseract, with settings overridden by keyword."""
+    from contextlib import ExitStack
+    from unittest.mock import patch
+    from app.core.config import settings
+    from app.core.pipeline import OCRPipeline
+    
+    def make(**overrides):
+        with ExitStack() as stack:
+            stack.enter_context(
+                patch("app.ocr.extractor.pytesseract.get_tesseract_version", return_value="5.3.0")
+            )
+            for name, value in overrides.items():
+                stack.enter_context(patch.object(settings, name, value))
+            return OCRPipeline()
+    
+    return make
+
+
+@pytest.fixture
+def tesseract_data():
+    """Stub image_to_data with one confident word; yields the mock."""
+    from unittest.mock import patch
+    
+    data = {"text": ["Sample"], "conf": ["90"], "left": [150], "top": [150], "width": [80],
+            "height": [12], "block_num": [1], "line_num": [1], "word_num": [1]}
+    with patch("app.ocr.extractor.pytesseract.image_to_data", return_value=data) as ocr:
+        yield ocr
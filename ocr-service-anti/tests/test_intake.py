@@ -1,10 +1,19 @@
 """Tests for Layer 1: Image Intake & Validation."""
 
+import asyncio
+import io
+
+import cv2
+import numpy as np
 import pytest
+from fastapi import UploadFile
+from PIL import Image
 from app.intake.validator import ImageValidator
+from app.intake.upload import spool_upload
 from app.core.exceptions import (
     ImageCorruptedError,
     ImageTooSmallError,
+    ImageTooLargeError,
 )
 from dataclasses import dataclass, field
 
@@ -12,8 +21,9 @@ from dataclasses import dataclass, field
 @dataclass
 class MockContext:
     """Mock pipeline context for testing."""
-    image_bytes: bytes
+    image_bytes: bytes = None
     filename: str = "test.png"
+    image_path: any = None
     pil_image: any = None
     cv_image: any = None
 
@@ -55,3 +65,103 @@ class TestImageValidator:
         
         with pytest.raises(ImageTooSmallError):
             self.validator.validate(context)
+
+    def test_validate_from_path(self, sample_image_path, sample_image_bytes):
+        """Test that a spooled file decodes like the same bytes."""
+        from_path = self.validator.validate(
+            MockContext(image_path=sample_image_path, filename="test.png")
+        )
+        from_bytes = self.validator.validate(
+            MockContext(image_bytes=sample_image_bytes, filename="test.png")
+        )
+        
+        assert (from_path.cv_image == from_bytes.cv_image).all()
+    
+    def test_validate_applies_exif_orientation(self):
+        """Test that EXIF orientation is applied while decoding."""
+        img = Image.new("RGB", (400, 200), color="white")
+        img.paste((0, 0, 0), (0, 0, 100, 200))
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Rotate 90 CW to display
+        buffer = io.BytesIO()
+        img.save(buffer, format="JPEG", exif=exif)
+        
+        result = self.validator.validate(
+            MockContext(image_bytes=buffer.getvalue(), filename="photo.jpg")
+        )
+        
+        h, w = result.cv_image.shape[:2]
+        assert (w, h) == (200, 400)
+        # Dark left band ends up on top
+        assert result.cv_image[:100].mean() < 50
+        assert result.cv_image[-100:].mean() > 200
+
+    def test_validate_reduces_oversized_photo(self):
+        """Test that large JPEGs with oversized text are decoded at reduced scale."""
+        img = np.full((3000, 4000), 230, np.uint8)
+        for row in range(12):
+            cv2.putText(img, "Paracetamol 500mg x3", (100, 220 + row * 230),
+                        cv2.FONT_HERSHEY_SIMPLEX, 6.0, 20, 12)
+        _, encoded = cv2.imencode(".jpg", img)
+        
+        result = self.validator.validate(
+            MockContext(image_bytes=encoded.tobytes(), filename="photo.jpg")
+        )
+        
+        reduction = result.decode_reduction
+        assert reduction > 1
+        assert result.cv_image.shape == (3000 // reduction, 4000 // reduction)
+    
+    def test_validate_keeps_small_photo_full_size(self, sample_image_bytes):
+        """Test that images too small to reduce are decoded at full size."""
+        result = self.validator.validate(
+            MockContext(image_bytes=sample_image_bytes, filename="test.png")
+        )
+        
+        assert result.decode_reduction == 1
+        assert result.cv_image.shape[:2] == (600, 800)
+
+
+class TestSpoolUpload:
+    """Tests for streamed upload intake."""
+    
+    def _spool(self, data, max_bytes):
+        async def run():
+            upload = UploadFile(io.BytesIO(data), filename="scan.png")
+            async with spool_upload(upload, max_bytes=max_bytes) as path:
+                return path, path.read_bytes()
+        return asyncio.run(run())
+    
+    def test_spool_upload_writes_and_cleans_up(self, sample_image_bytes):
+        path, contents = self._spool(sample_image_bytes, max_bytes=len(sample_image_bytes))
+        
+        assert contents == sample_image_bytes
+        assert path.suffix == ".png"
+        assert not path.exists()
+    
+    def test_spool_upload_rejects_oversized(self, sample_image_bytes):
+        with pytest.raises(ImageTooLargeError):
+            self._spool(sample_image_bytes, max_bytes=len(sample_image_bytes) - 1)
+    
+    def test_content_length_limit_applies_to_single_image_routes(self):
+        from unittest.mock import patch
+        from fastapi.testclient import TestClient
+        from app.api import training_routes
+        from app.core.config import settings
+        from app.main import app
+        
+        client = TestClient(app)
+        image = b"\0" * 100 * 1024
+        with patch.object(settings, "max_image_size_mb", 0.1):
+            # Two images, each under the limit, together over it
+            training = client.post(
+                "/api/v1/training/upload",
+                files=[("files", ("a.png", image)), ("files", ("b.png", image))]
+            )
+            single = client.post("/api/v1/ocr", files={"file": ("a.png", image * 2)})
+        for image_id in [i["image_id"] for i in training.json().get("images", [])]:
+            training_routes._uploaded_images.pop(image_id, None)
+        
+        assert training.status_code == 200
+        assert single.status_code == 413
+        assert single.json()["detail"]["error_code"] == "IMAGE_TOO_LARGE"
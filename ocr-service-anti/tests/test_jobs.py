@@ -0,0 +1,222 @@
+"""Tests for asynchronous OCR jobs."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.exceptions import ServiceBusyError
+from app.jobs import JobStore, JobManager
+from app.jobs.store import QUEUED, RUNNING, SUCCEEDED, FAILED
+
+
+class FakePipeline:
+    """Stands in for OCRPipeline: reports two stages, then returns a response."""
+
+    def __init__(self, fail: bool = False, release: asyncio.Event = None):
+        self.fail = fail
+        self.release = release
+        self.calls = []
+
+    async def process(self, image_path, filename, languages, skip_enhancement, progress, wait_for_slot):
+        assert wait_for_slot
+        self.calls.append(image_path)
+        if self.release is not None:
+            await self.release.wait()
+        progress({"validation": 5.0})
+        await asyncio.sleep(0)
+        progress({"validation": 5.0, "quality_analysis": 7.0})
+        if self.fail:
+            raise RuntimeError("layout exploded")
+        stage_times = {"validation": 5.0, "quality_analysis": 7.0}
+        return SimpleNamespace(
+            meta=SimpleNamespace(stage_times=stage_times),
+            model_dump=lambda mode: {"raw_text": "Paracetamol", "languages": languages}
+        )
+
+
+class TestJobStore:
+    """Tests for the SQLite job store."""
+
+    def test_idempotency_key_returns_existing_job(self, tmp_path):
+        store = JobStore(tmp_path / "jobs.db", ttl_seconds=60)
+
+        first, created = store.create("a", "rx.png", tmp_path / "a.png", {}, idempotency_key="k1")
+        again, created_again = store.create("b", "rx.png", tmp_path / "b.png", {}, idempotency_key="k1")
+
+        assert created and not created_again
+        assert again.job_id == first.job_id == "a"
+        assert store.get("b") is None
+
+    def test_expired_jobs_are_hidden_and_purged(self, tmp_path):
+        store = JobStore(tmp_path / "jobs.db", ttl_seconds=-1)
+        store.create("a", "rx.png", tmp_path / "a.png", {}, idempotency_key="k1")
+
+        assert store.get("a") is None
+        assert store.find_by_key("k1") is None
+        assert [job.job_id for job in store.purge_expired()] == ["a"]
+
+        # The key is free again
+        _, created = store.create("b", "rx.png", tmp_path / "b.png", {}, idempotency_key="k1")
+        assert created
+
+    def test_state_survives_reopening(self, tmp_path):
+        store = JobStore(tmp_path / "jobs.db", ttl_seconds=60)
+        store.create("a", "rx.png", tmp_path / "a.png", {"languages": "eng"})
+        store.update("a", status=RUNNING, stage_times={"validation": 3.0})
+        store.close()
+
+        job = JobStore(tmp_path / "jobs.db", ttl_seconds=60).get("a")
+        assert job.status == RUNNING
+        assert job.stage_times == {"validation": 3.0}
+        assert job.params == {"languages": "eng"}
+
+    def test_commits_without_fsync(self, tmp_path):
+        store = JobStore(tmp_path / "jobs.db", ttl_seconds=60)
+
+        assert store._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert store._conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+
+
+class TestJobManager:
+    """Tests for running jobs in the background."""
+
+    async def wait_for(self, manager, job_id, status, timeout=2.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = manager.get(job_id)
+            if job.status == status:
+                return job
+            await asyncio.sleep(0.01)
+        raise AssertionError(f"job {job_id} stayed {manager.get(job_id).status}")
+
+    def make_manager(self, tmp_path, pipeline):
+        store = JobStore(tmp_path / "jobs.db", ttl_seconds=60)
+        return JobManager(pipeline, store=store, upload_dir=tmp_path / "uploads", workers=1)
+
+    def upload(self, manager):
+        path = manager.upload_path("rx.png")
+        path.write_bytes(b"image")
+        return path
+
+    @pytest.mark.asyncio
+    async def test_job_runs_in_background_and_stores_result(self, tmp_path):
+        pipeline = FakePipeline()
+        manager = self.make_manager(tmp_path, pipeline)
+        path = self.upload(manager)
+
+        job, created = manager.submit(path, "rx.png", languages="eng+khm")
+        assert created and job.status == QUEUED
+
+        job = await self.wait_for(manager, job.job_id, SUCCEEDED)
+        assert job.result == {"raw_text": "Paracetamol", "languages": "eng+khm"}
+        assert job.stage_times == {"validation": 5.0, "quality_analysis": 7.0}
+        assert not path.exists()
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_retried_upload_attaches_to_existing_job(self, tmp_path):
+        pipeline = FakePipeline()
+        manager = self.make_manager(tmp_path, pipeline)
+
+        first, _ = manager.submit(self.upload(manager), "rx.png", idempotency_key="retry-1")
+        retry_path = self.upload(manager)
+        again, created = manager.submit(retry_path, "rx.png", idempotency_key="retry-1")
+
+        assert not created
+        assert again.job_id == first.job_id
+        assert not retry_path.exists()
+        await self.wait_for(manager, first.job_id, SUCCEEDED)
+        assert len(pipeline.calls) == 1
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_failed_job_records_error(self, tmp_path):
+        manager = self.make_manager(tmp_path, FakePipeline(fail=True))
+        job, _ = manager.submit(self.upload(manager), "rx.png")
+
+        job = await self.wait_for(manager, job.job_id, FAILED)
+        assert job.error["error_code"] == "INTERNAL_ERROR"
+        assert "layout exploded" in job.error["message"]
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_unfinished_jobs_resume_on_start(self, tmp_path):
+        store = JobStore(tmp_path / "jobs.db", ttl_seconds=60)
+        path = tmp_path / "uploads" / "left.png"
+        path.parent.mkdir()
+        path.write_bytes(b"image")
+        store.create("left", "rx.png", path, {})
+        store.update("left", status=RUNNING)
+
+        manager = JobManager(FakePipeline(), store=store, upload_dir=path.parent, workers=1)
+        manager.start()
+
+        await self.wait_for(manager, "left", SUCCEEDED)
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_new_jobs(self, tmp_path):
+        release = asyncio.Event()
+        pipeline = FakePipeline(release=release)
+        store = JobStore(tmp_path / "jobs.db", ttl_seconds=60)
+        manager = JobManager(pipeline, store=store, upload_dir=tmp_path / "uploads",
+                             workers=1, queue_size=2)
+
+        first, _ = manager.submit(self.upload(manager), "rx.png", idempotency_key="k0")
+        await self.wait_for(manager, first.job_id, RUNNING)
+        for i in range(2):
+            manager.submit(self.upload(manager), "rx.png", idempotency_key=f"k{i + 1}")
+
+        rejected = self.upload(manager)
+        with pytest.raises(ServiceBusyError) as exc:
+            manager.submit(rejected, "rx.png", idempotency_key="k3")
+        assert exc.value.details == {"queued_jobs": 2, "job_queue_size": 2}
+        assert not rejected.exists()
+
+        # A retry of a queued job still finds it
+        again, created = manager.submit(self.upload(manager), "rx.png", idempotency_key="k1")
+        assert not created
+
+        release.set()
+        await self.wait_for(manager, again.job_id, SUCCEEDED)
+        manager.check_capacity()
+        await manager.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_requeues_running_job(self, tmp_path):
+        manager = self.make_manager(tmp_path, FakePipeline(release=asyncio.Event()))
+        path = self.upload(manager)
+        job, _ = manager.submit(path, "rx.png")
+        await self.wait_for(manager, job.job_id, RUNNING)
+
+        await manager.stop()
+
+        store = JobStore(tmp_path / "jobs.db", ttl_seconds=60)
+        assert store.get(job.job_id).status == QUEUED
+        assert path.exists()
+
+    def test_app_starts_and_stops_workers(self, tmp_path):
+        from unittest.mock import patch
+        from fastapi.testclient import TestClient
+        from app.api import routes
+        from app.main import app
+
+        store = JobStore(tmp_path / "jobs.db", ttl_seconds=60)
+        path = tmp_path / "uploads" / "left.png"
+        path.parent.mkdir()
+        path.write_bytes(b"image")
+        store.create("left", "rx.png", path, {})
+        manager = JobManager(FakePipeline(), store=store, upload_dir=path.parent, workers=1)
+
+        with patch.object(routes, "_job_manager", manager):
+            with TestClient(app):
+                # Resumed at startup, without any request to a job route
+                deadline = time.time() + 2.0
+                while manager.get("left").status != SUCCEEDED and time.time() < deadline:
+                    time.sleep(0.01)
+                assert manager.get("left").status == SUCCEEDED
+            assert routes._job_manager is None
+
+        assert manager._tasks == []
@@ -0,0 +1,70 @@
+"""Tests for Layer 4: Layout Analysis."""
+
+import numpy as np
+import cv2
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.core.config import settings
+from app.layout.detector import LayoutDetector
+from app.schemas.responses import BlockType
+
+
+def page(width: int = 3000, height: int = 4000) -> np.ndarray:
+    """White page with a ruled table and three paragraphs of text."""
+    img = np.full((height, width), 255, dtype=np.uint8)
+    for i in range(3):
+        for j in range(4):
+            y = 400 + i * 700 + j * 120
+            cv2.putText(img, "Paracetamol 500mg 1x3", (200, y), cv2.FONT_HERSHEY_SIMPLEX, 3.0, 0, 6)
+    # Table: 4 rows x 3 columns of 2px rules
+    x0, y0, x1, y1 = 300, 2600, 2700, 3600
+    for y in np.linspace(y0, y1, 5).astype(int):
+        cv2.line(img, (x0, y), (x1, y), 0, 2)
+    for x in np.linspace(x0, x1, 4).astype(int):
+        cv2.line(img, (x, y0), (x, y1), 0, 2)
+    return img
+
+
+def detect(image: np.ndarray, max_side: int):
+    with patch.object(settings, "layout_max_side", max_side):
+        detector = LayoutDetector()
+    context = SimpleNamespace(cv_image=image, preprocessed_image=image, qr_blocks=[], budget=None)
+    return detector.detect(context).layout_blocks
+
+
+def iou(a, b) -> float:
+    x0, y0 = max(a.x, b.x), max(a.y, b.y)
+    x1, y1 = min(a.x + a.width, b.x + b.width), min(a.y + a.height, b.y + b.height)
+    inter = max(0, x1 - x0) * max(0, y1 - y0)
+    return inter / (a.area + b.area - inter)
+
+
+class TestLayoutDetector:
+    """Tests for layout detection on a reduced binary image."""
+
+    def test_reduce_keeps_thin_rules(self):
+        with patch.object(settings, "layout_max_side", 1000):
+            detector = LayoutDetector()
+        binary = np.zeros((3001, 2000), dtype=np.uint8)
+        binary[1500, :] = 255
+
+        small, factor = detector._reduce(binary)
+
+        assert factor == 4
+        assert small.shape == (751, 500)
+        assert small[375].all() and small.sum() == 255 * 500
+
+    def test_reduced_blocks_match_full_resolution(self):
+        image = page()
+        full = detect(image, max_side=0)
+        reduced = detect(image, max_side=1600)
+
+        assert len(reduced) == len(full)
+        assert [b.type for b in reduced] == [b.type for b in full]
+        assert BlockType.TABLE in [b.type for b in reduced]
+        for block in reduced:
+            # Full-resolution pixels, inside the page
+            assert block.x + block.width <= image.shape[1]
+            assert block.y + block.height <= image.shape[0]
+            assert max(iou(block, other) for other in full) > 0.9
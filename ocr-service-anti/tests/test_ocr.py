@@ -0,0 +1,246 @@
+"""Tests for Layer 5: OCR Extraction."""
+
+import pytest
+import numpy as np
+import cv2
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.ocr.coalesce import pack_blocks, assign_words
+from app.ocr.script import ScriptDetector, narrow_languages, MIXED
+
+
+def text_block(lines: int = 3) -> np.ndarray:
+    """A block of printed text with plenty of glyph components."""
+    img = np.full((80 * lines + 40, 1300), 255, dtype=np.uint8)
+    for i in range(lines):
+        cv2.putText(img, "Paracetamol 500mg 1x3 after meal", (10, 80 + i * 80),
+                    cv2.FONT_HERSHEY_SIMPLEX, 2.0, 0, 3)
+    return img
+
+
+def osd(script: str, conf: float) -> dict:
+    return {"script": script, "script_conf": conf}
+
+
+class TestScriptDetector:
+    """Tests for the per-block script detection pre-pass."""
+
+    def setup_method(self):
+        self.detector = ScriptDetector(min_confidence=2.0, text_height=20, min_components=12)
+
+    def test_narrow_languages_keeps_requested_order(self):
+        assert narrow_languages("eng+khm+fra", ("khm", "eng")) == "eng+khm"
+        assert narrow_languages("eng+khm+fra", ("eng", "fra")) == "eng+fra"
+        # Nothing requested is needed: keep the request
+        assert narrow_languages("fra", ("khm", "eng")) == "fra"
+
+    @pytest.mark.parametrize("script,languages", [
+        ("Latin", "eng+fra"),
+        ("Khmer", "eng+khm"),
+    ])
+    def test_confident_script_narrows_languages(self, script, languages):
+        with patch("app.ocr.script.pytesseract.image_to_osd", return_value=osd(script, 8.0)) as mock:
+            decision = self.detector.detect(text_block(), "eng+khm+fra")
+
+        assert decision.script == script
+        assert decision.languages == languages
+        # OSD ran on a copy downsampled towards the target text height
+        assert mock.call_args[0][0].shape[0] < text_block().shape[0]
+
+    @pytest.mark.parametrize("result", [
+        osd("Latin", 0.5),       # low confidence
+        osd("Arabic", 9.0),      # script the service does not read
+        RuntimeError("Too few characters. Skipping this page"),
+    ])
+    def test_undecided_blocks_keep_full_set(self, result):
+        kwargs = {"side_effect": result} if isinstance(result, Exception) else {"return_value": result}
+        with patch("app.ocr.script.pytesseract.image_to_osd", **kwargs):
+            decision = self.detector.detect(text_block(), "eng+khm+fra")
+
+        assert decision.script == MIXED
+        assert decision.languages == "eng+khm+fra"
+
+    def test_small_block_skips_osd(self):
+        block = np.full((40, 120), 255, dtype=np.uint8)
+        cv2.putText(block, "1x3", (5, 30), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 0, 2)
+
+        with patch("app.ocr.script.pytesseract.image_to_osd") as mock:
+            decision = self.detector.detect(block, "eng+khm+fra")
+
+        mock.assert_not_called()
+        assert decision.languages == "eng+khm+fra"
+
+
+class TestOCRExtractor:
+    """Tests for per-block language selection in OCRExtractor."""
+
+    def test_blocks_use_detected_languages(self):
+        from app.core.config import settings
+        from app.ocr.extractor import OCRExtractor
+        from app.schemas.responses import BlockType
+
+        image = np.vstack([text_block(), text_block()])
+        half = image.shape[0] // 2
+        blocks = [
+            SimpleNamespace(type=BlockType.TEXT, x=0, y=0, width=1300, height=half),
+            SimpleNamespace(type=BlockType.TEXT, x=0, y=half, width=1300, height=half),
+        ]
+        context = SimpleNamespace(preprocessed_image=image, cv_image=image, layout_blocks=blocks)
+
+        data = {"text": ["Paracetamol"], "conf": ["91"], "left": [10], "top": [12],
+                "width": [400], "height": [50], "block_num": [1], "line_num": [1], "word_num": [1]}
+        # One worker, so OSD answers are consumed in block order
+        with patch("app.ocr.extractor.pytesseract.get_tesseract_version", return_value="5.3.0"), \
+             patch.object(settings, "ocr_block_workers", 1):
+            extractor = OCRExtractor()
+        with patch.object(settings, "script_detection", True), \
+             patch("app.ocr.script.pytesseract.image_to_osd",
+                   side_effect=[osd("Latin", 6.0), osd("Latin", 0.3)]), \
+             patch("app.ocr.extractor.pytesseract.image_to_data", return_value=data) as ocr:
+            extractor.extract(context, "eng+khm+fra")
+
+        assert [call.kwargs["lang"] for call in ocr.call_args_list] == ["eng+fra", "eng+khm+fra"]
+        assert [block.languages for block in context.ocr_results] == ["eng+fra", "eng+khm+fra"]
+        assert context.ocr_results[1].lines[0].y == half + 12
+        assert set(context.language_usage) == {"eng+fra", "eng+khm+fra"}
+        assert context.language_usage["eng+fra"]["blocks"] == 1
+
+    def test_blocks_run_concurrently_in_reading_order(self):
+        import threading
+        import time
+        from app.core.config import settings
+        from app.ocr.extractor import OCRExtractor
+        from app.schemas.responses import BlockType
+
+        image = np.full((1200, 400), 255, dtype=np.uint8)
+        blocks = [SimpleNamespace(type=BlockType.TEXT, x=0, y=100 * i, width=400, height=100)
+                  for i in range(8)]
+        context = SimpleNamespace(preprocessed_image=image, cv_image=image, layout_blocks=blocks)
+
+        running, peak, lock = [0], [0], threading.Lock()
+
+        def image_to_data(*args, **kwargs):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+            return {"text": ["x"], "conf": ["90"], "left": [0], "top": [5], "width": [10],
+                    "height": [10], "block_num": [1], "line_num": [1], "word_num": [1]}
+
+        with patch("app.ocr.extractor.pytesseract.get_tesseract_version", return_value="5.3.0"), \
+             patch.object(settings, "ocr_block_workers", 3):
+            extractor = OCRExtractor()
+        with patch.object(settings, "script_detection", False), \
+             patch.object(settings, "coalesce_blocks", False), \
+             patch("app.ocr.extractor.pytesseract.image_to_data", side_effect=image_to_data):
+            extractor.extract(context)
+
+        assert 1 < peak[0] <= 3
+        assert [block.lines[0].y for block in context.ocr_results] == [100 * i + 5 for i in range(8)]
+        assert [t["block"] for t in context.block_times] == list(range(8))
+        assert all(t["ocr_ms"] >= 20 for t in context.block_times)
+
+    def test_small_blocks_share_one_call(self):
+        from app.core.config import settings
+        from app.ocr.extractor import OCRExtractor
+        from app.schemas.responses import BlockType
+
+        image = np.full((1000, 400), 255, dtype=np.uint8)
+        blocks = [SimpleNamespace(type=BlockType.TEXT, x=10 * i, y=100 * i, width=200, height=40)
+                  for i in range(6)]
+        blocks.append(SimpleNamespace(type=BlockType.TEXT, x=0, y=700, width=400, height=250))
+        context = SimpleNamespace(preprocessed_image=image, cv_image=image, layout_blocks=blocks)
+
+        def image_to_data(image, **kwargs):
+            # One word 5px into every 40px block stacked on the canvas
+            tops = [20 + 60 * i + 5 for i in range(6)] if image.shape[0] > 250 else [5]
+            n = len(tops)
+            return {"text": ["x"] * n, "conf": ["90"] * n, "left": [20] * n, "top": tops,
+                    "width": [10] * n, "height": [10] * n, "block_num": [1] * n,
+                    "line_num": list(range(1, n + 1)), "word_num": [1] * n}
+
+        with patch("app.ocr.extractor.pytesseract.get_tesseract_version", return_value="5.3.0"):
+            extractor = OCRExtractor()
+        with patch.object(settings, "script_detection", False), \
+             patch.object(settings, "coalesce_gap", 20), \
+             patch.object(settings, "coalesce_max_block_height", 150), \
+             patch("app.ocr.extractor.pytesseract.image_to_data", side_effect=image_to_data) as ocr:
+            extractor.extract(context)
+
+        assert ocr.call_count == 2
+        assert context.ocr_calls == 2
+        small = context.ocr_results[:6]
+        assert [(b.lines[0].x, b.lines[0].y) for b in small] == [(10 * i, 100 * i + 5) for i in range(6)]
+        assert all(len(b.lines) == 1 and b.call_blocks == 6 for b in small)
+        assert context.ocr_results[6].call_blocks == 1
+
+    def test_composite_keeps_full_set_for_khmer_block(self):
+        from app.core.config import settings
+        from app.ocr.extractor import OCRExtractor
+        from app.schemas.responses import BlockType
+
+        # 20 single-line blocks, all coalesced, then one tall block; block 7
+        # stands for a short Khmer fragment among Latin lines
+        rows = []
+        for i in range(20):
+            row = np.full((60, 700), 255, dtype=np.uint8)
+            cv2.putText(row, f"Paracetamol {i}00mg x3", (10, 45), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 0, 2)
+            rows.append(row)
+        image = np.vstack(rows + [text_block()[:, :700]])
+        blocks = [SimpleNamespace(type=BlockType.TEXT, x=0, y=60 * i, width=700, height=60)
+                  for i in range(20)]
+        blocks.append(SimpleNamespace(type=BlockType.TEXT, x=0, y=1200, width=700, height=280))
+        context = SimpleNamespace(preprocessed_image=image, cv_image=image, layout_blocks=blocks)
+
+        data = {"text": [], "conf": [], "left": [], "top": [], "width": [], "height": [],
+                "block_num": [], "line_num": [], "word_num": []}
+        with patch("app.ocr.extractor.pytesseract.get_tesseract_version", return_value="5.3.0"):
+            extractor = OCRExtractor()
+        # OSD calls a mostly-Latin canvas Latin, whatever a single block holds
+        with patch.object(settings, "script_detection", True), \
+             patch.object(settings, "coalesce_max_block_height", 150), \
+             patch("app.ocr.script.pytesseract.image_to_osd", return_value=osd("Latin", 6.0)) as detect, \
+             patch("app.ocr.extractor.pytesseract.image_to_data", return_value=data) as ocr:
+            extractor.extract(context, "eng+khm+fra")
+
+        # The composite skips OSD; only the tall block read alone is narrowed
+        assert detect.call_count == 1
+        assert sorted(call.kwargs["lang"] for call in ocr.call_args_list) == ["eng+fra", "eng+khm+fra"]
+        assert context.ocr_calls == detect.call_count + ocr.call_count
+        assert "khm" in context.ocr_results[7].languages.split("+")
+        assert all(block.languages == "eng+khm+fra" for block in context.ocr_results[:20])
+        assert context.ocr_results[20].languages == "eng+fra"
+
+
+class TestCoalesce:
+    """Tests for packing small blocks onto composite canvases."""
+
+    def test_pack_and_assign_round_trip(self):
+        images = [np.full((30, 100), 200, dtype=np.uint8), np.full((50, 60), 200, dtype=np.uint8)]
+        composites = pack_blocks(images, [3, 5], gap=10, max_height=1000)
+
+        assert len(composites) == 1
+        canvas = composites[0].canvas
+        assert canvas.shape == (10 + 30 + 10 + 50 + 10, 120)
+        # Separators take the block background
+        assert (canvas == 200).all()
+
+        words = [
+            SimpleNamespace(x=20, y=15, width=10, height=10),   # block 3
+            SimpleNamespace(x=15, y=60, width=20, height=20),   # block 5
+            SimpleNamespace(x=20, y=40, width=10, height=8),    # in the gap: dropped
+        ]
+        assigned = assign_words(words, composites[0])
+
+        assert [(w.x, w.y) for w in assigned[3]] == [(10, 5)]
+        assert [(w.x, w.y) for w in assigned[5]] == [(5, 10)]
+
+    def test_new_canvas_beyond_max_height(self):
+        images = [np.zeros((40, 50), dtype=np.uint8) for _ in range(5)]
+        composites = pack_blocks(images, list(range(5)), gap=10, max_height=110)
+
+        assert [len(c.placements) for c in composites] == [2, 2, 1]
+        assert all(c.canvas.shape[0] <= 110 for c in composites)
@@ -49,3 +49,314 @@ class TestOCRPipeline:
         assert result is not None
         assert hasattr(result, 'blur')
         assert hasattr(result, 'contrast')
+
+
+class TestAdmissionControl:
+    """Tests for running layers off the event loop with an in-flight cap."""
+    
+    @pytest.mark.asyncio
+    async def test_rejects_beyond_in_flight_cap(self, sample_image_bytes, pipeline_factory):
+        import asyncio
+        import threading
+        from app.core.exceptions import ServiceBusyError
+        
+        pipeline = pipeline_factory(pipeline_workers=1, max_in_flight_pipelines=2)
+        release = threading.Event()
+        
+        def blocking_validate(context):
+            release.wait(5)
+            raise ServiceBusyError(message="stop here")
+        
+        pipeline.validator.validate = blocking_validate
+        running = [
+            asyncio.create_task(pipeline.process(image_bytes=sample_image_bytes))
+            for _ in range(2)
+        ]
+        # The loop stays free while both pipelines hold their slots
+        await asyncio.sleep(0.05)
+        assert pipeline.load()["in_flight"] == 2
+        
+        with pytest.raises(ServiceBusyError) as exc:
+            await pipeline.process(image_bytes=sample_image_bytes)
+        
+        assert exc.value.status_code == 503
+        assert exc.value.details["queue_depth"] == 1
+        assert exc.value.details["max_in_flight"] == 2
+        
+        # Background jobs wait in line for a slot instead
+        waiting = asyncio.create_task(
+            pipeline.process(image_bytes=sample_image_bytes, wait_for_slot=True)
+        )
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        assert pipeline.load()["in_flight"] == 2
+        
+        release.set()
+        results = await asyncio.gather(*running, waiting, return_exceptions=True)
+        assert all(str(r) == "stop here" for r in results)
+        assert pipeline.load()["in_flight"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_layers_run_off_the_event_loop(self, sample_image_bytes, pipeline_factory):
+        import threading
+        
+        pipeline = pipeline_factory(pipeline_workers=1, max_in_flight_pipelines=1)
+        threads = []
+        
+        def record_validate(context):
+            threads.append(threading.current_thread().name)
+            raise RuntimeError("stop here")
+        
+        pipeline.validator.validate = record_validate
+        with pytest.raises(Exception):
+            await pipeline.process(image_bytes=sample_image_bytes)
+        
+        assert threads[0].startswith("ocr-pipeline")
+
+
+class TestFastPath:
+    """Tests for skipping enhancement and text layout on clean scans."""
+    
+    CLEAN = {
+        "blur": "low", "blur_score": 900.0, "contrast": "ok", "contrast_score": 60.0,
+        "skew_angle": 0.0, "dpi": 300, "is_grayscale": False, "noise_level": 2.0,
+        "needs_deskew": False, "needs_contrast_enhancement": False,
+        "needs_denoising": False, "needs_sharpening": False,
+    }
+    
+    async def run(self, pipeline_factory, image_bytes, metrics):
+        pipeline = pipeline_factory()
+        
+        def analyze(context):
+            context.quality_metrics = metrics
+            return context
+        
+        def enhance(context):
+            context.preprocessed_image = context.cv_image
+            return context
+        
+        def detect(context):
+            context.layout_blocks = []
+            return context
+        
+        pipeline.quality_analyzer.analyze = analyze
+        pipeline.enhancer.enhance = MagicMock(side_effect=enhance)
+        pipeline.layout_detector.detect = MagicMock(side_effect=detect)
+        response = await pipeline.process(image_bytes=image_bytes, filename="test.png")
+        return pipeline, response
+    
+    @pytest.mark.asyncio
+    async def test_clean_scan_takes_fast_path(self, sample_image_bytes, pipeline_factory, tesseract_data):
+        pipeline, response = await self.run(pipeline_factory, sample_image_bytes, dict(self.CLEAN))
+        
+        pipeline.enhancer.enhance.assert_not_called()
+        pipeline.layout_detector.detect.assert_not_called()
+        assert tesseract_data.call_count == 1
+        assert "--psm 3" in tesseract_data.call_args.kwargs["config"]
+        assert response.meta.processing_path == "fast"
+        assert response.meta.skipped_stages == ["preprocessing", "layout_analysis"]
+        # One recognition call; script detection is off by default
+        assert response.meta.ocr_calls == 1
+        assert response.raw_text == "Sample"
+        assert response.blocks[0].bbox.width == 800
+    
+    @pytest.mark.asyncio
+    async def test_noisy_scan_takes_full_path(self, sample_image_bytes, pipeline_factory, tesseract_data):
+        metrics = dict(self.CLEAN, noise_level=14.0, needs_denoising=True)
+        pipeline, response = await self.run(pipeline_factory, sample_image_bytes, metrics)
+        
+        pipeline.enhancer.enhance.assert_called_once()
+        pipeline.layout_detector.detect.assert_called_once()
+        assert response.meta.processing_path == "full"
+        assert response.meta.skipped_stages == []
+
+
+class TestLatencyBudget:
+    """Tests for downgrading optional work to meet a request deadline."""
+    
+    NOISY_BLURRY = dict(
+        TestFastPath.CLEAN, blur="medium", noise_level=14.0,
+        needs_denoising=True, needs_sharpening=True
+    )
+    
+    def test_budget_reserves_ocr_plan(self):
+        from app.core.budget import LatencyBudget, PAGE_OCR
+        
+        budget = LatencyBudget(deadline_ms=1000)
+        budget.megapixels = 1.0
+        # Per-block OCR (660ms) leaves no room for NL-means (1400ms/MP)
+        assert not budget.afford("denoise")
+        assert budget.afford("sharpen")
+        budget.reserve = PAGE_OCR
+        budget.megapixels = 0.25
+        assert budget.afford("denoise")
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("deadline_ms,degradations", [
+        (1e6, []),
+        (1.0, ["denoise_median", "skip_qr_detection", "skip_sharpening", "whole_page_ocr"]),
+    ])
+    async def test_tight_deadline_degrades_optional_work(
+        self, sample_image_bytes, pipeline_factory, tesseract_data, deadline_ms, degradations
+    ):
+        pipeline = pipeline_factory()
+        
+        def analyze(context):
+            context.quality_metrics = dict(self.NOISY_BLURRY)
+            return context
+        
+        pipeline.quality_analyzer.analyze = analyze
+        pipeline.enhancer._denoise = MagicMock(side_effect=lambda gray: gray)
+        pipeline.layout_detector._detect_qr_codes = MagicMock(return_value=[])
+        response = await pipeline.process(
+            image_bytes=sample_image_bytes, filename="test.png", deadline_ms=deadline_ms
+        )
+        
+        assert response.meta.deadline_ms == deadline_ms
+        # QR detection runs alongside quality analysis, so order varies
+        assert sorted(response.meta.degradations) == degradations
+        assert pipeline.enhancer._denoise.called == (not degradations)
+        assert pipeline.layout_detector._detect_qr_codes.called == (not degradations)
+        if degradations:
+            assert response.meta.deadline_met is False
+            assert response.meta.ocr_calls == 1  # Whole-page recognition
+            assert "layout_analysis" in response.meta.skipped_stages
+
+
+class TestStageGraph:
+    """Tests for running pipeline stages as a dependency graph."""
+    
+    @staticmethod
+    def runner(log):
+        import asyncio
+        
+        async def run_stage(stage):
+            log.append(("start", stage.name))
+            await asyncio.sleep(0.01)
+            stage.run(None)
+            log.append(("end", stage.name))
+        return run_stage
+    
+    @pytest.mark.asyncio
+    async def test_independent_stages_overlap_and_inputs_are_freed(self):
+        from types import SimpleNamespace
+        from app.core.stages import Stage, StageGraph
+        
+        context = SimpleNamespace(upload=b"x", image=None, quality=None, qr=None, result=None)
+        
+        def set_attr(name, value):
+            return lambda _: setattr(context, name, value)
+        
+        graph = StageGraph([
+            Stage("decode", set_attr("image", "pixels"), inputs=("upload",), outputs=("image",)),
+            Stage("quality", set_attr("quality", "ok"), inputs=("image",), outputs=("quality",)),
+            Stage("qr", set_attr("qr", []), inputs=("image",), outputs=("qr",)),
+            Stage("ocr", set_attr("result", "text"), inputs=("image", "quality", "qr"), outputs=("result",)),
+        ])
+        log = []
+        await graph.run(context, self.runner(log), keep=("quality",))
+        
+        starts = [name for event, name in log if event == "start"]
+        assert starts[0] == "decode" and starts[-1] == "ocr"
+        # quality and qr both started before either finished
+        assert log.index(("start", "qr")) < log.index(("end", "quality"))
+        assert log.index(("start", "quality")) < log.index(("end", "qr"))
+        assert (context.upload, context.image, context.qr) == (None, None, None)
+        assert (context.quality, context.result) == ("ok", "text")
+        assert graph.upstream("ocr") == ["decode", "quality", "qr"]
+    
+    @pytest.mark.asyncio
+    async def test_error_waits_for_running_stages(self):
+        from types import SimpleNamespace
+        from app.core.stages import Stage, StageGraph
+        
+        def fail(_):
+            raise ValueError("bad image")
+        
+        graph = StageGraph([
+            Stage("a", fail, outputs=("x",)),
+            Stage("b", lambda _: None, outputs=("y",)),
+            Stage("c", lambda _: None, inputs=("x", "y")),
+        ])
+        log = []
+        with pytest.raises(ValueError):
+            await graph.run(SimpleNamespace(x=None, y=None), self.runner(log))
+        
+        assert ("end", "b") in log
+        assert ("start", "c") not in log
+    
+    def test_rejects_reading_before_produced(self):
+        from app.core.stages import Stage, StageGraph
+        
+        with pytest.raises(ValueError):
+            StageGraph([
+                Stage("ocr", lambda c: c, inputs=("image",)),
+                Stage("decode", lambda c: c, outputs=("image",)),
+            ])
+
+
+class TestStageCache:
+    """Tests for reusing stage outputs across requests on the same image."""
+    
+    async def process(self, pipeline, image_bytes, **kwargs):
+        return await pipeline.process(image_bytes=image_bytes, filename="test.png", **kwargs)
+    
+    @pytest.mark.asyncio
+    async def test_analyze_then_ocr_reuses_validation_and_quality(
+        self, sample_image_bytes, pipeline_factory, tesseract_data
+    ):
+        pipeline = pipeline_factory(stage_cache=True)
+        validate = MagicMock(side_effect=pipeline.validator.validate)
+        analyze = MagicMock(side_effect=pipeline.quality_analyzer.analyze)
+        pipeline.validator.validate = validate
+        pipeline.quality_analyzer.analyze = analyze
+        
+        quality = await pipeline.analyze_quality_only(image_bytes=sample_image_bytes, filename="test.png")
+        response = await self.process(pipeline, sample_image_bytes)
+        
+        assert validate.call_count == 1
+        assert analyze.call_count == 1
+        assert response.meta.cached_stages[:2] == ["validation", "quality_analysis"]
+        assert response.quality.blur_score == quality.blur_score
+        
+        # Same image again: only OCR and post-processing run
+        response = await self.process(pipeline, sample_image_bytes)
+        assert set(response.meta.cached_stages) == {
+            "validation", "quality_analysis", "qr_detection", "preprocessing", "layout_analysis"
+        }
+    
+    @pytest.mark.asyncio
+    async def test_changed_settings_redo_downstream_stages(
+        self, sample_image_bytes, pipeline_factory, tesseract_data
+    ):
+        from app.core.config import settings
+        
+        pipeline = pipeline_factory(stage_cache=True)
+        await self.process(pipeline, sample_image_bytes)
+        
+        with patch.object(settings, "max_skew_angle", settings.max_skew_angle + 1):
+            response = await self.process(pipeline, sample_image_bytes)
+        
+        # Preprocessing settings changed: it and layout analysis run again
+        assert set(response.meta.cached_stages) == {"validation", "quality_analysis", "qr_detection"}
+        
+        response = await self.process(pipeline, sample_image_bytes, skip_enhancement=True)
+        assert "preprocessing" not in response.meta.cached_stages
+    
+    def test_cache_evicts_least_recently_used_and_expired(self):
+        import numpy as np
+        from app.core.cache import StageCache
+        
+        cache = StageCache(max_bytes=2500, ttl_seconds=60)
+        for key in "abc":
+            cache.put(key, {"image": np.zeros(1000, dtype=np.uint8)})
+        
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+        assert cache.stats()["bytes"] <= 2500
+        with pytest.raises(ValueError):
+            cache.get("c")["image"][0] = 1
+        
+        cache.ttl_seconds = 0
+        cache.put("d", {"image": np.zeros(10, dtype=np.uint8)})
+        assert cache.get("d") is None
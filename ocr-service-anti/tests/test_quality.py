@@ -62,3 +62,94 @@ class TestQualityAnalyzer:
         
         # Should detect some skew
         assert "skew_angle" in result.quality_metrics
+    
+    @pytest.mark.parametrize("angle", [-6.0, -1.5, 0.0, 2.0, 8.5])
+    def test_skew_estimate_matches_rotation(self, angle):
+        """Rotating a text page should be recovered as the correction angle."""
+        import cv2
+        from app.quality.skew import estimate_skew_angle
+        
+        img = np.full((1500, 2000), 255, dtype=np.uint8)
+        for i in range(15):
+            cv2.putText(img, "Paracetamol 500mg 1x3 after meal", (100, 120 + i * 85),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1.5, 0, 3)
+        rotation = cv2.getRotationMatrix2D((1000, 750), -angle, 1.0)
+        skewed = cv2.warpAffine(img, rotation, (2000, 1500), borderValue=255)
+        
+        assert abs(estimate_skew_angle(skewed) - angle) < 0.3
+    
+    def test_skew_estimate_blank_image(self):
+        """Blank images have no orientation to correct."""
+        from app.quality.skew import estimate_skew_angle
+        
+        assert estimate_skew_angle(np.full((400, 400), 255, dtype=np.uint8)) == 0.0
+    
+    def test_is_clean_requires_every_metric_good(self):
+        clean = {
+            "blur": "low", "contrast": "ok", "needs_deskew": False,
+            "needs_contrast_enhancement": False, "needs_denoising": False,
+            "needs_sharpening": False,
+        }
+        assert self.analyzer.is_clean(clean)
+        assert not self.analyzer.is_clean(dict(clean, contrast="high"))
+        assert not self.analyzer.is_clean(dict(clean, needs_deskew=True))
+        assert not self.analyzer.is_clean(dict(clean, blur="medium", needs_sharpening=True))
+    
+    def test_small_image_metrics_match_full_resolution(self):
+        """Scores equal those of a float64 Laplacian."""
+        import cv2
+        
+        rng = np.random.default_rng(0)
+        img = np.full((600, 800), 230, dtype=np.uint8)
+        for i in range(6):
+            cv2.putText(img, "Amoxicillin 250mg", (40, 80 + i * 80), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 20, 2)
+        img = np.clip(img + rng.normal(0, 6, img.shape), 0, 255).astype(np.uint8)
+        
+        metrics = self.analyzer.analyze(MockContext(cv_image=img)).quality_metrics
+        laplacian = cv2.Laplacian(img, cv2.CV_64F)
+        
+        assert metrics["blur_score"] == pytest.approx(laplacian.var())
+        assert metrics["noise_level"] == pytest.approx(np.median(np.abs(laplacian)) / 0.6745)
+        assert metrics["contrast_score"] == pytest.approx(np.std(img))
+        assert type(metrics["needs_denoising"]) is bool
+    
+    @pytest.mark.parametrize("blur,noise", [
+        (0, 0), (0, 2), (0, 2.5), (0.8, 0), (1.2, 0), (1.5, 2), (3, 0)
+    ])
+    def test_decisions_match_full_resolution_on_photos(self, blur, noise):
+        """
+        Phone-size photos keep the blur level, needs_* flags and the
+        too-blurry rejection of a float64 full-resolution analysis.
+        Held out: synthetic pages, not the sample prescriptions the
+        benchmark uses.
+        """
+        import cv2
+        from app.core.exceptions import ImageTooBlurryError
+        
+        photo = np.full((4000, 3000), 235, dtype=np.uint8)
+        for i in range(12):
+            cv2.putText(photo, "Paracetamol 500mg 1x3", (150, 300 + i * 300), cv2.FONT_HERSHEY_SIMPLEX, 3.0, 20, 6)
+        if blur:
+            photo = cv2.GaussianBlur(photo, (0, 0), blur)
+        if noise:
+            rng = np.random.default_rng(7)
+            photo = np.clip(photo + rng.normal(0, noise, photo.shape), 0, 255).astype(np.uint8)
+        
+        laplacian = cv2.Laplacian(photo, cv2.CV_64F)
+        blur_score = laplacian.var()
+        noise_level = np.median(np.abs(laplacian)) / 0.6745
+        expected_blur = self.analyzer._classify_blur(blur_score)
+        rejected = expected_blur == "high" and blur_score < self.analyzer.blur_threshold_high / 2
+        
+        context = MockContext(cv_image=cv2.cvtColor(photo, cv2.COLOR_GRAY2BGR))
+        if rejected:
+            with pytest.raises(ImageTooBlurryError):
+                self.analyzer.analyze(context)
+        else:
+            self.analyzer.analyze(context)
+        
+        metrics = context.quality_metrics
+        assert metrics["blur"] == expected_blur
+        assert metrics["needs_sharpening"] == (expected_blur in ["medium", "high"])
+        assert metrics["needs_denoising"] == (noise_level > 10)
+        assert metrics["blur_score"] == pytest.approx(blur_score)
@@ -11,16 +11,77 @@ from fastapi.responses import JSONResponse
 
 from ..core.config import settings
 from ..core.logger import logger
+from ..core.executor import get_ocr_executor, OCRQueueFullError
+from ..core.cache import get_result_cache
 from ..models.raw_ocr import OCRResponse, HealthResponse
-from ..ocr.engines.tesseract import check_tesseract_installed, get_available_languages
-from ..ocr.extractors.raw_text import extract_raw_ocr
+from ..ocr.engines.tesseract import check_tesseract_installed, get_available_languages, get_engine_version
+from ..ocr.extractors.raw_text import extract_raw_ocr_from_path
+from ..utils.upload import spool_upload, SpooledUpload, UploadTooLargeError
 from ..ocr.parsers.tesseract_parser import calculate_page_stats
-from ..utils.image import load_image_from_bytes, get_image_info
 
 
 router = APIRouter(prefix="/ocr", tags=["OCR"])
 
 
+def too_large_exception(error: UploadTooLargeError) -> HTTPException:
+    """Build the 413 response for an oversized upload"""
+    logger.warning(str(error))
+    return HTTPException(status_code=413, detail=str(error))
+
+
+def queue_full_exception(error: OCRQueueFullError) -> HTTPException:
+    """Build the 429 response for a saturated OCR executor"""
+    logger.warning(str(error))
+    return HTTPException(
+        status_code=429,
+        detail="OCR service busy, please retry later",
+        headers={"Retry-After": str(settings.OCR_RETRY_AFTER_SECONDS)}
+    )
+
+
+async def run_cached(upload: SpooledUpload, func, cache_params: dict, **kwargs) -> dict:
+    """
+    Run an OCR job on the executor, reusing a cached result when the same
+    image was already processed with the same parameters
+    
+    Only the spooled file path is sent to the worker, which decodes the
+    image itself; the upload bytes never sit in the API process memory.
+    
+    Args:
+        upload: Spooled upload
+        func: Executor job taking (image_path, **kwargs)
+        cache_params: Parameters that identify the output, besides kwargs
+        **kwargs: Arguments for func
+        
+    Returns:
+        OCR result dictionary
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return await get_ocr_executor().submit(func, str(upload.path), **kwargs)
+    
+    cache_key = cache.make_key(
+        upload.sha256,
+        engine_version=get_engine_version(),
+        decode=(settings.IMAGE_DECODE_MODE, settings.DECODE_TARGET_TEXT_HEIGHT,
+                settings.DECODE_TARGET_DPI, settings.DECODE_MIN_SIDE),
+        target_text_height=settings.OCR_TARGET_TEXT_HEIGHT,
+        ocr_config=(settings.OCR_OEM, settings.OCR_PSM, settings.OCR_BINARIZATION),
+        **cache_params,
+        **kwargs
+    )
+    
+    result = cache.get(cache_key)
+    if result is not None:
+        logger.info(f"OCR result cache hit: {cache_key[:16]}")
+        return result
+    
+    result = await get_ocr_executor().submit(func, str(upload.path), **kwargs)
+    cache.put(cache_key, result)
+    
+    return result
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """
@@ -29,12 +90,14 @@ async def health_check():
     """
     tesseract_ok = check_tesseract_installed()
     languages = get_available_languages() if tesseract_ok else []
+    cache = get_result_cache()
     
     return HealthResponse(
         status="healthy" if tesseract_ok else "degraded",
         tesseract_installed=tesseract_ok,
         available_languages=languages,
-        version=settings.APP_VERSION
+        version=settings.APP_VERSION,
+        result_cache=cache.stats() if cache else None
     )
 
 
@@ -67,29 +130,20 @@ async def extract_text(
         )
     
     try:
-        # Read and decode image
-        contents = await file.read()
-        
-        # Check file size
-        file_size_mb = len(contents) / (1024 * 1024)
-        if file_size_mb > settings.MAX_FILE_SIZE_MB:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File too large: {file_size_mb:.2f}MB. Max: {settings.MAX_FILE_SIZE_MB}MB"
+        # Stream the upload to disk (size-limited), then decode and extract
+        # OCR in a worker process (or reuse cached result)
+        async with spool_upload(file) as upload:
+            result = await run_cached(
+                upload,
+                extract_raw_ocr_from_path,
+                cache_params={"endpoint": "extract"},
+                apply_preprocessing=apply_preprocessing,
+                languages=languages or settings.OCR_LANGUAGES,
+                include_low_confidence=include_low_confidence
             )
-        
-        image = load_image_from_bytes(contents)
-        image_info = get_image_info(image)
+        image_info = result["image_info"]
         logger.info(f"Image loaded: {image_info}")
         
-        # Extract OCR
-        result = extract_raw_ocr(
-            image,
-            apply_preprocessing=apply_preprocessing,
-            languages=languages,
-            include_low_confidence=include_low_confidence
-        )
-        
         # Calculate stats if requested
         stats = None
         if include_stats:
@@ -102,9 +156,14 @@ async def extract_text(
             page=1,
             raw=result["raw"],
             stats=stats,
-            languages_used=result["languages_used"]
+            languages_used=result["languages_used"],
+            preprocessing=result.get("preprocessing")
         )
         
+    except UploadTooLargeError as e:
+        raise too_large_exception(e)
+    except OCRQueueFullError as e:
+        raise queue_full_exception(e)
     except HTTPException:
         raise
     except Exception as e:
@@ -132,21 +191,21 @@ async def extract_and_save(
     logger.info(f"OCR extract-and-save request: {file.filename}")
     
     try:
-        # Read and decode image
-        contents = await file.read()
-        image = load_image_from_bytes(contents)
-        
-        # Extract OCR
-        result = extract_raw_ocr(
-            image,
-            apply_preprocessing=apply_preprocessing,
-            languages=languages,
-            include_low_confidence=True
-        )
+        # Stream the upload to disk (size-limited), then decode and extract
+        # OCR in a worker process (or reuse cached result)
+        async with spool_upload(file) as upload:
+            result = await run_cached(
+                upload,
+                extract_raw_ocr_from_path,
+                cache_params={"endpoint": "extract"},
+                apply_preprocessing=apply_preprocessing,
+                languages=languages or settings.OCR_LANGUAGES,
+                include_low_confidence=True
+            )
         
         # Calculate stats
         stats = calculate_page_stats(result["raw"])
-        image_info = get_image_info(image)
+        image_info = result["image_info"]
         stats["image_width"] = image_info["width"]
         stats["image_height"] = image_info["height"]
         
@@ -169,7 +228,8 @@ async def extract_and_save(
             "page": 1,
             "raw": result["raw"],
             "stats": stats,
-            "languages_used": result["languages_used"]
+            "languages_used": result["languages_used"],
+            "preprocessing": result.get("preprocessing")
         }
         
         # Save to file
@@ -186,6 +246,10 @@ async def extract_and_save(
             "stats": stats
         })
         
+    except UploadTooLargeError as e:
+        raise too_large_exception(e)
+    except OCRQueueFullError as e:
+        raise queue_full_exception(e)
     except Exception as e:
         logger.error(f"Extract and save failed: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -197,7 +261,15 @@ async def extract_medical_prescription_endpoint(
     apply_advanced_preprocessing: bool = Form(default=True, description="Apply advanced preprocessing"),
     detect_tables: bool = Form(default=True, description="Detect and extract tables"),
     extract_structured: bool = Form(default=True, description="Extract structured data"),
-    upscale_factor: float = Form(default=1.5, description="Image upscale factor"),
+    upscale_factor: Optional[float] = Form(
+        default=None,
+        description="Image scale factor (default: chosen from the measured text height)"
+    ),
+    two_pass: Optional[bool] = Form(
+        default=None,
+        description="Cheap first pass, then re-OCR only low-confidence lines at higher resolution "
+                    "(default: TWO_PASS_OCR setting)"
+    ),
     languages: Optional[str] = Form(default=None, description="OCR languages"),
     output_name: Optional[str] = Form(default=None, description="Output file name")
 ):
@@ -216,7 +288,7 @@ async def extract_medical_prescription_endpoint(
     logger.info(f"Medical OCR request: {file.filename}")
     
     # Import here to avoid circular imports
-    from ..ocr.extractors.medical_ocr import extract_medical_prescription
+    from ..ocr.extractors.medical_ocr import extract_medical_prescription_from_path
     
     # Validate file type
     if not file.content_type or not file.content_type.startswith("image/"):
@@ -226,30 +298,25 @@ async def extract_medical_prescription_endpoint(
         )
     
     try:
-        # Read and decode image
-        contents = await file.read()
-        
-        # Check file size
-        file_size_mb = len(contents) / (1024 * 1024)
-        if file_size_mb > settings.MAX_FILE_SIZE_MB:
-            raise HTTPException(
-                status_code=413,
-                detail=f"File too large: {file_size_mb:.2f}MB. Max: {settings.MAX_FILE_SIZE_MB}MB"
+        # Stream the upload to disk (size-limited), then decode and run enhanced
+        # medical OCR in a worker process (or reuse cached result)
+        async with spool_upload(file) as upload:
+            result = await run_cached(
+                upload,
+                extract_medical_prescription_from_path,
+                cache_params={
+                    "endpoint": "extract-medical",
+                    "line_reocr": (settings.TWO_PASS_TEXT_HEIGHT, settings.LINE_REOCR_CONFIDENCE,
+                                 settings.LINE_REOCR_SCALE, settings.LINE_REOCR_MAX_LINES),
+                },
+                apply_advanced_preprocessing=apply_advanced_preprocessing,
+                detect_tables=detect_tables,
+                extract_structured=extract_structured,
+                languages=languages or settings.OCR_LANGUAGES,
+                upscale_factor=upscale_factor,
+                two_pass=settings.TWO_PASS_OCR if two_pass is None else two_pass
             )
         
-        image = load_image_from_bytes(contents)
-        logger.info(f"Image loaded: {image.shape}")
-        
-        # Run enhanced medical OCR
-        result = extract_medical_prescription(
-            image,
-            apply_advanced_preprocessing=apply_advanced_preprocessing,
-            detect_tables=detect_tables,
-            extract_structured=extract_structured,
-            languages=languages,
-            upscale_factor=upscale_factor
-        )
-        
         # Optionally save results
         if output_name:
             results_dir = settings.RESULTS_DIR
@@ -269,6 +336,10 @@ async def extract_medical_prescription_endpoint(
         
         return JSONResponse(result)
         
+    except UploadTooLargeError as e:
+        raise too_large_exception(e)
+    except OCRQueueFullError as e:
+        raise queue_full_exception(e)
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,156 @@
+"""
+OCR Result Cache
+Content-addressed cache of OCR results keyed by image hash + extraction parameters
+"""
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+from .config import settings
+from .logger import logger
+
+
+class OCRResultCache:
+    """
+    Two-tier OCR result cache
+
+    - Memory: LRU of serialized results, evicted by total size in bytes
+    - Disk (optional): one JSON file per key, promoted to memory on hit
+
+    Results are stored as UTF-8 JSON so cached copies can't be mutated
+    by callers and their memory footprint is known exactly.
+    """
+
+    def __init__(self, max_bytes: int, disk_dir: Optional[Path] = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(image_hash: str, **params: Any) -> str:
+        """
+        Build a cache key from the image hash and extraction parameters
+
+        Args:
+            image_hash: SHA-256 hex digest of the uploaded image
+            **params: Parameters that affect the OCR output
+
+        Returns:
+            "<sha256 of image>-<hash of params>"
+        """
+        params_blob = json.dumps(params, sort_keys=True, default=str)
+        params_hash = hashlib.sha256(params_blob.encode("utf-8")).hexdigest()[:16]
+        return f"{image_hash}-{params_hash}"
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _store(self, key: str, blob: bytes) -> None:
+        """Insert into the memory tier and evict least recently used entries"""
+        size = len(blob)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            self._entries[key] = blob
+            self._size += size
+
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached result or None
+        """
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+
+        if blob is None and self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                blob = path.read_bytes()
+                self.disk_hits += 1
+                self._store(key, blob)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to read cached result {path}: {e}")
+
+        if blob is None:
+            self.misses += 1
+            return None
+
+        return json.loads(blob)
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Store a result
+
+        Args:
+            key: Cache key from make_key
+            result: JSON-serializable OCR result
+        """
+        blob = json.dumps(result, ensure_ascii=False).encode("utf-8")
+        self._store(key, blob)
+
+        if self.disk_dir is not None:
+            path = self._disk_path(key)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix(".tmp")
+                tmp_path.write_bytes(blob)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"Failed to write cached result {path}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and memory usage"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "disk_enabled": self.disk_dir is not None,
+        }
+
+
+_cache: Optional[OCRResultCache] = None
+
+
+def get_result_cache() -> Optional[OCRResultCache]:
+    """Get the application-wide result cache (None if disabled)"""
+    global _cache
+    if not settings.RESULT_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        disk_dir = settings.RESULTS_DIR / "cache" if settings.RESULT_CACHE_DISK else None
+        _cache = OCRResultCache(
+            max_bytes=settings.RESULT_CACHE_MAX_MB * 1024 * 1024,
+            disk_dir=disk_dir
+        )
+    return _cache
@@ -1,9 +1,12 @@
 """
 OCR Service Configuration
-Loads settings from environment variables
+Loads settings from environment variables, on top of an optional tuned
+profile (OCR_PROFILE, written by scripts/autotune.py)
 """
 import os
+import json
 from pathlib import Path
+from typing import Any, Dict
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -22,12 +25,49 @@ class Settings(BaseSettings):
     OCR_LANGUAGES: str = "khm+eng+fra"  # Khmer first (dominant in Cambodia)
     OCR_OEM: int = 3  # Default OCR Engine Mode (LSTM + Legacy)
     OCR_PSM: int = 6  # Page segmentation mode (Uniform block of text)
+    OCR_PROFILE: Path | None = None  # Tuned profile JSON (scripts/autotune.py); env vars override it
     OCR_CONFIDENCE_THRESHOLD: int = 0  # Minimum confidence (0 = include all)
+    TABLE_CELL_REOCR_CONFIDENCE: int = 60  # Re-OCR table cells below this confidence
+    MULTI_METHOD_CONFIDENCE: int = 80  # Multi-method extraction stops once a method reaches this
+    
+    # Two-pass medical extraction: a cheap first pass, then only lines below
+    # LINE_REOCR_CONFIDENCE are re-rendered LINE_REOCR_SCALE times larger and re-OCR'd
+    TWO_PASS_OCR: bool = False
+    TWO_PASS_TEXT_HEIGHT: int = 20  # Text height (px) the first pass scales to
+    LINE_REOCR_CONFIDENCE: int = 60
+    LINE_REOCR_SCALE: float = 2.0
+    LINE_REOCR_MAX_LINES: int = 20
+    TESSDATA_DIR: str | None = "/usr/share/tesseract/tessdata"
+    
+    # OCR engine backend: "pytesseract" (subprocess per call) or
+    # "tesserocr" (pooled in-process engines, falls back to pytesseract)
+    OCR_ENGINE: str = "pytesseract"
+    OCR_ENGINE_POOL_SIZE: int = 2  # Engine handles per language/mode combo
     
     # User words file path (for custom Khmer words)
     USER_WORDS_PATH: str | None = None
     
+    # OCR worker pool (0 = one worker per CPU core / OCR_THREADS_PER_WORKER)
+    OCR_WORKERS: int = 0
+    OCR_THREADS_PER_WORKER: int = 1  # OMP_THREAD_LIMIT and cv2.setNumThreads per worker
+    OCR_QUEUE_SIZE: int = 16  # Requests allowed to wait for a worker before 429
+    OCR_RETRY_AFTER_SECONDS: int = 5
+    
+    # OCR result cache (keyed by image SHA-256 + extraction parameters)
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MAX_MB: int = 64  # In-memory LRU size
+    RESULT_CACHE_DISK: bool = False  # Also persist results under RESULTS_DIR/cache
+    
+    # Image decoding: "full", or "reduced" to decode large JPEGs at 1/2, 1/4
+    # or 1/8 scale (libjpeg DCT scaling) when their text is large enough
+    IMAGE_DECODE_MODE: str = "reduced"
+    DECODE_TARGET_TEXT_HEIGHT: int = 40  # Text height (px) kept after reduction
+    DECODE_TARGET_DPI: int = 300  # Used when no text height can be measured
+    DECODE_MIN_SIDE: int = 1600  # Long side (px) is never reduced below this
+    
     # Image preprocessing
+    OCR_TARGET_TEXT_HEIGHT: int = 32  # Text height (px) automatic scaling aims for
+    OCR_BINARIZATION: str = "gaussian"  # Medical binarization: gaussian, mean or otsu
     DENOISE_STRENGTH: int = 15
     ADAPTIVE_THRESHOLD_BLOCK_SIZE: int = 31
     ADAPTIVE_THRESHOLD_C: int = 10
@@ -46,10 +86,44 @@ class Settings(BaseSettings):
         case_sensitive = True
 
 
+def load_profile(path: Path) -> Dict[str, Any]:
+    """
+    Read the settings of a tuned profile
+    
+    Args:
+        path: Profile JSON written by scripts/autotune.py
+        
+    Returns:
+        Setting name -> value
+        
+    Raises:
+        ValueError: If the profile names a setting that does not exist
+    """
+    with open(path, encoding="utf-8") as f:
+        values = json.load(f)["settings"]
+    
+    unknown = sorted(set(values) - set(Settings.model_fields))
+    if unknown:
+        raise ValueError(f"Unknown settings in OCR profile {path}: {', '.join(unknown)}")
+    
+    return values
+
+
 @lru_cache()
 def get_settings() -> Settings:
-    """Get cached settings instance"""
-    return Settings()
+    """
+    Get cached settings instance
+    
+    Profile values replace the defaults; settings given explicitly through
+    the environment or .env still win over the profile.
+    """
+    settings = Settings()
+    if settings.OCR_PROFILE is None:
+        return settings
+    
+    profile = load_profile(settings.OCR_PROFILE)
+    explicit = settings.model_fields_set
+    return Settings(**{name: value for name, value in profile.items() if name not in explicit})
 
 
 settings = get_settings()
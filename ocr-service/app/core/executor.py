@@ -0,0 +1,187 @@
+"""
+OCR Executor
+Runs blocking OCR work in a bounded process pool so async handlers
+never stall the event loop
+"""
+import os
+import pickle
+import asyncio
+import functools
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+from .config import settings
+from .logger import logger
+
+
+class OCRQueueFullError(RuntimeError):
+    """Raised when every worker is busy and the wait queue is full"""
+
+    def __init__(self, in_flight: int, capacity: int):
+        self.in_flight = in_flight
+        self.capacity = capacity
+        super().__init__(f"OCR queue full ({in_flight}/{capacity} requests in flight)")
+
+
+def _init_worker(threads: int) -> None:
+    """
+    Pin per-worker thread counts so workers don't oversubscribe cores
+
+    OMP_THREAD_LIMIT is inherited by Tesseract (subprocess or in-process),
+    cv2.setNumThreads limits OpenCV's own thread pool.
+    """
+    os.environ["OMP_THREAD_LIMIT"] = str(threads)
+    try:
+        import cv2
+        cv2.setNumThreads(threads)
+    except ImportError:
+        pass
+
+
+def _run_job(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a job in a worker, making sure any exception can cross back
+
+    Exceptions that can't be unpickled (e.g. pytesseract's
+    TesseractNotFoundError) would otherwise break the whole pool.
+    """
+    try:
+        return func(*args, **kwargs)
+    except Exception as e:
+        try:
+            pickle.loads(pickle.dumps(e))
+        except Exception:
+            raise RuntimeError(f"{type(e).__name__}: {e}") from None
+        raise
+
+
+class OCRExecutor:
+    """
+    Process pool for CPU-bound OCR jobs with a bounded wait queue
+
+    At most `max_workers + max_queue` jobs are accepted at once;
+    beyond that `submit` raises OCRQueueFullError immediately.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        threads_per_worker: Optional[int] = None,
+        max_queue: Optional[int] = None
+    ):
+        self.threads_per_worker = max(1, threads_per_worker or settings.OCR_THREADS_PER_WORKER)
+        cpu_count = os.cpu_count() or 1
+        self.max_workers = (
+            max_workers
+            or settings.OCR_WORKERS
+            or max(1, cpu_count // self.threads_per_worker)
+        )
+        self.max_queue = settings.OCR_QUEUE_SIZE if max_queue is None else max_queue
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of accepted jobs (running + waiting)"""
+        return self.max_workers + self.max_queue
+
+    def start(self) -> None:
+        """Start the worker processes"""
+        if self._pool is not None:
+            return
+        # Spawn rather than fork so workers don't inherit the event loop's threads
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.threads_per_worker,)
+        )
+        logger.info(
+            f"OCR executor started: {self.max_workers} workers x "
+            f"{self.threads_per_worker} threads, queue size {self.max_queue}"
+        )
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def submit(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a picklable function in the pool and await its result
+
+        Cancelling the caller only removes a job that no worker has
+        picked up yet; a running job keeps its slot until it finishes,
+        so admission control never counts a busy worker as free.
+
+        Args:
+            func: Module-level function to run in a worker
+            *args, **kwargs: Arguments for func (must be picklable)
+
+        Returns:
+            Result of func
+
+        Raises:
+            OCRQueueFullError: If the executor is at capacity
+        """
+        if self._in_flight >= self.capacity:
+            raise OCRQueueFullError(self._in_flight, self.capacity)
+
+        self.start()
+        pool = self._pool
+        loop = asyncio.get_running_loop()
+        try:
+            future = pool.submit(_run_job, func, *args, **kwargs)
+            self._in_flight += 1
+            # Released when the worker is done, not when the caller stops waiting
+            future.add_done_callback(functools.partial(self._release, loop))
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM) - recreate the pool on next submit
+            logger.error("OCR worker pool broken, restarting on next request")
+            self._discard_pool(pool)
+            raise
+
+    def _release(self, loop: asyncio.AbstractEventLoop, _future: Future) -> None:
+        """Free an in-flight slot (called from the pool's management thread)"""
+        try:
+            loop.call_soon_threadsafe(self._decrement)
+        except RuntimeError:
+            # Loop already closed (shutdown)
+            self._decrement()
+
+    def _decrement(self) -> None:
+        self._in_flight -= 1
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Shut down a broken pool so its management thread and surviving workers exit"""
+        if self._pool is pool:
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Current pool usage"""
+        return {
+            "workers": self.max_workers,
+            "threads_per_worker": self.threads_per_worker,
+            "in_flight": self._in_flight,
+            "queued": max(0, self._in_flight - self.max_workers),
+            "max_queue": self.max_queue,
+        }
+
+
+_executor: Optional[OCRExecutor] = None
+
+
+def get_ocr_executor() -> OCRExecutor:
+    """Get the application-wide OCR executor"""
+    global _executor
+    if _executor is None:
+        _executor = OCRExecutor()
+    return _executor
@@ -5,12 +5,16 @@ Supports: Khmer (khm), English (eng), French (fra)
 """
 from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from .core.config import settings
 from .core.logger import logger
+from .core.executor import get_ocr_executor
+from .core.cache import get_result_cache
 from .api.ocr import router as ocr_router
+from .utils.upload import max_request_bytes
 from .ocr.engines.tesseract import check_tesseract_installed, get_available_languages
 
 
@@ -39,10 +43,17 @@ async def lifespan(app: FastAPI):
     settings.RESULTS_DIR.mkdir(parents=True, exist_ok=True)
     logger.info(f"Results directory: {settings.RESULTS_DIR.absolute()}")
     
+    # Start OCR worker processes
+    get_ocr_executor().start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down OCR Service")
+    get_ocr_executor().shutdown()
+    if settings.OCR_ENGINE == "tesserocr":
+        from .ocr.engines.engine_pool import get_engine_pool
+        get_engine_pool().close()
 
 
 # Create FastAPI application
@@ -81,6 +92,25 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """
+    Reject uploads whose declared Content-Length exceeds the limit
+    before Starlette receives the multipart body (uploads without a
+    Content-Length are received in full and limited when spooled)
+    """
+    content_length = request.headers.get("content-length")
+    if request.method == "POST" and content_length and content_length.isdigit():
+        if int(content_length) > max_request_bytes():
+            logger.warning(f"Rejected upload: Content-Length {content_length} over limit")
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"File too large. Max: {settings.MAX_FILE_SIZE_MB}MB"}
+            )
+    return await call_next(request)
+
+
 # Include routers
 app.include_router(ocr_router, prefix=settings.API_V1_PREFIX)
 
@@ -101,9 +131,12 @@ async def root():
 async def health():
     """Simple health check"""
     tesseract_ok = check_tesseract_installed()
+    cache = get_result_cache()
     return {
         "status": "healthy" if tesseract_ok else "degraded",
-        "tesseract": tesseract_ok
+        "tesseract": tesseract_ok,
+        "ocr_executor": get_ocr_executor().stats(),
+        "result_cache": cache.stats() if cache else None
     }
 
 
@@ -39,6 +39,7 @@ class OCRResponse(BaseModel):
     raw: List[Dict[str, Any]] = Field(default_factory=list, description="Raw OCR results")
     stats: Optional[Dict[str, Any]] = Field(default=None, description="OCR statistics")
     languages_used: str = Field(default="khm+eng+fra", description="Languages used for OCR")
+    preprocessing: Optional[Dict[str, Any]] = Field(default=None, description="Preprocessing steps applied, in order, with timings")
     error: Optional[str] = Field(default=None, description="Error message if failed")
 
 
@@ -48,3 +49,4 @@ class HealthResponse(BaseModel):
     tesseract_installed: bool = Field(..., description="Tesseract availability")
     available_languages: List[str] = Field(default_factory=list, description="Available OCR languages")
     version: str = Field(..., description="Service version")
+    result_cache: Optional[Dict[str, Any]] = Field(default=None, description="OCR result cache hit/miss counters")
@@ -0,0 +1,224 @@
+"""
+In-process Tesseract Engine Pool
+Keeps long-lived Tesseract API handles (via the tesserocr C-API binding)
+so each OCR call skips the process fork, temp PNG and traineddata reload
+that pytesseract pays on every invocation.
+"""
+import threading
+import queue
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple, Iterator
+import numpy as np
+import cv2
+from ...core.config import settings
+from ...core.logger import logger
+
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    tesserocr = None
+    TESSEROCR_AVAILABLE = False
+
+
+# Columns of Tesseract TSV output (same keys as pytesseract Output.DICT)
+TSV_COLUMNS = [
+    "level", "page_num", "block_num", "par_num", "line_num", "word_num",
+    "left", "top", "width", "height", "conf", "text"
+]
+
+# Key identifying one kind of engine handle:
+# (lang, oem, psm, tessdata_dir, user_words, sorted variables)
+EngineKey = Tuple[str, int, int, Optional[str], Optional[str], Tuple[Tuple[str, str], ...]]
+
+
+class TesseractEnginePool:
+    """
+    Pool of initialized tesserocr handles, one queue per language/mode combo
+
+    Handles are created lazily up to `size` per key. A handle is only ever
+    used by one thread at a time; callers block until one is free.
+    """
+
+    def __init__(self, size: int):
+        self.size = max(1, size)
+        self._queues: Dict[EngineKey, "queue.Queue"] = {}
+        self._created: Dict[EngineKey, int] = {}
+        self._lock = threading.Lock()
+
+    def _create_handle(self, key: EngineKey):
+        lang, oem, psm, tessdata_dir, user_words, extra_variables = key
+        variables = dict(extra_variables)
+        if user_words:
+            # user_words_file is an init-only variable
+            variables["user_words_file"] = user_words
+
+        kwargs = {
+            "lang": lang,
+            "oem": tesserocr.OEM(oem),
+            "psm": tesserocr.PSM(psm),
+            "variables": variables,
+        }
+        if tessdata_dir:
+            kwargs["path"] = tessdata_dir
+
+        logger.info(f"Initializing in-process Tesseract engine: lang={lang}, oem={oem}, psm={psm}")
+        return tesserocr.PyTessBaseAPI(**kwargs)
+
+    @contextmanager
+    def acquire(self, key: EngineKey) -> Iterator["tesserocr.PyTessBaseAPI"]:
+        """
+        Check out an engine handle for the given key
+
+        Args:
+            key: (lang, oem, psm, tessdata_dir, user_words, variables)
+
+        Yields:
+            Initialized PyTessBaseAPI, returned to the pool on exit
+        """
+        with self._lock:
+            handles = self._queues.setdefault(key, queue.Queue())
+            handle = None
+            try:
+                handle = handles.get_nowait()
+            except queue.Empty:
+                if self._created.get(key, 0) < self.size:
+                    self._created[key] = self._created.get(key, 0) + 1
+                    create = True
+                else:
+                    create = False
+
+        if handle is None:
+            if create:
+                try:
+                    handle = self._create_handle(key)
+                except Exception:
+                    with self._lock:
+                        self._created[key] -= 1
+                    raise
+            else:
+                handle = handles.get()
+
+        try:
+            yield handle
+        finally:
+            handle.Clear()
+            handles.put(handle)
+
+    def close(self) -> None:
+        """Release all engine handles"""
+        with self._lock:
+            for handles in self._queues.values():
+                while True:
+                    try:
+                        handles.get_nowait().End()
+                    except queue.Empty:
+                        break
+            self._queues.clear()
+            self._created.clear()
+
+
+_pool: Optional[TesseractEnginePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_engine_pool() -> TesseractEnginePool:
+    """Get the process-wide engine pool (created on first use)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = TesseractEnginePool(settings.OCR_ENGINE_POOL_SIZE)
+    return _pool
+
+
+def _tsv_to_dict(tsv: str) -> Dict[str, List]:
+    """Convert headerless Tesseract TSV text to pytesseract's Output.DICT layout"""
+    data: Dict[str, List] = {col: [] for col in TSV_COLUMNS}
+    text_idx = len(TSV_COLUMNS) - 1
+
+    for row in tsv.splitlines():
+        if not row:
+            continue
+        cells = row.split("\t")
+        if len(cells) < text_idx:
+            continue
+        if len(cells) == text_idx:
+            cells.append("")
+
+        for i, col in enumerate(TSV_COLUMNS):
+            value = cells[i]
+            if i != text_idx:
+                try:
+                    value = int(float(value))
+                except ValueError:
+                    pass
+            data[col].append(value)
+
+    return data
+
+
+def _set_numpy_image(api, image: np.ndarray) -> None:
+    """Hand a numpy buffer to Tesseract without encoding it first"""
+    if image.dtype != np.uint8:
+        image = image.astype(np.uint8)
+
+    if len(image.shape) == 3:
+        if image.shape[2] == 4:
+            image = cv2.cvtColor(image, cv2.COLOR_BGRA2RGB)
+        elif image.shape[2] == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        else:
+            image = image[:, :, 0]
+
+    image = np.ascontiguousarray(image)
+    height, width = image.shape[:2]
+    bytes_per_pixel = 1 if image.ndim == 2 else image.shape[2]
+
+    api.SetImageBytes(image.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel)
+
+
+def image_to_data(
+    image: np.ndarray,
+    lang: str,
+    oem: int,
+    psm: int,
+    dpi: Optional[int] = None,
+    variables: Optional[Dict[str, str]] = None,
+    tessdata_dir: Optional[str] = None,
+    user_words: Optional[str] = None
+) -> Dict[str, List]:
+    """
+    Run Tesseract in-process on a numpy image
+
+    Args:
+        image: Grayscale or BGR image
+        lang: Language string (e.g., "khm+eng+fra")
+        oem: OCR Engine Mode
+        psm: Page Segmentation Mode
+        dpi: Source resolution hint
+        variables: Tesseract variables (e.g., tessedit_char_whitelist)
+        tessdata_dir: Tessdata directory
+        user_words: Path to user words file
+
+    Returns:
+        Dictionary in the same format as pytesseract.image_to_data(Output.DICT)
+
+    Raises:
+        RuntimeError: If tesserocr is not installed
+    """
+    if not TESSEROCR_AVAILABLE:
+        raise RuntimeError("tesserocr is not installed")
+
+    # Variables are applied at init so handles never leak settings between callers
+    key = (lang, oem, psm, tessdata_dir, user_words, tuple(sorted((variables or {}).items())))
+
+    with get_engine_pool().acquire(key) as api:
+        _set_numpy_image(api, image)
+        if dpi:
+            api.SetSourceResolution(dpi)
+
+        api.Recognize()
+        tsv = api.GetTSVText(0)
+
+    return _tsv_to_dict(tsv)
@@ -3,54 +3,45 @@ Enhanced Tesseract OCR Engine for Cambodian Prescriptions
 Optimized preprocessing for better mixed-language accuracy
 """
 import os
-import pytesseract
+import re
 import cv2
 import numpy as np
-from pytesseract import Output
 from typing import Dict, List, Any, Optional
 from ...core.config import settings
 from ...core.logger import logger
+from ..preprocess.plan import PreprocessingPlan
+
+# Common prescription characters (Latin, digits, Khmer, punctuation)
+PRESCRIPTION_CHAR_WHITELIST = (
+    "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+    "កខគឃងចឆជឈញដឋឌឍណតថទធនបផពមយរលវសហឡអឣឤឥឦឧឪឮឰឲឳ឴឵ិីឹឺុូួើឿ.,-+|/:()[]"
+)
+
+# Canonical spelling of medical terms in mixed languages
+MEDICAL_TERMS = [
+    # English medical terms
+    'Paracetamol', 'Amoxicillin', 'Ibuprofen', 'Metformin', 'Insulin', 'Glibenclamide',
+    # Common dosage terms
+    'mg', 'g', 'tablet', 'capsule',
+    # Khmer medical terms
+    'ថ្ងៃ',  # day
+    'ព្រឹក',  # morning
+    'ល្ងាច',  # evening
+    'យប់',  # night
+    'និង',  # and
+    'សម្រាប់',  # for
+    # French medical terms
+    'matin', 'soir', 'nuit', 'comprimé', 'gélule',
+]
+
+# Lowercased term -> canonical spelling (first listed spelling wins)
+MEDICAL_CORRECTIONS: Dict[str, str] = {}
+for _term in MEDICAL_TERMS:
+    MEDICAL_CORRECTIONS.setdefault(_term.lower(), _term)
 
 def fix_medical_terms(text: str) -> str:
     """Fix common medical term OCR errors in mixed languages"""
-    medical_corrections = {
-        # English medical terms
-        'Paracetamol': 'Paracetamol',
-        'Amoxicillin': 'Amoxicillin', 
-        'Ibuprofen': 'Ibuprofen',
-        'Metformin': 'Metformin',
-        'Insulin': 'Insulin',
-        'Glibenclamide': 'Glibenclamide',
-        
-        # Common dosage corrections
-        'mg': 'mg',
-        'g': 'g',
-        'tablet': 'tablet',
-        'capsule': 'capsule',
-        
-        # Khmer medical terms (common OCR errors)
-        'ថ្ងៃ': 'ថ្ងៃ',  # day
-        'ព្រឹក': 'ព្រឹក',  # morning
-        'ល្ងាច': 'ល្ងាច',  # evening
-        'យប់': 'យប់',  # night
-        'និង': 'និង',  # and
-        'សម្រាប់': 'សម្រាប់',  # for
-        
-        # French medical terms
-        'matin': 'matin',
-        'soir': 'soir', 
-        'nuit': 'nuit',
-        'comprimé': 'comprimé',
-        'gélule': 'gélule',
-    }
-    
-    corrected = text
-    for wrong, right in medical_corrections.items():
-        if text.lower() == wrong.lower():
-            corrected = right
-            break
-    
-    return corrected
+    return MEDICAL_CORRECTIONS.get(text.lower(), text)
 
 def fix_common_ocr_errors(text: str) -> str:
     """Fix common OCR errors for prescription text"""
@@ -78,17 +69,22 @@ def fix_common_ocr_errors(text: str) -> str:
     
     return corrected
 
+# Keywords that mark a word as medical (matched as substrings, case-insensitive)
+MEDICAL_KEYWORDS = frozenset([
+    'paracetamol', 'amoxicillin', 'ibuprofen', 'metformin', 'insulin',
+    'glibenclamide', 'mg', 'tablet', 'capsule', 'dose', ' dosage',
+    'ថ្ងៃ', 'ព្រឹក', 'ល្ងាច', 'យប់',  # Khmer time/medical
+    'matin', 'soir', 'nuit', 'comprimé', 'gélule'  # French medical
+])
+MEDICAL_KEYWORD_PATTERN = re.compile(
+    "|".join(re.escape(keyword) for keyword in sorted(MEDICAL_KEYWORDS, key=len, reverse=True))
+)
+
 def is_medical_term(text: str) -> bool:
     """Check if text contains medical terms"""
-    medical_keywords = [
-        'paracetamol', 'amoxicillin', 'ibuprofen', 'metformin', 'insulin',
-        'glibenclamide', 'mg', 'tablet', 'capsule', 'dose', ' dosage',
-        'ថ្ងៃ', 'ព្រឹក', 'ល្ងាច', 'យប់',  # Khmer time/medical
-        'matin', 'soir', 'nuit', 'comprimé', 'gélule'  # French medical
-    ]
-    
     text_lower = text.lower()
-    return any(keyword in text_lower for keyword in medical_keywords)
+    # Exact hits are a set lookup; only fall back to the substring scan otherwise
+    return text_lower in MEDICAL_KEYWORDS or MEDICAL_KEYWORD_PATTERN.search(text_lower) is not None
 
 def detect_dominant_language(text_list: List[str]) -> str:
     """Detect dominant language from OCR text"""
@@ -123,6 +119,12 @@ def detect_dominant_language(text_list: List[str]) -> str:
     else:
         return 'mixed'
 
+# Common Khmer OCR character confusions (wrong -> right)
+KHMER_OCR_CORRECTIONS = {
+    'ៈ': 'ឈ',
+}
+KHMER_OCR_TRANSLATION = str.maketrans(KHMER_OCR_CORRECTIONS)
+
 def fix_khmer_ocr_errors(text: str) -> str:
     """
     Fix common Khmer OCR recognition errors
@@ -133,101 +135,46 @@ def fix_khmer_ocr_errors(text: str) -> str:
     Returns:
         Corrected text
     """
-    # Common Khmer OCR corrections
-    corrections = {
-        'ក': 'ក',  # Common character confusions
-        'ខ': 'ខ',
-        'គ': 'គ', 
-        'ឃ': 'ឃ',
-        'ង': 'ង',
-        'ច': 'ច',
-        'ឆ': 'ឆ',
-        'ជ': 'ជ',
-        'ៈ': 'ឈ',
-        'ញ': 'ញ',
-        'ដ': 'ដ',
-        'ឋ': 'ឋ',
-        'ឌ': 'ឌ',
-        'ឍ': 'ឍ',
-        'ណ': 'ណ',
-        'ត': 'ត',
-        'ថ': 'ថ',
-        'ទ': 'ទ',
-        'ធ': 'ធ',
-        'ន': 'ន',
-        'ប': 'ប',
-        'ផ': 'ផ',
-        'ព': 'ព',
-        'ភ': 'ភ',
-        'ម': 'ម',
-        'យ': 'យ',
-        'រ': 'រ',
-        'ល': 'ល',
-        'វ': 'វ',
-        'ស': 'ស',
-        'ហ': 'ហ',
-        'ឡ': 'ឡ',
-        'អ': 'អ',
-        'ឣ': 'ឣ',
-        'ឤ': 'ឤ',
-        'ឥ': 'ឥ',
-        'ឦ': 'ឦ',
-        'ឧ': 'ឧ',
-        'ឪ': 'ឪ',
-        'ឮ': 'ឮ',
-        'ឯ': 'ឯ',
-        'ឰ': 'ឰ',
-        'ឲ': 'ឲ',
-        'ឳ': 'ឳ',
-        '឴': '឴',
-        '឵': '឵',
-        'ិ': 'ិ',
-        'ី': 'ី',
-        'ឹ': 'ឹ',
-        'ឺ': 'ឺ',
-        'ុ': 'ុ',
-        'ូ': 'ូ',
-        'ួ': 'ួ',
-        'ើ': 'ើ',
-        'ឿ': 'ឿ',
-    }
-    
-    # Apply corrections
-    corrected = text
-    for wrong, right in corrections.items():
-        corrected = corrected.replace(wrong, right)
-    
-    return corrected
+    return text.translate(KHMER_OCR_TRANSLATION)
 
-def preprocess_prescription_image(image: np.ndarray) -> np.ndarray:
+def preprocess_prescription_image(
+    image: np.ndarray,
+    plan: Optional[PreprocessingPlan] = None
+) -> np.ndarray:
     """
     Enhanced preprocessing for prescription images
     
     Args:
         image: Input image array
+        plan: Records each step and its timing (stage "engine")
         
     Returns:
         Preprocessed image array optimized for OCR
     """
+    plan = plan if plan is not None else PreprocessingPlan()
     try:
         # Convert to grayscale if needed
         if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            with plan.step("grayscale", "engine", "gray"):
+                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         else:
-            gray = image.copy()
+            gray = image
         
         # Apply adaptive thresholding for better text contrast
         # This helps with mixed languages and handwritten text
-        binary = cv2.adaptiveThreshold(
-            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-            cv2.THRESH_BINARY, 11, 2
-        )
+        with plan.step("adaptive_threshold", "engine", "binary"):
+            binary = cv2.adaptiveThreshold(
+                gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
+                cv2.THRESH_BINARY, 11, 2
+            )
         
         # Denoise slightly to clean up
-        denoised = cv2.medianBlur(binary, 3)
+        with plan.step("median_blur", "engine", "binary"):
+            denoised = cv2.medianBlur(binary, 3)
         
         # Enhance contrast for better OCR
-        enhanced = cv2.convertScaleAbs(denoised, alpha=1.2, beta=10)
+        with plan.step("contrast_scale", "engine", "binary"):
+            enhanced = cv2.convertScaleAbs(denoised, alpha=1.2, beta=10)
         
         logger.info("Applied enhanced preprocessing for prescription OCR")
         return enhanced
@@ -236,10 +183,21 @@ def preprocess_prescription_image(image: np.ndarray) -> np.ndarray:
         logger.warning(f"Preprocessing failed, using original: {str(e)}")
         return image
 
+# Layout columns carried through post-processing unchanged
+LAYOUT_COLUMNS = ['left', 'top', 'width', 'height', 'block_num', 'par_num', 'line_num', 'word_num']
+
+def _fix_word(text: str):
+    """Apply text fixes to one word; returns (fixed text, is medical term)"""
+    text = fix_medical_terms(fix_khmer_ocr_errors(text))
+    return text, is_medical_term(text)
+
 def post_process_ocr_results(data: Dict[str, List]) -> Dict[str, List]:
     """
     Post-process OCR results to improve quality for mixed-language prescriptions
     
+    Works column-wise: confidences are filtered with numpy masks and text
+    fixes run once per distinct word rather than once per occurrence.
+    
     Args:
         data: Raw OCR data from Tesseract
         
@@ -247,52 +205,41 @@ def post_process_ocr_results(data: Dict[str, List]) -> Dict[str, List]:
         Improved OCR data in standard Tesseract format
     """
     try:
-        # Initialize improved data structure with all required keys
+        raw_text = data.get('text', [])
+        n = len(raw_text)
+        texts = [text.strip() if text else '' for text in raw_text]
+        conf = np.asarray(data.get('conf', [])[:n], dtype=np.int64)
+        
+        # Skip empty or very low confidence text
+        valid = (conf >= 20) & np.fromiter((bool(text) for text in texts), dtype=bool, count=n)
+        valid_idx = np.flatnonzero(valid)
+        
+        # Apply text improvements once per distinct word
+        fixes = {}
+        for text in {texts[i] for i in valid_idx}:
+            fixes[text] = _fix_word(text)
+        fixed = [fixes[texts[i]] for i in valid_idx]
+        
+        # Boost confidence for known medical terms, capped at 100
+        medical = np.fromiter((is_medical for _, is_medical in fixed), dtype=bool, count=len(fixed))
+        valid_conf = conf[valid_idx]
+        valid_conf = np.where(medical, np.minimum(valid_conf + 15, 100), valid_conf)
+        
+        # Keep only improved results
+        keep = np.flatnonzero(valid_conf >= 30)
+        keep_idx = valid_idx[keep]
+        
         improved_data = {
-            'text': [],
-            'conf': [],
-            'left': [],
-            'top': [],
-            'width': [],
-            'height': [],
-            'block_num': [],
-            'par_num': [],
-            'line_num': [],
-            'word_num': []
+            'text': [fixed[k][0] for k in keep],
+            'conf': valid_conf[keep].tolist(),
         }
+        for column in LAYOUT_COLUMNS:
+            if column in data:
+                improved_data[column] = np.asarray(data[column][:n])[keep_idx].tolist()
+            else:
+                improved_data[column] = [0] * len(keep_idx)
         
-        # Process each OCR element
-        for i in range(len(data.get('text', []))):
-            text = data.get('text', [])[i]
-            conf = data.get('conf', [])[i]
-            
-            # Skip empty or very low confidence text
-            if not text or not text.strip() or conf < 20:
-                continue
-                
-            # Apply text improvements
-            text = text.strip()
-            text = fix_khmer_ocr_errors(text)
-            text = fix_medical_terms(text)
-            
-            # Boost confidence for known medical terms
-            if is_medical_term(text):
-                conf = min(conf + 15, 100)  # Boost confidence but cap at 100
-            
-            # Keep only improved results
-            if conf >= 30 and text:
-                improved_data['text'].append(text)
-                improved_data['conf'].append(conf)
-                improved_data['left'].append(data.get('left', [])[i] if 'left' in data else 0)
-                improved_data['top'].append(data.get('top', [])[i] if 'top' in data else 0)
-                improved_data['width'].append(data.get('width', [])[i] if 'width' in data else 0)
-                improved_data['height'].append(data.get('height', [])[i] if 'height' in data else 0)
-                improved_data['block_num'].append(data.get('block_num', [])[i] if 'block_num' in data else 0)
-                improved_data['par_num'].append(data.get('par_num', [])[i] if 'par_num' in data else 0)
-                improved_data['line_num'].append(data.get('line_num', [])[i] if 'line_num' in data else 0)
-                improved_data['word_num'].append(data.get('word_num', [])[i] if 'word_num' in data else 0)
-        
-        avg_conf = sum(improved_data['conf']) / len(improved_data['conf']) if improved_data['conf'] else 0
+        avg_conf = float(valid_conf[keep].mean()) if len(keep) else 0
         logger.info(f"Post-processed OCR: {len(improved_data['text'])} elements, avg confidence: {avg_conf:.1f}%")
         
         return improved_data
@@ -306,57 +253,75 @@ def run_enhanced_ocr(
     languages: Optional[str] = None,
     oem: Optional[int] = None,
     psm: Optional[int] = None,
-    user_words_path: Optional[str] = None
+    user_words_path: Optional[str] = None,
+    engine: Optional[str] = None,
+    plan: Optional[PreprocessingPlan] = None
 ) -> Dict[str, List]:
     """
     Enhanced OCR with optimized configuration for Cambodian prescriptions
     
+    Images that reach the engine unprocessed get a thresholding cleanup
+    pass first. When the plan shows the caller already binarized the
+    image, that pass is skipped: thresholding a binary image again only
+    erodes strokes, and the contrast scale then lifts black to gray.
+    
     Args:
         image: Input image (numpy array)
         languages: Language string (e.g., "khm+eng+fra")
         oem: OCR Engine Mode (0-3)
         psm: Page Segmentation Mode (0-13)
         user_words_path: Path to user words file
+        engine: "pytesseract" or "tesserocr" (default from settings)
+        plan: Preprocessing already applied to image; the engine's own
+            steps (or the reason they were skipped) are appended to it
         
     Returns:
         Dictionary containing OCR data with text, confidence, and positions
     """
+    from .tesseract import image_to_data
+    
     # Use settings defaults if not provided
     lang = languages or settings.OCR_LANGUAGES
     engine_mode = oem if oem is not None else settings.OCR_OEM
     page_seg_mode = psm if psm is not None else settings.OCR_PSM
     user_words = user_words_path or settings.USER_WORDS_PATH
+    backend = engine or settings.OCR_ENGINE
     
-    # Enhanced preprocessing
-    processed_image = preprocess_prescription_image(image)
+    # Enhanced preprocessing, unless the caller already binarized the image
+    if plan is not None and plan.binarized:
+        plan.skip("prescription_cleanup", "engine", "input already binarized")
+        processed_image = image
+    else:
+        processed_image = preprocess_prescription_image(image, plan)
     
-    # Build optimized config for mixed-language prescriptions
-    config_parts = [
-        f"--oem {engine_mode}",
-        f"--psm {page_seg_mode}",
-        # Use single character mode for better Khmer recognition
-        "--tessdata-dir /usr/share/tesseract/tessdata",
-        # Optimize for medical text
-        "--dpi 300",
+    # Optimized settings for mixed-language prescriptions
+    variables = {
         # Enable character whitelist for common prescription characters
-        "-c tessedit_char_whitelist=0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyzកខគឃងចឆជឈញដឋឌឍណតថទធនបផពមយរលវសហឡអឣឤឥឦឧឪឮឰឲឳ឴឵ិីឹឺុូួើឿ.,-+|/:()[]",
-    ]
+        "tessedit_char_whitelist": PRESCRIPTION_CHAR_WHITELIST,
+    }
     
     # Add user words if available and file exists
-    if user_words and os.path.exists(user_words):
-        config_parts.append(f"--user-words {user_words}")
-    
-    config = " ".join(config_parts)
+    if not (user_words and os.path.exists(user_words)):
+        user_words = None
     
-    logger.info(f"Running enhanced OCR with lang={lang}, config={config}")
+    logger.info(
+        f"Running enhanced OCR with lang={lang}, oem={engine_mode}, "
+        f"psm={page_seg_mode}, engine={backend}"
+    )
     
     try:
         # Get detailed OCR data with bounding boxes
-        data = pytesseract.image_to_data(
+        data = image_to_data(
             processed_image,
             lang=lang,
-            output_type=Output.DICT,
-            config=config
+            oem=engine_mode,
+            psm=page_seg_mode,
+            # Optimize for medical text
+            dpi=300,
+            variables=variables,
+            tessdata_dir=settings.TESSDATA_DIR,
+            user_words=user_words,
+            engine=backend
         )
         
         logger.info(f"Enhanced OCR completed. Found {len(data['text'])} elements")
@@ -368,4 +333,4 @@ def run_enhanced_ocr(
         
     except Exception as e:
         logger.error(f"Enhanced OCR failed: {str(e)}")
-        raise
\ No newline at end of file
+        raise
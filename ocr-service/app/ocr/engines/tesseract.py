@@ -6,9 +6,11 @@ Languages: Khmer (khm) + English (eng) + French (fra)
 import pytesseract
 from pytesseract import Output
 import numpy as np
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
 from ...core.config import settings
 from ...core.logger import logger
+from ..preprocess.plan import PreprocessingPlan
 
 
 def run_ocr(
@@ -16,7 +18,9 @@ def run_ocr(
     languages: Optional[str] = None,
     oem: Optional[int] = None,
     psm: Optional[int] = None,
-    user_words_path: Optional[str] = None
+    user_words_path: Optional[str] = None,
+    engine: Optional[str] = None,
+    plan: Optional[PreprocessingPlan] = None
 ) -> Dict[str, List]:
     """
     Run enhanced Tesseract OCR for Cambodian prescriptions
@@ -27,6 +31,9 @@ def run_ocr(
         oem: OCR Engine Mode (0-3)
         psm: Page Segmentation Mode (0-13)
         user_words_path: Path to user words file
+        engine: "pytesseract" or "tesserocr" (default from settings)
+        plan: Preprocessing already applied to image (steps in it are
+            not repeated by the engine)
         
     Returns:
         Dictionary containing OCR data with text, confidence, and positions
@@ -36,7 +43,75 @@ def run_ocr(
     
     logger.info("Using enhanced OCR for prescription processing")
     
-    return run_enhanced_ocr(image, languages, oem, psm, user_words_path)
+    return run_enhanced_ocr(image, languages, oem, psm, user_words_path, engine=engine, plan=plan)
+
+
+def image_to_data(
+    image: np.ndarray,
+    lang: str,
+    oem: int,
+    psm: int,
+    dpi: Optional[int] = None,
+    variables: Optional[Dict[str, str]] = None,
+    tessdata_dir: Optional[str] = None,
+    user_words: Optional[str] = None,
+    engine: Optional[str] = None
+) -> Dict[str, List]:
+    """
+    Run Tesseract and return word-level data on the selected backend
+    
+    The "tesserocr" backend reuses pooled in-process engines; if the binding
+    is missing or fails, the pytesseract subprocess path is used instead.
+    
+    Args:
+        image: Input image (numpy array)
+        lang: Language string (e.g., "khm+eng+fra")
+        oem: OCR Engine Mode (0-3)
+        psm: Page Segmentation Mode (0-13)
+        dpi: Source resolution hint
+        variables: Tesseract variables (e.g., tessedit_char_whitelist)
+        tessdata_dir: Tessdata directory
+        user_words: Path to user words file
+        engine: "pytesseract" or "tesserocr" (default from settings)
+        
+    Returns:
+        Dictionary in pytesseract Output.DICT format
+    """
+    backend = (engine or settings.OCR_ENGINE).lower()
+    
+    if backend == "tesserocr":
+        from .engine_pool import TESSEROCR_AVAILABLE, image_to_data as pooled_image_to_data
+        
+        if TESSEROCR_AVAILABLE:
+            try:
+                return pooled_image_to_data(
+                    image, lang, oem, psm,
+                    dpi=dpi,
+                    variables=variables,
+                    tessdata_dir=tessdata_dir,
+                    user_words=user_words
+                )
+            except Exception as e:
+                logger.warning(f"In-process Tesseract failed, falling back to pytesseract: {str(e)}")
+        else:
+            logger.warning("tesserocr not installed, falling back to pytesseract")
+    
+    config_parts = [f"--oem {oem}", f"--psm {psm}"]
+    if tessdata_dir:
+        config_parts.append(f"--tessdata-dir {tessdata_dir}")
+    if dpi:
+        config_parts.append(f"--dpi {dpi}")
+    for name, value in (variables or {}).items():
+        config_parts.append(f"-c {name}={value}")
+    if user_words:
+        config_parts.append(f"--user-words {user_words}")
+    
+    return pytesseract.image_to_data(
+        image,
+        lang=lang,
+        output_type=Output.DICT,
+        config=" ".join(config_parts)
+    )
 
 
 def get_full_text(
@@ -93,3 +168,21 @@ def check_tesseract_installed() -> bool:
     except Exception as e:
         logger.error(f"Tesseract not found: {str(e)}")
         return False
+
+
+@lru_cache()
+def get_engine_version() -> str:
+    """
+    Identify the service + OCR engine build
+    
+    Used in result cache keys so upgrades never serve stale results.
+    
+    Returns:
+        Version string (e.g., "1.0.0/pytesseract/tesseract-5.3.0")
+    """
+    try:
+        tesseract_version = str(pytesseract.get_tesseract_version())
+    except Exception:
+        tesseract_version = "unknown"
+    
+    return f"{settings.APP_VERSION}/{settings.OCR_ENGINE}/tesseract-{tesseract_version}"
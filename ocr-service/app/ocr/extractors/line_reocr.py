@@ -0,0 +1,259 @@
+"""
+Confidence-Gated Line Re-OCR
+Second pass of two-pass extraction: only lines the first (low-resolution)
+pass read with low confidence are re-rendered at higher resolution from
+the source image and recognized again as single text lines
+"""
+import time
+import cv2
+import numpy as np
+from typing import Dict, List, Any, Optional, Tuple
+from ..preprocess.advanced import rotation_matrix, preprocess_line_crop
+from ..preprocess.plan import PreprocessingPlan
+from ..engines.tesseract import run_ocr
+from ..parsers.tesseract_parser import parse_ocr_data, group_by_lines
+from ...core.config import settings
+from ...core.logger import logger
+
+# Tesseract page segmentation mode for a single text line
+LINE_PSM = 7
+
+# Padding around a line crop, as a fraction of the line height
+LINE_PADDING = 0.25
+
+
+def page_transform(plan: PreprocessingPlan, source_shape: Tuple[int, ...]) -> np.ndarray:
+    """
+    Affine transform from the source image to the preprocessed page
+
+    Rebuilt from the rescale and deskew steps recorded in the plan, so
+    a region of the processed page can be rendered again from the source
+    at any resolution.
+
+    Args:
+        plan: Plan of the first pass
+        source_shape: Shape of the image the first pass preprocessed
+
+    Returns:
+        2x3 affine matrix (source -> processed coordinates)
+    """
+    height, width = source_shape[:2]
+    factor, angle = 1.0, 0.0
+    for step in plan.steps:
+        if step["applied"] and step["step"] == "rescale":
+            factor = step["factor"]
+        elif step["applied"] and step["step"] == "deskew":
+            angle = step["angle"]
+
+    # upscale_image rounds the scaled size down to whole pixels
+    scaled_w, scaled_h = int(width * factor), int(height * factor)
+    scale = np.array([[scaled_w / width, 0, 0], [0, scaled_h / height, 0], [0, 0, 1]])
+
+    rotation = np.vstack([np.eye(2, 3), [0, 0, 1]])
+    if angle:
+        rotation[:2], _ = rotation_matrix((scaled_h, scaled_w), angle)
+
+    return (rotation @ scale)[:2]
+
+
+def line_bbox(words: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Union of the word bounding boxes of a line"""
+    x1 = min(w["bbox"]["x"] for w in words)
+    y1 = min(w["bbox"]["y"] for w in words)
+    x2 = max(w["bbox"]["x"] + w["bbox"]["w"] for w in words)
+    y2 = max(w["bbox"]["y"] + w["bbox"]["h"] for w in words)
+    return {"x": x1, "y": y1, "w": x2 - x1, "h": y2 - y1}
+
+
+def mean_confidence(words: List[Dict[str, Any]]) -> float:
+    """Mean confidence of a line's words (non-text entries ignored)"""
+    confidences = [w["confidence"] for w in words if w["confidence"] >= 0]
+    return sum(confidences) / len(confidences) if confidences else 0.0
+
+
+def weighted_characters(words: List[Dict[str, Any]]) -> float:
+    """Characters of a line weighted by their word's confidence"""
+    return sum(len(w["text"]) * w["confidence"] for w in words if w["confidence"] >= 0)
+
+
+def is_better_reading(new: List[Dict[str, Any]], old: List[Dict[str, Any]]) -> bool:
+    """
+    Whether a re-read should replace a line
+
+    A higher mean confidence alone is not enough: one confident word read
+    from a five-word line would drop the other four. The new reading must
+    also carry more confidence-weighted characters, so it has to cover
+    the line.
+    """
+    return (
+        bool(new)
+        and mean_confidence(new) > mean_confidence(old)
+        and weighted_characters(new) > weighted_characters(old)
+    )
+
+
+def render_region(
+    source: np.ndarray,
+    transform: np.ndarray,
+    bbox: Dict[str, int],
+    scale: float
+) -> np.ndarray:
+    """
+    Render a region of the processed page from the source at higher resolution
+
+    One warpAffine straight from the source, so the crop carries the
+    source's detail rather than an upscaled copy of the first pass.
+
+    Args:
+        source: Grayscale source image
+        transform: Source -> processed affine (page_transform)
+        bbox: Region in processed coordinates
+        scale: Resolution relative to the processed page
+
+    Returns:
+        Grayscale crop of size (bbox["h"] * scale, bbox["w"] * scale)
+    """
+    matrix = transform * scale
+    matrix[0, 2] -= bbox["x"] * scale
+    matrix[1, 2] -= bbox["y"] * scale
+    size = (max(1, int(np.ceil(bbox["w"] * scale))), max(1, int(np.ceil(bbox["h"] * scale))))
+
+    return cv2.warpAffine(source, matrix, size, flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+
+
+def _padded(bbox: Dict[str, int], page_shape: Tuple[int, ...]) -> Dict[str, int]:
+    """Pad a line bbox so ascenders/descenders are not cut, clipped to the page"""
+    pad = int(np.ceil(bbox["h"] * LINE_PADDING))
+    x1 = max(0, bbox["x"] - pad)
+    y1 = max(0, bbox["y"] - pad)
+    x2 = min(page_shape[1], bbox["x"] + bbox["w"] + pad)
+    y2 = min(page_shape[0], bbox["y"] + bbox["h"] + pad)
+    return {"x": x1, "y": y1, "w": x2 - x1, "h": y2 - y1}
+
+
+def reocr_line(
+    source: np.ndarray,
+    transform: np.ndarray,
+    words: List[Dict[str, Any]],
+    page_shape: Tuple[int, ...],
+    scale: float,
+    languages: str,
+    shadow_removed: bool
+) -> List[Dict[str, Any]]:
+    """
+    Recognize one line again at higher resolution
+
+    Args:
+        source: Grayscale source image
+        transform: Source -> processed affine (page_transform)
+        words: First-pass words of the line
+        page_shape: Shape of the processed page
+        scale: Resolution relative to the processed page
+        languages: OCR languages
+        shadow_removed: Whether source already had shadows removed
+
+    Returns:
+        Re-recognized words in processed page coordinates, numbered as the
+        original line
+    """
+    region = _padded(line_bbox(words), page_shape)
+    crop = render_region(source, transform, region, scale)
+
+    # The crop arrives binarized, so the engine skips its cleanup pass
+    crop_plan = PreprocessingPlan()
+    with crop_plan.step("binarize", "line_reocr", "binary"):
+        binary = preprocess_line_crop(crop, remove_shadow=not shadow_removed)
+    data = run_ocr(binary, languages=languages, psm=LINE_PSM, plan=crop_plan)
+
+    first = words[0]
+    line_words = []
+    for i, word in enumerate(parse_ocr_data(data, include_low_confidence=True), start=1):
+        bbox = word["bbox"]
+        word["bbox"] = {
+            "x": region["x"] + int(round(bbox["x"] / scale)),
+            "y": region["y"] + int(round(bbox["y"] / scale)),
+            "w": int(round(bbox["w"] / scale)),
+            "h": int(round(bbox["h"] / scale)),
+        }
+        word.update(block=first["block"], paragraph=first["paragraph"], line=first["line"], word=i)
+        line_words.append(word)
+
+    return line_words
+
+
+def reocr_low_confidence_lines(
+    words: List[Dict[str, Any]],
+    source: np.ndarray,
+    transform: np.ndarray,
+    page_shape: Tuple[int, ...],
+    languages: str,
+    shadow_removed: bool = False,
+    confidence_threshold: Optional[float] = None,
+    scale: Optional[float] = None,
+    max_lines: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Re-OCR the low-confidence lines of a first pass and merge them back
+
+    Lines (tesseract_parser.group_by_lines) whose mean confidence is below
+    the threshold are re-rendered at `scale` times the first-pass
+    resolution and recognized with a single-line PSM, lowest confidence
+    first. A line's words are replaced only if the new reading is better
+    (is_better_reading): higher mean confidence and more
+    confidence-weighted characters.
+
+    Args:
+        words: Parsed first-pass words (processed page coordinates)
+        source: Grayscale image the first pass preprocessed
+        transform: Source -> processed affine (page_transform)
+        page_shape: Shape of the processed page
+        languages: OCR languages
+        shadow_removed: Whether source already had shadows removed
+        confidence_threshold: Re-OCR lines below this mean confidence
+            (default: settings.LINE_REOCR_CONFIDENCE)
+        scale: Re-OCR resolution relative to the first pass
+            (default: settings.LINE_REOCR_SCALE)
+        max_lines: Most lines to re-OCR (default: settings.LINE_REOCR_MAX_LINES)
+
+    Returns:
+        Tuple of (merged words in reading order, report)
+    """
+    threshold = settings.LINE_REOCR_CONFIDENCE if confidence_threshold is None else confidence_threshold
+    scale = scale or settings.LINE_REOCR_SCALE
+    max_lines = settings.LINE_REOCR_MAX_LINES if max_lines is None else max_lines
+    start = time.perf_counter()
+
+    lines = group_by_lines(words)
+    weak = sorted(
+        (i for i, line in enumerate(lines) if mean_confidence(line) < threshold),
+        key=lambda i: mean_confidence(lines[i])
+    )
+    selected = weak[:max_lines]
+
+    improved = 0
+    for i in selected:
+        try:
+            line_words = reocr_line(source, transform, lines[i], page_shape, scale, languages, shadow_removed)
+        except Exception as e:
+            logger.warning(f"Line re-OCR failed: {e}")
+            continue
+
+        if is_better_reading(line_words, lines[i]):
+            lines[i] = line_words
+            improved += 1
+
+    report = {
+        "confidence_threshold": threshold,
+        "scale": scale,
+        "lines_total": len(lines),
+        "lines_below_threshold": len(weak),
+        "lines_reocred": len(selected),
+        "lines_improved": improved,
+        "ms": round((time.perf_counter() - start) * 1000, 2)
+    }
+    logger.info(
+        f"Line re-OCR: {improved}/{len(selected)} improved "
+        f"({len(weak)} of {len(lines)} lines below {threshold})"
+    )
+
+    return [word for line in lines for word in line], report
@@ -2,15 +2,21 @@
 Enhanced OCR Extraction for Medical Prescriptions
 Combines advanced preprocessing, table detection, and structured data extraction
 """
+import asyncio
+import cv2
 import numpy as np
 from typing import Dict, List, Any, Optional
-from ..preprocess.advanced import preprocess_for_medical_ocr
+from ..preprocess.advanced import preprocess_for_medical_ocr, prepare_shared_preprocessing
+from ..preprocess.plan import PreprocessingPlan
 from ..engines.tesseract import run_ocr
-from ..parsers.tesseract_parser import parse_ocr_data, calculate_page_stats
+from ..parsers.tesseract_parser import parse_ocr_data, calculate_page_stats, scale_bboxes
 from .table_extractor import extract_table_structure, detect_tables_in_image
+from .line_reocr import page_transform, reocr_low_confidence_lines
 from .structured_data import extract_structured_data
 from ...core.config import settings
+from ...core.executor import get_ocr_executor, OCRQueueFullError
 from ...core.logger import logger
+from ...utils.image import load_image_for_ocr
 
 
 def extract_medical_prescription(
@@ -19,24 +25,41 @@ def extract_medical_prescription(
     detect_tables: bool = True,
     extract_structured: bool = True,
     languages: Optional[str] = None,
-    upscale_factor: float = 1.5
+    upscale_factor: Optional[float] = None,
+    reuse_page_words: bool = True,
+    shared_preprocessing: Optional[Dict[str, Any]] = None,
+    two_pass: Optional[bool] = None
 ) -> Dict[str, Any]:
     """
     Complete medical prescription extraction pipeline
     
     This is the main extraction function that:
     1. Applies advanced preprocessing for medical images
-    2. Detects and extracts table structures
-    3. Runs enhanced OCR
+    2. Runs enhanced OCR
+    3. Detects and extracts table structures
     4. Extracts structured data (medications, patient info, etc.)
     
+    In two-pass mode the page is first read at a modest resolution
+    (TWO_PASS_TEXT_HEIGHT when the scale is automatic); only lines below
+    LINE_REOCR_CONFIDENCE are then re-rendered from the source at
+    LINE_REOCR_SCALE times that resolution and re-OCR'd, and the better
+    reading of each line is merged back into "raw".
+    
     Args:
         image: Input image (BGR format)
         apply_advanced_preprocessing: Use advanced preprocessing
         detect_tables: Detect and extract table structures
         extract_structured: Extract structured data
         languages: OCR languages (default: khm+eng+fra)
-        upscale_factor: Image upscaling factor
+        upscale_factor: Image scale factor (None: chosen from the measured
+            text height so text lands near OCR_TARGET_TEXT_HEIGHT)
+        reuse_page_words: Fill table cells from the full-page OCR pass and
+            only re-OCR empty/low-confidence cells (instead of OCR per cell)
+        shared_preprocessing: Result of prepare_shared_preprocessing, reused
+            when several methods process the same image
+        two_pass: Re-OCR low-confidence lines at higher resolution after a
+            cheap first pass (default: settings.TWO_PASS_OCR); needs
+            advanced preprocessing
         
     Returns:
         Comprehensive extraction results
@@ -46,8 +69,14 @@ def extract_medical_prescription(
     logger.info("=" * 70)
     
     lang = languages or settings.OCR_LANGUAGES
+    two_pass = (settings.TWO_PASS_OCR if two_pass is None else two_pass) and apply_advanced_preprocessing
+    
+    # Every preprocessing step applied to the image, in order; the OCR
+    # engine reads it to avoid repeating them
+    plan = PreprocessingPlan()
     
     # Step 1: Advanced Preprocessing
+    text_height = None
     if apply_advanced_preprocessing:
         logger.info("Step 1: Applying advanced preprocessing...")
         processed_image = preprocess_for_medical_ocr(
@@ -57,16 +86,53 @@ def extract_medical_prescription(
             enhance_contrast=True,
             denoise=True,
             upscale=True,
-            upscale_factor=upscale_factor
+            upscale_factor=upscale_factor,
+            shared=shared_preprocessing,
+            plan=plan,
+            target_text_height=settings.TWO_PASS_TEXT_HEIGHT if two_pass else None
         )
+        for step in plan.steps:
+            if step["step"] == "measure_text_height":
+                upscale_factor, text_height = step["factor"], step["text_height"]
+                logger.info(f"Text height {text_height}px -> scale factor {upscale_factor}x")
     else:
         logger.info("Step 1: Skipping advanced preprocessing")
         processed_image = image
     
-    # Step 2: Table Detection (if enabled)
+    # Step 2: Run Enhanced OCR
+    logger.info("Step 2: Running enhanced OCR...")
+    ocr_data = run_ocr(processed_image, languages=lang, plan=plan)
+    
+    # Step 3: Parse OCR Results
+    logger.info("Step 3: Parsing OCR results...")
+    parsed_results = parse_ocr_data(ocr_data, include_low_confidence=True)
+    
+    # Step 3b: Re-OCR only the lines the first pass was unsure about
+    line_reocr = None
+    if two_pass and parsed_results:
+        logger.info("Step 3b: Re-OCR of low-confidence lines...")
+        if shared_preprocessing is not None:
+            source = shared_preprocessing["gray"]
+        elif len(image.shape) == 3:
+            source = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        else:
+            source = image
+        parsed_results, line_reocr = reocr_low_confidence_lines(
+            parsed_results,
+            source,
+            page_transform(plan, source.shape),
+            processed_image.shape,
+            lang,
+            shadow_removed=shared_preprocessing is not None and shared_preprocessing["shadow_removed"]
+        )
+    
+    # Calculate stats
+    stats = calculate_page_stats(parsed_results)
+    
+    # Step 4: Table Detection (if enabled)
     table_data = None
     if detect_tables:
-        logger.info("Step 2: Detecting tables...")
+        logger.info("Step 4: Detecting tables...")
         try:
             table_regions = detect_tables_in_image(processed_image)
             
@@ -83,8 +149,13 @@ def extract_medical_prescription(
                     bbox['x']:bbox['x']+bbox['w']
                 ]
                 
-                # Extract table structure
-                table_data = extract_table_structure(table_img, lang)
+                # Extract table structure, filling cells from the page OCR pass
+                table_data = extract_table_structure(
+                    table_img,
+                    lang,
+                    words=parsed_results if reuse_page_words else None,
+                    offset=(bbox['x'], bbox['y'])
+                )
                 logger.info(f"Extracted table: {table_data.get('rows', 0)} rows x "
                            f"{table_data.get('columns', 0)} columns")
             else:
@@ -93,18 +164,7 @@ def extract_medical_prescription(
             logger.error(f"Table detection failed: {e}")
             table_data = None
     else:
-        logger.info("Step 2: Table detection disabled")
-    
-    # Step 3: Run Enhanced OCR
-    logger.info("Step 3: Running enhanced OCR...")
-    ocr_data = run_ocr(processed_image, languages=lang)
-    
-    # Step 4: Parse OCR Results
-    logger.info("Step 4: Parsing OCR results...")
-    parsed_results = parse_ocr_data(ocr_data, include_low_confidence=True)
-    
-    # Calculate stats
-    stats = calculate_page_stats(parsed_results)
+        logger.info("Step 4: Table detection disabled")
     
     # Step 5: Extract Structured Data (if enabled)
     structured_data = None
@@ -133,6 +193,13 @@ def extract_medical_prescription(
         "stats": stats,
         "languages_used": lang,
         "preprocessing_applied": apply_advanced_preprocessing,
+        "scale": {
+            "factor": upscale_factor if apply_advanced_preprocessing else 1.0,
+            "measured_text_height": text_height,
+            "target_text_height": settings.TWO_PASS_TEXT_HEIGHT if two_pass else settings.OCR_TARGET_TEXT_HEIGHT
+        },
+        "preprocessing": plan.to_dict(),
+        "line_reocr": line_reocr,
         "table_detection": {
             "enabled": detect_tables,
             "found": table_data is not None,
@@ -150,78 +217,187 @@ def extract_medical_prescription(
     return results
 
 
-def extract_with_multiple_methods(
+def extract_medical_prescription_from_path(image_path: str, **kwargs) -> Dict[str, Any]:
+    """
+    Decode a spooled upload and run medical prescription extraction
+    
+    Entry point for OCR executor workers: only the path crosses the
+    process boundary, and the file is decoded straight into the single
+    buffer the pipeline works on (EXIF orientation applied): grayscale
+    when preprocessing is on, since that is its first step, else BGR.
+    Large photos may be decoded at reduced scale (IMAGE_DECODE_MODE);
+    bounding boxes are scaled back afterwards.
+    
+    Args:
+        image_path: Path of the encoded image
+        **kwargs: Arguments for extract_medical_prescription
+        
+    Returns:
+        Comprehensive extraction results
+    """
+    image, reduction = load_image_for_ocr(
+        image_path,
+        grayscale=kwargs.get("apply_advanced_preprocessing", True)
+    )
+    logger.info(f"Image loaded: {image.shape} (decode reduction {reduction}x)")
+    
+    results = extract_medical_prescription(image, **kwargs)
+    scale_bboxes(results, reduction)
+    results["decode_reduction"] = reduction
+    
+    return results
+
+
+# Extraction methods tried for difficult images; the fixed 1.5x method
+# covers pages where the text height estimate is misled
+EXTRACTION_METHODS = [
+    {
+        "name": "Advanced (Auto scale)",
+        "params": {
+            "apply_advanced_preprocessing": True,
+            "upscale_factor": None
+        }
+    },
+    {
+        "name": "Advanced (Upscale 1.5x)",
+        "params": {
+            "apply_advanced_preprocessing": True,
+            "upscale_factor": 1.5
+        }
+    },
+    {
+        "name": "Standard",
+        "params": {
+            "apply_advanced_preprocessing": False
+        }
+    }
+]
+
+
+def run_extraction_method(
     image: np.ndarray,
-    languages: Optional[str] = None
+    params: Dict[str, Any],
+    languages: Optional[str] = None,
+    shared_preprocessing: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Run one extraction method (entry point for OCR executor workers)
+    
+    Args:
+        image: Input image
+        params: Arguments for extract_medical_prescription
+        languages: OCR languages
+        shared_preprocessing: Result of prepare_shared_preprocessing
+        
+    Returns:
+        Extraction results
+    """
+    if not params.get("apply_advanced_preprocessing", True):
+        shared_preprocessing = None
+    
+    return extract_medical_prescription(
+        image,
+        languages=languages,
+        shared_preprocessing=shared_preprocessing,
+        **params
+    )
+
+
+async def extract_with_multiple_methods(
+    image: np.ndarray,
+    languages: Optional[str] = None,
+    confidence_threshold: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Try multiple extraction methods and combine results
     Useful for difficult images
     
+    Methods run concurrently on the OCR executor and share shadow removal
+    and skew estimation. As soon as one method reaches the confidence
+    threshold the others are cancelled (work already running in a worker
+    finishes in the background and is discarded).
+    
     Args:
         image: Input image
         languages: OCR languages
+        confidence_threshold: Stop once a method reaches this average
+            confidence (default: settings.MULTI_METHOD_CONFIDENCE)
         
     Returns:
         Combined results from multiple methods
+        
+    Raises:
+        OCRQueueFullError: If the executor rejected every method
     """
+    threshold = settings.MULTI_METHOD_CONFIDENCE if confidence_threshold is None else confidence_threshold
+    executor = get_ocr_executor()
+    
     logger.info("Running multi-method extraction")
     
-    methods = [
-        {
-            "name": "Advanced (Upscale 2x)",
-            "params": {
-                "apply_advanced_preprocessing": True,
-                "upscale_factor": 2.0
-            }
-        },
-        {
-            "name": "Advanced (Upscale 1.5x)",
-            "params": {
-                "apply_advanced_preprocessing": True,
-                "upscale_factor": 1.5
-            }
-        },
-        {
-            "name": "Standard",
-            "params": {
-                "apply_advanced_preprocessing": False
-            }
-        }
-    ]
+    # Scale-independent preprocessing, done once for all advanced methods
+    shared = await executor.submit(prepare_shared_preprocessing, image)
+    
+    tasks = {
+        asyncio.create_task(
+            executor.submit(run_extraction_method, image, method["params"], languages, shared)
+        ): method["name"]
+        for method in EXTRACTION_METHODS
+    }
     
     results = []
     best_result = None
     best_confidence = 0
+    early_exit = False
+    rejected = []
+    pending = set(tasks)
     
-    for method in methods:
-        logger.info(f"Trying method: {method['name']}")
-        try:
-            result = extract_medical_prescription(
-                image,
-                languages=languages,
-                **method['params']
-            )
-            
-            avg_conf = result.get('stats', {}).get('avg_confidence', 0)
-            results.append({
-                "method": method['name'],
-                "result": result,
-                "avg_confidence": avg_conf
-            })
+    try:
+        while pending and not early_exit:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
             
-            if avg_conf > best_confidence:
-                best_confidence = avg_conf
-                best_result = result
-        
-        except Exception as e:
-            logger.error(f"Method {method['name']} failed: {e}")
-            continue
+            for task in done:
+                name = tasks[task]
+                try:
+                    result = task.result()
+                except OCRQueueFullError as e:
+                    logger.warning(f"Method {name} rejected: {e}")
+                    rejected.append(e)
+                    continue
+                except Exception as e:
+                    logger.error(f"Method {name} failed: {e}")
+                    continue
+                
+                avg_conf = result.get('stats', {}).get('avg_confidence', 0)
+                results.append({
+                    "method": name,
+                    "result": result,
+                    "avg_confidence": avg_conf
+                })
+                
+                if avg_conf > best_confidence:
+                    best_confidence = avg_conf
+                    best_result = result
+                
+                if avg_conf >= threshold:
+                    early_exit = True
+    finally:
+        # Unqueues methods no worker has started; running ones finish
+        # in the background and hold their executor slot until then
+        for task in pending:
+            task.cancel()
+    
+    if best_result is None and rejected:
+        raise rejected[0]
     
+    cancelled = [tasks[task] for task in pending]
+    if early_exit:
+        logger.info(f"Confidence threshold {threshold} reached, cancelled: {cancelled}")
     logger.info(f"Best method had confidence: {best_confidence:.1f}%")
     
     return {
         "best_result": best_result,
         "all_results": results,
-        "best_confidence": best_confidence
+        "best_confidence": best_confidence,
+        "early_exit": early_exit,
+        "cancelled_methods": cancelled
     }
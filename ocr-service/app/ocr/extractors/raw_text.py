@@ -5,9 +5,11 @@ Combines preprocessing and OCR engine to extract text
 import numpy as np
 from typing import Dict, List, Any, Optional
 from ..preprocess.opencv import preprocess_for_ocr
+from ..preprocess.plan import PreprocessingPlan
 from ..engines.tesseract import run_ocr, get_full_text
-from ..parsers.tesseract_parser import parse_ocr_data
+from ..parsers.tesseract_parser import parse_ocr_data, scale_bboxes
 from ...core.logger import logger
+from ...utils.image import load_image_for_ocr, get_image_info
 
 
 def extract_raw_ocr(
@@ -24,6 +26,9 @@ def extract_raw_ocr(
     2. Run OCR
     3. Parse results
     
+    The preprocessing plan travels with the image, so the OCR engine
+    skips its own thresholding pass when preprocessing already ran.
+    
     Args:
         image: Input image (BGR format)
         apply_preprocessing: Whether to preprocess
@@ -31,15 +36,16 @@ def extract_raw_ocr(
         include_low_confidence: Include low confidence results
         
     Returns:
-        Dictionary with raw OCR results
+        Dictionary with raw OCR results and the preprocessing steps applied
     """
     logger.info("Starting raw OCR extraction")
+    plan = PreprocessingPlan()
     
     # Step 1: Preprocess
-    processed_image = preprocess_for_ocr(image, apply_preprocessing)
+    processed_image = preprocess_for_ocr(image, apply_preprocessing, plan=plan)
     
     # Step 2: Run OCR
-    ocr_data = run_ocr(processed_image, languages=languages)
+    ocr_data = run_ocr(processed_image, languages=languages, plan=plan)
     
     # Step 3: Parse results
     parsed_results = parse_ocr_data(ocr_data, include_low_confidence)
@@ -49,10 +55,47 @@ def extract_raw_ocr(
     return {
         "raw": parsed_results,
         "total_elements": len(parsed_results),
-        "languages_used": languages or "khm+eng+fra"
+        "languages_used": languages or "khm+eng+fra",
+        "preprocessing": plan.to_dict()
     }
 
 
+def extract_raw_ocr_from_path(image_path: str, **kwargs) -> Dict[str, Any]:
+    """
+    Decode a spooled upload and extract raw OCR data
+    
+    Entry point for OCR executor workers: only the path crosses the
+    process boundary, and the file is decoded straight into the single
+    buffer the pipeline works on (EXIF orientation applied): grayscale
+    when preprocessing is on, since that is its first step, else BGR.
+    Large photos may be decoded at reduced scale (IMAGE_DECODE_MODE);
+    bounding boxes are scaled back afterwards.
+    
+    Args:
+        image_path: Path of the encoded image
+        **kwargs: Arguments for extract_raw_ocr
+        
+    Returns:
+        extract_raw_ocr result plus "image_info" (dimensions at full scale)
+    """
+    image, reduction = load_image_for_ocr(
+        image_path,
+        grayscale=kwargs.get("apply_preprocessing", True)
+    )
+    
+    result = extract_raw_ocr(image, **kwargs)
+    scale_bboxes(result["raw"], reduction)
+    
+    # Report the original dimensions; decode_reduction tells how it was read
+    image_info = get_image_info(image)
+    image_info["width"] *= reduction
+    image_info["height"] *= reduction
+    image_info["decode_reduction"] = reduction
+    result["image_info"] = image_info
+    
+    return result
+
+
 def extract_text_only(
     image: np.ndarray,
     apply_preprocessing: bool = True,
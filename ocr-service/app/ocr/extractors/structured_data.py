@@ -48,33 +48,33 @@ KHMER_MEDICAL_TERMS = {
 }
 
 
-# Common medication name patterns
-MEDICATION_PATTERNS = [
-    # Generic medicine names (case-insensitive)
-    r'\b(paracetamol|acetaminophen|tylenol)\b',
-    r'\b(amoxicillin|amoxil)\b',
-    r'\b(ibuprofen|advil|motrin)\b',
-    r'\b(metformin)\b',
-    r'\b(omeprazole|prilosec)\b',
-    r'\b(losartan)\b',
-    r'\b(atorvastatin|lipitor)\b',
-    r'\b(amlodipine|norvasc)\b',
-    r'\b(ciprofloxacin|cipro)\b',
-    r'\b(azithromycin|zithromax)\b',
-    r'\b(prednisone)\b',
-    r'\b(insulin)\b',
-    r'\b(glibenclamide|glyburide)\b',
-    r'\b(multivitamine?|vitamin)\b',
-    r'\b(calcium)\b',
-    r'\b(celcoxx|celebrex)\b',
-    r'\b(butylscopolamine|buscopan)\b',
-    r'\b(amitriptyline)\b',
-    
-    # Pattern for medicine with dosage
-    r'\b([A-Z][a-z]+[A-Z]?[a-z]*)\s*\d+\s*(mg|g|ml)\b',
+# Known medication names, generic and brand (matched as whole words, case-insensitive)
+MEDICATION_NAMES = [
+    'paracetamol', 'acetaminophen', 'tylenol',
+    'amoxicillin', 'amoxil',
+    'ibuprofen', 'advil', 'motrin',
+    'metformin',
+    'omeprazole', 'prilosec',
+    'losartan',
+    'atorvastatin', 'lipitor',
+    'amlodipine', 'norvasc',
+    'ciprofloxacin', 'cipro',
+    'azithromycin', 'zithromax',
+    'prednisone',
+    'insulin',
+    'glibenclamide', 'glyburide',
+    'multivitamin', 'multivitamine', 'vitamin',
+    'calcium',
+    'celcoxx', 'celebrex',
+    'butylscopolamine', 'buscopan',
+    'amitriptyline',
 ]
 
 
+# Pattern for medicine with dosage (names not in MEDICATION_NAMES)
+MEDICATION_DOSAGE_PATTERN = r'\b([A-Z][a-z]+[A-Z]?[a-z]*)\s*\d+\s*(mg|g|ml)\b'
+
+
 # Dosage patterns
 DOSAGE_PATTERNS = [
     # Number + unit
@@ -129,40 +129,168 @@ TIME_PATTERNS = [
 ]
 
 
-def extract_medications(text: str, ocr_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+# English time of day words
+TIME_OF_DAY_TERMS = ['morning', 'afternoon', 'evening', 'night', 'bedtime']
+
+
+def build_term_pattern(terms: List[str]) -> str:
+    """
+    Build a regex for a list of literal terms, shaped like a prefix trie
+    
+    "amoxicillin|amoxil" becomes "amox(?:icillin|il)", so the regex engine
+    follows a single branch per character instead of trying every term.
+    Matching cost grows with term length, not with the number of terms.
+    
+    Args:
+        terms: Literal terms
+        
+    Returns:
+        Regex source matching any of the terms (longest first)
+    """
+    trie: Dict[str, Any] = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    def to_pattern(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + to_pattern(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # A term ends here but longer ones continue: try the longer ones first
+        if '' in node:
+            pattern = '(?:' + pattern + ')?'
+        return pattern
+    
+    return to_pattern(trie)
+
+
+class PrescriptionMatcher:
+    """
+    Finds every structured-data match kind in one scan of the text
+    
+    All patterns are compiled into a single alternation with one named group
+    per pattern; `scan` runs it once and buckets matches by kind. Literal
+    lists (medication names, Khmer terms) are compiled as prefix tries.
+    
+    Alternatives are tried in kind order at each position, so when two kinds
+    start at the same place the earlier kind wins (e.g. a known medication
+    name before the generic "Name 500mg" pattern).
+    """
+    
+    def __init__(self, medication_names: Optional[List[str]] = None):
+        names = [name.lower() for name in (medication_names or MEDICATION_NAMES)]
+        
+        kinds = [
+            ("date", DATE_PATTERNS),
+            ("time", TIME_PATTERNS),
+            ("frequency", FREQUENCY_PATTERNS),
+            ("medication", [r'\b' + build_term_pattern(names) + r'\b']),
+            ("time_of_day", [r'\b' + build_term_pattern(TIME_OF_DAY_TERMS) + r'\b']),
+            ("medication", [MEDICATION_DOSAGE_PATTERN]),
+            ("dosage", DOSAGE_PATTERNS),
+            ("khmer_term", [build_term_pattern(list(KHMER_MEDICAL_TERMS))]),
+        ]
+        
+        self.kinds = list(dict.fromkeys(kind for kind, _ in kinds))
+        self._group_kinds: Dict[str, str] = {}
+        groups = []
+        for kind, patterns in kinds:
+            for pattern in patterns:
+                group = f"g{len(groups)}"
+                self._group_kinds[group] = kind
+                groups.append(f"(?P<{group}>{pattern})")
+        
+        self.regex = re.compile('|'.join(groups), re.IGNORECASE)
+    
+    def scan(self, text: str) -> Dict[str, List[re.Match]]:
+        """
+        Scan text once for all match kinds
+        
+        Args:
+            text: OCR text
+            
+        Returns:
+            Dictionary mapping kind to its matches in document order
+        """
+        found: Dict[str, List[re.Match]] = {kind: [] for kind in self.kinds}
+        for match in self.regex.finditer(text):
+            found[self._group_kinds[match.lastgroup]].append(match)
+        return found
+
+
+_matcher: Optional[PrescriptionMatcher] = None
+
+
+def get_matcher() -> PrescriptionMatcher:
+    """Get the shared matcher (compiled on first use)"""
+    global _matcher
+    if _matcher is None:
+        _matcher = PrescriptionMatcher()
+    return _matcher
+
+
+def _nearest_within(matches: List[re.Match], anchor: int, start: int, end: int) -> Optional[str]:
+    """
+    Match inside [start, end) nearest to anchor
+    
+    Prefers the first match at or after the anchor (details usually follow
+    the medication name), otherwise the closest one before it.
+    """
+    before = None
+    for match in matches:
+        if match.start() >= end:
+            break
+        if match.start() < start or match.end() > end:
+            continue
+        if match.start() >= anchor:
+            return match.group(0)
+        before = match.group(0)
+    return before
+
+
+def extract_medications(
+    text: str,
+    ocr_data: List[Dict[str, Any]],
+    matches: Optional[Dict[str, List[re.Match]]] = None
+) -> List[Dict[str, Any]]:
     """
     Extract medication names from text and OCR data
     
     Args:
         text: Full OCR text
         ocr_data: Raw OCR data with bounding boxes
+        matches: Result of PrescriptionMatcher.scan (scanned here if omitted)
         
     Returns:
         List of medications with details
     """
+    if matches is None:
+        matches = get_matcher().scan(text)
+    
     medications = []
-    text_lower = text.lower()
     
-    # Search for medication patterns
-    for pattern in MEDICATION_PATTERNS:
-        matches = re.finditer(pattern, text_lower, re.IGNORECASE)
-        for match in matches:
-            med_name = match.group(0)
-            
-            # Find dosage near medication name
-            context_start = max(0, match.start() - 50)
-            context_end = min(len(text), match.end() + 50)
-            context = text[context_start:context_end]
-            
-            dosage = extract_dosage_from_context(context)
-            frequency = extract_frequency_from_context(context)
-            
-            medications.append({
-                "name": med_name.strip(),
-                "dosage": dosage,
-                "frequency": frequency,
-                "position": match.start()
-            })
+    for match in matches["medication"]:
+        med_name = match.group(0).lower()
+        
+        # Find dosage near medication name (or in the match itself, e.g. "Amox 500mg")
+        context_start = max(0, match.start() - 50)
+        context_end = min(len(text), match.end() + 50)
+        
+        dosage = (
+            extract_dosage_from_context(med_name)
+            or _nearest_within(matches["dosage"], match.start(), context_start, context_end)
+        )
+        frequency = _nearest_within(matches["frequency"], match.start(), context_start, context_end)
+        
+        medications.append({
+            "name": med_name.strip(),
+            "dosage": dosage,
+            "frequency": frequency,
+            "position": match.start()
+        })
     
     # Remove duplicates
     seen = set()
@@ -178,22 +306,20 @@ def extract_medications(text: str, ocr_data: List[Dict[str, Any]]) -> List[Dict[
     return unique_meds
 
 
+DOSAGE_REGEX = re.compile('|'.join(DOSAGE_PATTERNS), re.IGNORECASE)
+FREQUENCY_REGEX = re.compile('|'.join(FREQUENCY_PATTERNS), re.IGNORECASE)
+
+
 def extract_dosage_from_context(text: str) -> Optional[str]:
     """Extract dosage information from context"""
-    for pattern in DOSAGE_PATTERNS:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return match.group(0)
-    return None
+    match = DOSAGE_REGEX.search(text)
+    return match.group(0) if match else None
 
 
 def extract_frequency_from_context(text: str) -> Optional[str]:
     """Extract frequency information from context"""
-    for pattern in FREQUENCY_PATTERNS:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return match.group(0)
-    return None
+    match = FREQUENCY_REGEX.search(text)
+    return match.group(0) if match else None
 
 
 def extract_patient_info(text: str) -> Dict[str, Optional[str]]:
@@ -301,36 +427,41 @@ def extract_doctor_info(text: str) -> Dict[str, Optional[str]]:
     return doctor_info
 
 
-def extract_dates(text: str) -> List[Dict[str, Any]]:
+def extract_dates(
+    text: str,
+    matches: Optional[Dict[str, List[re.Match]]] = None
+) -> List[Dict[str, Any]]:
     """
     Extract dates from text
     
     Args:
         text: OCR text
+        matches: Result of PrescriptionMatcher.scan (scanned here if omitted)
         
     Returns:
         List of dates with context
     """
+    if matches is None:
+        matches = get_matcher().scan(text)
+    
     dates = []
     
-    for pattern in DATE_PATTERNS:
-        matches = re.finditer(pattern, text)
-        for match in matches:
-            date_str = match.group(0)
-            
-            # Try to parse the date
-            parsed_date = parse_date(date_str)
-            
-            # Get context
-            context_start = max(0, match.start() - 30)
-            context_end = min(len(text), match.end() + 30)
-            context = text[context_start:context_end]
-            
-            dates.append({
-                "date_string": date_str,
-                "parsed_date": parsed_date,
-                "context": context.strip()
-            })
+    for match in matches["date"]:
+        date_str = match.group(0)
+        
+        # Try to parse the date
+        parsed_date = parse_date(date_str)
+        
+        # Get context
+        context_start = max(0, match.start() - 30)
+        context_end = min(len(text), match.end() + 30)
+        context = text[context_start:context_end]
+        
+        dates.append({
+            "date_string": date_str,
+            "parsed_date": parsed_date,
+            "context": context.strip()
+        })
     
     return dates
 
@@ -365,51 +496,56 @@ def parse_date(date_str: str) -> Optional[str]:
     return None
 
 
-def extract_times(text: str) -> List[str]:
+def extract_times(
+    text: str,
+    matches: Optional[Dict[str, List[re.Match]]] = None
+) -> List[str]:
     """
     Extract time information
     
     Args:
         text: OCR text
+        matches: Result of PrescriptionMatcher.scan (scanned here if omitted)
         
     Returns:
         List of time strings
     """
-    times = []
+    if matches is None:
+        matches = get_matcher().scan(text)
     
-    for pattern in TIME_PATTERNS:
-        matches = re.finditer(pattern, text)
-        for match in matches:
-            times.append(match.group(0))
-    
-    return times
+    return [match.group(0) for match in matches["time"]]
 
 
-def extract_time_of_day(text: str) -> List[str]:
+def extract_time_of_day(
+    text: str,
+    matches: Optional[Dict[str, List[re.Match]]] = None
+) -> List[str]:
     """
     Extract time of day (morning, afternoon, evening, night)
     
     Args:
         text: OCR text
+        matches: Result of PrescriptionMatcher.scan (scanned here if omitted)
         
     Returns:
         List of time of day indicators
     """
-    time_of_day = []
+    if matches is None:
+        matches = get_matcher().scan(text)
+    
+    time_of_day = set()
     
     # English patterns
-    english_times = ['morning', 'afternoon', 'evening', 'night', 'bedtime']
-    for time in english_times:
-        if re.search(rf'\b{time}\b', text, re.IGNORECASE):
-            time_of_day.append(time)
+    for match in matches["time_of_day"]:
+        time_of_day.add(match.group(0).lower())
     
     # Khmer patterns
-    for khmer_time, english_time in KHMER_MEDICAL_TERMS.items():
+    for match in matches["khmer_term"]:
+        english_time = KHMER_MEDICAL_TERMS[match.group(0)]
         if english_time in ['morning', 'afternoon', 'evening', 'night']:
-            if khmer_time in text:
-                time_of_day.append(english_time)
+            time_of_day.add(english_time)
     
-    return list(set(time_of_day))
+    return list(time_of_day)
 
 
 def extract_structured_data(
@@ -430,13 +566,16 @@ def extract_structured_data(
     """
     logger.info("Extracting structured prescription data")
     
+    # One pass over the text for medications, dosages, frequencies, dates and times
+    matches = get_matcher().scan(text)
+    
     structured = {
         "patient": extract_patient_info(text),
         "doctor": extract_doctor_info(text),
-        "medications": extract_medications(text, ocr_data),
-        "dates": extract_dates(text),
-        "times": extract_times(text),
-        "time_of_day": extract_time_of_day(text),
+        "medications": extract_medications(text, ocr_data, matches),
+        "dates": extract_dates(text, matches),
+        "times": extract_times(text, matches),
+        "time_of_day": extract_time_of_day(text, matches),
         "table_detected": table_data is not None if table_data else False
     }
     
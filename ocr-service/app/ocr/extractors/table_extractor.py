@@ -4,9 +4,9 @@ Detects and extracts table structures from prescription images
 """
 import cv2
 import numpy as np
-import pytesseract
-from pytesseract import Output
 from typing import List, Dict, Any, Tuple, Optional
+from ..engines.tesseract import image_to_data
+from ...core.config import settings
 from ...core.logger import logger
 
 
@@ -29,6 +29,34 @@ class TableCell:
         return self.x <= x <= self.x + self.w and self.y <= y <= self.y + self.h
 
 
+class CellIndex:
+    """
+    Uniform grid spatial index over table cell bounding boxes
+    
+    Each cell is registered in every grid bucket it overlaps, so a point
+    lookup only checks the few cells sharing its bucket.
+    """
+    def __init__(self, cells: List[TableCell], bucket_size: Optional[int] = None):
+        if bucket_size is None:
+            # Roughly one cell per bucket
+            bucket_size = int(np.median([min(c.w, c.h) for c in cells])) if cells else 1
+        self.bucket_size = max(1, bucket_size)
+        self.buckets: Dict[Tuple[int, int], List[TableCell]] = {}
+        
+        for cell in cells:
+            for bx in range(cell.x // self.bucket_size, (cell.x + cell.w) // self.bucket_size + 1):
+                for by in range(cell.y // self.bucket_size, (cell.y + cell.h) // self.bucket_size + 1):
+                    self.buckets.setdefault((bx, by), []).append(cell)
+    
+    def find(self, x: int, y: int) -> Optional[TableCell]:
+        """Return the smallest cell containing the point, if any"""
+        candidates = self.buckets.get((x // self.bucket_size, y // self.bucket_size), [])
+        matches = [c for c in candidates if c.contains_point(x, y)]
+        if not matches:
+            return None
+        return min(matches, key=lambda c: c.w * c.h)
+
+
 def detect_table_lines(image: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     """
     Detect horizontal and vertical lines in image
@@ -190,13 +218,7 @@ def extract_text_from_cells(
                 continue
             
             # Run OCR on cell
-            custom_config = f"--oem 3 --psm 6"
-            data = pytesseract.image_to_data(
-                cell_img,
-                lang=languages,
-                output_type=Output.DICT,
-                config=custom_config
-            )
+            data = image_to_data(cell_img, lang=languages, oem=3, psm=6)
             
             # Combine text from cell
             texts = []
@@ -219,18 +241,78 @@ def extract_text_from_cells(
     return cells
 
 
+def assign_words_to_cells(
+    cells: List[TableCell],
+    words: List[Dict[str, Any]],
+    offset: Tuple[int, int] = (0, 0)
+) -> List[TableCell]:
+    """
+    Fill cells with words from a full-page OCR pass
+    
+    Each word is assigned to the cell containing its bbox center.
+    Words keep their Tesseract reading order within a cell.
+    
+    Args:
+        cells: List of TableCell objects with positions
+        words: Parsed OCR results (parse_ocr_data format) in page coordinates
+        offset: (x, y) of the table image within the page
+        
+    Returns:
+        List of cells with text and confidence filled in
+    """
+    if not cells:
+        return cells
+    
+    index = CellIndex(cells)
+    offset_x, offset_y = offset
+    cell_words: Dict[int, List[Dict[str, Any]]] = {}
+    
+    for word in words:
+        bbox = word["bbox"]
+        center_x = bbox["x"] + bbox["w"] // 2 - offset_x
+        center_y = bbox["y"] + bbox["h"] // 2 - offset_y
+        
+        cell = index.find(center_x, center_y)
+        if cell is not None:
+            cell_words.setdefault(id(cell), []).append(word)
+    
+    for cell in cells:
+        assigned = cell_words.get(id(cell))
+        if not assigned:
+            continue
+        
+        confidences = [w["confidence"] for w in assigned if w["confidence"] >= 0]
+        cell.text = ' '.join(w["text"] for w in assigned)
+        cell.confidence = sum(confidences) / len(confidences) if confidences else 0
+    
+    assigned_count = sum(1 for c in cells if c.text)
+    logger.info(f"Assigned page words to {assigned_count}/{len(cells)} cells")
+    
+    return cells
+
+
 def extract_table_structure(
     image: np.ndarray,
     languages: str = "khm+eng+fra",
-    min_cell_area: int = 1000
+    min_cell_area: int = 1000,
+    words: Optional[List[Dict[str, Any]]] = None,
+    offset: Tuple[int, int] = (0, 0),
+    reocr_confidence: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Extract complete table structure from image
     
+    When `words` from a full-page OCR pass are given, they are assigned to
+    cells directly and only empty or low-confidence cells are re-OCR'd.
+    Otherwise every cell is OCR'd separately.
+    
     Args:
         image: Input image (grayscale or binary)
         languages: OCR languages
         min_cell_area: Minimum area for valid cells
+        words: Parsed full-page OCR results in page coordinates
+        offset: (x, y) of the table image within the page
+        reocr_confidence: Re-OCR cells below this confidence (default from settings)
         
     Returns:
         Dictionary with table structure and content
@@ -265,7 +347,23 @@ def extract_table_structure(
     cells = assign_cell_positions(cells)
     
     # Extract text from cells
-    cells = extract_text_from_cells(gray, cells, languages)
+    if words is not None:
+        threshold = reocr_confidence if reocr_confidence is not None else settings.TABLE_CELL_REOCR_CONFIDENCE
+        cells = assign_words_to_cells(cells, words, offset)
+        
+        weak_cells = [c for c in cells if not c.text or c.confidence < threshold]
+        if weak_cells:
+            logger.info(f"Re-OCR of {len(weak_cells)} empty/low-confidence cells")
+            previous = {id(c): (c.text, c.confidence) for c in weak_cells}
+            extract_text_from_cells(gray, weak_cells, languages)
+            
+            # Keep the page-pass text where the cell re-OCR did worse
+            for cell in weak_cells:
+                text, confidence = previous[id(cell)]
+                if text and confidence > cell.confidence:
+                    cell.text, cell.confidence = text, confidence
+    else:
+        cells = extract_text_from_cells(gray, cells, languages)
     
     # Convert to structured format
     max_row = max(cell.row for cell in cells) + 1 if cells else 0
@@ -2,11 +2,27 @@
 Tesseract OCR Output Parser
 Converts raw Tesseract output to structured format with bounding boxes
 """
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
 from ...core.config import settings
 from ...core.logger import logger
 
 
+def _parse_confidences(values: List[Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """Convert confidences one by one, flagging values that aren't numbers"""
+    conf = np.full(len(values), -1, dtype=np.int64)
+    parsed = np.zeros(len(values), dtype=bool)
+    
+    for i, value in enumerate(values):
+        try:
+            conf[i] = int(value)
+            parsed[i] = True
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Error parsing OCR element {i}: {e}")
+    
+    return conf, parsed
+
+
 def parse_ocr_data(
     data: Dict[str, List],
     include_low_confidence: bool = True,
@@ -40,43 +56,42 @@ def parse_ocr_data(
         logger.error(f"Available keys: {list(data.keys())}")
         return results
     
-    n = len(data["text"])
-    
-    for i in range(n):
-        try:
-            text = data["text"][i].strip()
-            
-            # Skip empty text
-            if not text:
-                continue
-            
-            # Get confidence (Tesseract returns -1 for non-text elements)
-            conf = int(data["conf"][i])
-            
-            # Skip if below threshold (unless we include all)
-            if not include_low_confidence and conf < threshold and conf >= 0:
-                continue
-            
-            # Build result object
-            result = {
-                "text": text,
-                "confidence": conf,
-                "bbox": {
-                    "x": data["left"][i],
-                    "y": data["top"][i],
-                    "w": data["width"][i],
-                    "h": data["height"][i],
-                },
-                "block": data["block_num"][i],
-                "paragraph": data["par_num"][i],
-                "line": data["line_num"][i],
-                "word": data["word_num"][i],
-            }
-            
-            results.append(result)
-        except (IndexError, KeyError, ValueError) as e:
-            logger.warning(f"Error parsing OCR element {i}: {e}")
-            continue
+    # Rows past the shortest column are incomplete
+    n = min(len(data[k]) for k in required_keys)
+    texts = [str(text).strip() for text in data["text"][:n]]
+    
+    # Get confidence (Tesseract returns -1 for non-text elements)
+    try:
+        conf = np.asarray(data["conf"][:n], dtype=np.float64).astype(np.int64)
+        parsed = np.ones(n, dtype=bool)
+    except (TypeError, ValueError):
+        conf, parsed = _parse_confidences(data["conf"][:n])
+    
+    # Skip empty text and (unless we include all) results below threshold
+    keep = parsed & np.fromiter((bool(text) for text in texts), dtype=bool, count=n)
+    if not include_low_confidence:
+        keep &= (conf >= threshold) | (conf < 0)
+    
+    idx = np.flatnonzero(keep).tolist()
+    conf = conf.tolist()
+    columns = [data[k] for k in ("left", "top", "width", "height", "block_num", "par_num", "line_num", "word_num")]
+    
+    for i in idx:
+        left, top, width, height, block, paragraph, line, word = (column[i] for column in columns)
+        results.append({
+            "text": texts[i],
+            "confidence": conf[i],
+            "bbox": {
+                "x": left,
+                "y": top,
+                "w": width,
+                "h": height,
+            },
+            "block": block,
+            "paragraph": paragraph,
+            "line": line,
+            "word": word,
+        })
     
     logger.debug(f"Parsed {len(results)} text elements from {n} total elements")
     
@@ -159,3 +174,34 @@ def calculate_page_stats(results: List[Dict[str, Any]]) -> Dict[str, Any]:
         "total_blocks": len(blocks),
         "total_lines": len(lines)
     }
+
+
+def scale_bboxes(data: Any, factor: int) -> None:
+    """
+    Scale every "bbox" in OCR results in place
+    
+    Used to map coordinates from a reduced decode back to the original
+    image. Walks nested dicts/lists (tables, structured data); a bbox
+    shared by several results is scaled once.
+    
+    Args:
+        data: OCR results (dict or list)
+        factor: Scale factor
+    """
+    if factor == 1:
+        return
+    
+    seen = set()
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, dict):
+            bbox = item.get("bbox")
+            if isinstance(bbox, dict) and id(bbox) not in seen:
+                seen.add(id(bbox))
+                for key in ("x", "y", "w", "h"):
+                    if key in bbox:
+                        bbox[key] = bbox[key] * factor
+            stack.extend(v for k, v in item.items() if k != "bbox")
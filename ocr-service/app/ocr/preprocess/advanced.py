@@ -4,8 +4,18 @@ Handles poor quality images, tables, handwriting, and complex layouts
 """
 import cv2
 import numpy as np
-from typing import Tuple, List, Optional
+from typing import Any, Dict, Tuple, List, Optional
+from ...core.config import settings
 from ...core.logger import logger
+from ...utils.image import estimate_text_height
+from .plan import PreprocessingPlan
+
+# Bounds for the scale factor chosen from measured text height. Upscaling
+# stops at the old fixed 2x until OCR accuracy beyond it has been measured
+# (scripts/benchmark_upscale.py --ocr): tiny text would otherwise be
+# enlarged ~3x, quadrupling the pixels Tesseract reads
+MIN_SCALE_FACTOR = 0.25
+MAX_SCALE_FACTOR = 2.0
 
 
 def enhance_contrast_clahe(image: np.ndarray) -> np.ndarray:
@@ -83,58 +93,149 @@ def remove_noise_advanced(image: np.ndarray) -> np.ndarray:
     return opened
 
 
-def deskew_image_advanced(image: np.ndarray) -> Tuple[np.ndarray, float]:
+def _projection_score(xs: np.ndarray, ys: np.ndarray, angle: float) -> float:
+    """Sharpness of the row profile of foreground points projected at angle"""
+    theta = np.radians(angle)
+    projected = ys * np.cos(theta) - xs * np.sin(theta)
+    profile = np.bincount((projected - projected.min()).astype(np.int32))
+    return float(np.dot(profile, profile))
+
+
+def estimate_skew_angle(
+    image: np.ndarray,
+    max_angle: float = 45.0,
+    max_side: int = 1024,
+    coarse_step: float = 1.0,
+    fine_step: float = 0.05,
+    max_points: int = 40000
+) -> float:
     """
-    Advanced deskewing using projection profile
-    Better for tables and structured documents
+    Estimate document skew with a coarse-to-fine projection profile search
+    
+    Works on a downsampled binary copy: foreground points are projected onto
+    rotated rows and the angle giving the sharpest row profile (text lines
+    and ruled lines collapse into peaks) wins. A coarse sweep over
+    +/-max_angle is refined in a narrow window around the best coarse angle.
+    Cost is independent of the input resolution.
     
     Args:
-        image: Binary image
+        image: Grayscale or binary image (text dark on light, or the reverse)
+        max_angle: Largest skew to look for, in degrees
+        max_side: Longest side of the downsampled copy
+        coarse_step: Step of the coarse sweep, in degrees
+        fine_step: Step of the refinement, in degrees
+        max_points: Foreground points sampled for the projection
         
     Returns:
-        Tuple of (deskewed image, angle in degrees)
+        Skew angle in degrees; rotating by it (cv2.getRotationMatrix2D)
+        straightens the image. 0.0 if no dominant orientation was found.
     """
-    # Compute angle using Hough Line Transform
-    edges = cv2.Canny(image, 50, 150, apertureSize=3)
-    lines = cv2.HoughLinesP(edges, 1, np.pi / 180, 100, minLineLength=100, maxLineGap=10)
-    
-    if lines is None:
-        return image, 0.0
-    
-    angles = []
-    for line in lines:
-        x1, y1, x2, y2 = line[0]
-        if x2 - x1 != 0:
-            angle = np.degrees(np.arctan((y2 - y1) / (x2 - x1)))
-            if abs(angle) < 45:  # Only consider reasonable angles
-                angles.append(angle)
+    if len(image.shape) == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     
-    if not angles:
-        return image, 0.0
+    h, w = image.shape[:2]
+    scale = min(1.0, max_side / max(h, w))
+    if scale < 1.0:
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
     
-    median_angle = np.median(angles)
+    _, binary = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    # Foreground (text, lines) is the minority class
+    if cv2.countNonZero(binary) > binary.size / 2:
+        binary = cv2.bitwise_not(binary)
     
-    # Only rotate if angle is significant
-    if abs(median_angle) < 0.5:
-        return image, 0.0
+    ys, xs = np.nonzero(binary)
+    if len(xs) < 10:
+        return 0.0
+    if len(xs) > max_points:
+        keep = np.linspace(0, len(xs) - 1, max_points).astype(np.int64)
+        xs, ys = xs[keep], ys[keep]
+    xs = (xs - xs.mean()).astype(np.float32)
+    ys = (ys - ys.mean()).astype(np.float32)
+    
+    coarse_angles = np.arange(-max_angle, max_angle + coarse_step / 2, coarse_step)
+    coarse_scores = np.array([_projection_score(xs, ys, a) for a in coarse_angles])
+    best = int(np.argmax(coarse_scores))
+    
+    # Flat profile at every angle: nothing to align to
+    if coarse_scores[best] < 1.1 * np.median(coarse_scores):
+        return 0.0
+    
+    fine_angles = np.arange(
+        coarse_angles[best] - coarse_step,
+        coarse_angles[best] + coarse_step + fine_step / 2,
+        fine_step
+    )
+    fine_scores = [_projection_score(xs, ys, a) for a in fine_angles]
+    
+    return round(float(fine_angles[int(np.argmax(fine_scores))]), 2)
+
+
+def rotation_matrix(shape: Tuple[int, ...], angle: float) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """
+    Affine matrix rotating an image around its center on a grown canvas
     
-    # Rotate image
-    h, w = image.shape[:2]
+    Args:
+        shape: Image shape (height, width[, channels])
+        angle: Rotation angle in degrees
+        
+    Returns:
+        Tuple of (2x3 matrix, (new width, new height))
+    """
+    h, w = shape[:2]
     center = (w // 2, h // 2)
-    rotation_matrix = cv2.getRotationMatrix2D(center, median_angle, 1.0)
+    matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
     
     # Calculate new image size to avoid cropping
-    cos = np.abs(rotation_matrix[0, 0])
-    sin = np.abs(rotation_matrix[0, 1])
+    cos = np.abs(matrix[0, 0])
+    sin = np.abs(matrix[0, 1])
     new_w = int((h * sin) + (w * cos))
     new_h = int((h * cos) + (w * sin))
     
     # Adjust rotation matrix
-    rotation_matrix[0, 2] += (new_w / 2) - center[0]
-    rotation_matrix[1, 2] += (new_h / 2) - center[1]
+    matrix[0, 2] += (new_w / 2) - center[0]
+    matrix[1, 2] += (new_h / 2) - center[1]
+    
+    return matrix, (new_w, new_h)
+
+
+def rotate_image(image: np.ndarray, angle: float) -> np.ndarray:
+    """
+    Rotate image around its center, growing the canvas to avoid cropping
+    
+    Args:
+        image: Input image
+        angle: Rotation angle in degrees
+        
+    Returns:
+        Rotated image
+    """
+    matrix, size = rotation_matrix(image.shape, angle)
+    return cv2.warpAffine(image, matrix, size,
+                          flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+
+
+def deskew_image_advanced(
+    image: np.ndarray,
+    angle: Optional[float] = None
+) -> Tuple[np.ndarray, float]:
+    """
+    Advanced deskewing using projection profile
+    Better for tables and structured documents
+    
+    Args:
+        image: Binary image
+        angle: Known skew angle (estimated from the image if None)
+        
+    Returns:
+        Tuple of (deskewed image, angle in degrees)
+    """
+    median_angle = estimate_skew_angle(image) if angle is None else angle
+    
+    # Only rotate if angle is significant
+    if abs(median_angle) < 0.5:
+        return image, 0.0
     
-    rotated = cv2.warpAffine(image, rotation_matrix, (new_w, new_h),
-                             flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
+    rotated = rotate_image(image, median_angle)
     
     logger.info(f"Image deskewed by {median_angle:.2f} degrees")
     
@@ -211,24 +312,119 @@ def adaptive_binarization(image: np.ndarray, method: str = 'gaussian') -> np.nda
 
 def upscale_image(image: np.ndarray, scale: float = 2.0) -> np.ndarray:
     """
-    Upscale image for better OCR accuracy on small text
+    Rescale image so text ends up at a size Tesseract reads well
     
     Args:
         image: Input image
-        scale: Scale factor (2.0 = double size)
+        scale: Scale factor (2.0 = double size, 0.5 = half size)
         
     Returns:
-        Upscaled image
+        Rescaled image
     """
     height, width = image.shape[:2]
     new_dim = (int(width * scale), int(height * scale))
     
-    # Use INTER_CUBIC for upscaling (better quality)
-    upscaled = cv2.resize(image, new_dim, interpolation=cv2.INTER_CUBIC)
+    # INTER_CUBIC for upscaling (better quality), INTER_AREA for downscaling (no aliasing)
+    interpolation = cv2.INTER_CUBIC if scale > 1.0 else cv2.INTER_AREA
+    upscaled = cv2.resize(image, new_dim, interpolation=interpolation)
     
     return upscaled
 
 
+def choose_scale_factor(
+    image: np.ndarray,
+    target_text_height: Optional[int] = None,
+    max_side: int = 1600
+) -> Tuple[float, Optional[float]]:
+    """
+    Pick the scale factor that brings text to Tesseract's preferred height
+    
+    Text height is the median height of text-sized connected components on
+    a downsampled binary copy, so measuring costs the same for any input
+    size. Large text yields a factor below 1 (downscale), which cuts the
+    pixels Tesseract has to process.
+    
+    Args:
+        image: Input image (BGR or grayscale)
+        target_text_height: Desired text height in pixels
+            (default: settings.OCR_TARGET_TEXT_HEIGHT)
+        max_side: Longest side of the copy the measurement runs on
+        
+    Returns:
+        Tuple of (scale factor, measured text height or None); the factor
+        falls back to 1.5 when no text could be measured
+    """
+    target = target_text_height or settings.OCR_TARGET_TEXT_HEIGHT
+    
+    height, width = image.shape[:2]
+    ratio = min(1.0, max_side / max(height, width))
+    small = image
+    if ratio < 1.0:
+        small = cv2.resize(image, None, fx=ratio, fy=ratio, interpolation=cv2.INTER_AREA)
+    if len(small.shape) == 3:
+        small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    
+    text_height = estimate_text_height(small)
+    if text_height is None:
+        return 1.5, None
+    text_height /= ratio
+    
+    factor = float(np.clip(target / text_height, MIN_SCALE_FACTOR, MAX_SCALE_FACTOR))
+    # Resampling by a few percent only blurs the image
+    if abs(factor - 1.0) < 0.1:
+        factor = 1.0
+    
+    return round(factor, 2), round(text_height, 1)
+
+
+def prepare_shared_preprocessing(
+    image: np.ndarray,
+    remove_shadow: bool = True,
+    deskew: bool = True
+) -> Dict[str, Any]:
+    """
+    Run the steps that don't depend on the upscale factor once
+    
+    Lets several preprocessing variants of the same image (e.g. 1.5x and
+    2x upscale) share shadow removal and skew estimation instead of
+    repeating them at every scale.
+    
+    Args:
+        image: Input BGR image
+        remove_shadow: Remove shadows and lighting artifacts
+        deskew: Estimate the skew angle
+        
+    Returns:
+        Dictionary with the shadow-free grayscale image, skew angle and
+        the plan of the steps run (stage "shared")
+    """
+    plan = PreprocessingPlan()
+    
+    if len(image.shape) == 3:
+        with plan.step("grayscale", "shared", "gray"):
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    else:
+        gray = image.copy()
+    
+    if remove_shadow:
+        with plan.step("remove_shadows", "shared", "gray"):
+            gray = remove_shadows(gray)
+    
+    skew_angle = 0.0
+    if deskew:
+        # Skew is scale-independent, so estimate it once for every variant
+        with plan.step("estimate_skew", "shared", "gray") as record:
+            skew_angle = estimate_skew_angle(gray)
+            record["angle"] = skew_angle
+    
+    return {
+        "gray": gray,
+        "shadow_removed": remove_shadow,
+        "skew_angle": skew_angle,
+        "plan": plan,
+    }
+
+
 def preprocess_for_medical_ocr(
     image: np.ndarray,
     remove_shadow: bool = True,
@@ -236,7 +432,11 @@ def preprocess_for_medical_ocr(
     enhance_contrast: bool = True,
     denoise: bool = True,
     upscale: bool = True,
-    upscale_factor: float = 1.5
+    upscale_factor: Optional[float] = 1.5,
+    shared: Optional[Dict[str, Any]] = None,
+    plan: Optional[PreprocessingPlan] = None,
+    target_text_height: Optional[int] = None,
+    binarization: Optional[str] = None
 ) -> np.ndarray:
     """
     Complete preprocessing pipeline for medical prescription images
@@ -248,63 +448,116 @@ def preprocess_for_medical_ocr(
         deskew: Straighten tilted images
         enhance_contrast: Enhance contrast with CLAHE
         denoise: Remove noise while preserving text
-        upscale: Upscale image for better OCR on small text
-        upscale_factor: Scale factor for upscaling
+        upscale: Rescale image so text is near Tesseract's preferred height
+        upscale_factor: Scale factor (below 1 downscales; None chooses it
+            from the measured text height)
+        shared: Result of prepare_shared_preprocessing for this image;
+            its shadow removal and skew angle are reused instead of recomputed
+        plan: Records each step and its timing (stage "preprocess"), so
+            the OCR engine can skip what already ran
+        target_text_height: Text height automatic scaling aims for
+            (default: settings.OCR_TARGET_TEXT_HEIGHT)
+        binarization: adaptive_binarization method
+            (default: settings.OCR_BINARIZATION)
         
     Returns:
         Preprocessed image ready for OCR
     """
     logger.info("Starting advanced preprocessing for medical prescription")
+    plan = plan if plan is not None else PreprocessingPlan()
     
     # Convert to grayscale
-    if len(image.shape) == 3:
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    if shared is not None:
+        gray = shared["gray"]
+        remove_shadow = remove_shadow and not shared["shadow_removed"]
+        if "plan" in shared:
+            plan.extend(shared["plan"])
+    elif len(image.shape) == 3:
+        with plan.step("grayscale", "preprocess", "gray"):
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     else:
-        gray = image.copy()
-    
-    # Step 1: Upscale if needed (do this first for better quality)
-    if upscale and upscale_factor > 1.0:
-        gray = upscale_image(gray, upscale_factor)
-        logger.info(f"Image upscaled by {upscale_factor}x to {gray.shape}")
+        gray = image
+    
+    # Step 1: Rescale if needed (do this first for better quality)
+    if upscale and upscale_factor is None:
+        with plan.step("measure_text_height", "preprocess", "gray") as record:
+            upscale_factor, record["text_height"] = choose_scale_factor(gray, target_text_height)
+            record["factor"] = upscale_factor
+    if upscale and upscale_factor != 1.0:
+        with plan.step("rescale", "preprocess", "gray") as record:
+            gray = upscale_image(gray, upscale_factor)
+            record["factor"] = upscale_factor
+        logger.info(f"Image rescaled by {upscale_factor}x to {gray.shape}")
     
     # Step 2: Remove shadows
     if remove_shadow:
-        gray = remove_shadows(gray)
+        with plan.step("remove_shadows", "preprocess", "gray"):
+            gray = remove_shadows(gray)
         logger.info("Shadows removed")
     
     # Step 3: Enhance contrast
     if enhance_contrast:
-        gray = enhance_contrast_clahe(gray)
+        with plan.step("clahe", "preprocess", "gray"):
+            gray = enhance_contrast_clahe(gray)
         logger.info("Contrast enhanced with CLAHE")
     
     # Step 4: Denoise
     if denoise:
-        gray = remove_noise_advanced(gray)
+        with plan.step("denoise", "preprocess", "gray"):
+            gray = remove_noise_advanced(gray)
         logger.info("Noise removed with bilateral filter")
     
     # Step 5: Binarization
-    binary = adaptive_binarization(gray, method='gaussian')
+    method = binarization or settings.OCR_BINARIZATION
+    with plan.step("adaptive_threshold", "preprocess", "binary") as record:
+        binary = adaptive_binarization(gray, method=method)
+        record["method"] = method
     logger.info("Adaptive binarization applied")
     
     # Step 6: Deskew
     if deskew:
-        binary, angle = deskew_image_advanced(binary)
+        known_angle = shared["skew_angle"] if shared is not None else None
+        with plan.step("deskew", "preprocess", "binary") as record:
+            binary, angle = deskew_image_advanced(binary, angle=known_angle)
+            record["angle"] = angle
         if abs(angle) > 0.5:
             logger.info(f"Image deskewed by {angle:.2f} degrees")
     
     # Step 7: Enhance table lines (helps with table detection)
-    binary = enhance_table_lines(binary)
+    with plan.step("enhance_table_lines", "preprocess", "binary"):
+        binary = enhance_table_lines(binary)
     logger.info("Table lines enhanced")
     
     # Step 8: Morphological operations to clean up
-    kernel = np.ones((2, 2), np.uint8)
-    binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel, iterations=1)
+    with plan.step("morph_close", "preprocess", "binary"):
+        kernel = np.ones((2, 2), np.uint8)
+        binary = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, kernel, iterations=1)
     
     logger.info("Advanced preprocessing completed")
     
     return binary
 
 
+def preprocess_line_crop(gray: np.ndarray, remove_shadow: bool = True) -> np.ndarray:
+    """
+    Binarize a single text line rendered at high resolution
+    
+    The page-level steps that need page context (CLAHE tiles, deskew,
+    table line enhancement) are left out; the crop is already straight.
+    
+    Args:
+        gray: Grayscale line crop
+        remove_shadow: Remove shadows (skip if the source already had them removed)
+        
+    Returns:
+        Binary line image
+    """
+    if remove_shadow:
+        gray = remove_shadows(gray)
+    gray = remove_noise_advanced(gray)
+    return adaptive_binarization(gray, method=settings.OCR_BINARIZATION)
+
+
 def preprocess_for_table_detection(image: np.ndarray) -> np.ndarray:
     """
     Specialized preprocessing for detecting table structures
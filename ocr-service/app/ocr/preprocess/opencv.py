@@ -7,13 +7,15 @@ import numpy as np
 from typing import Optional
 from ...core.config import settings
 from ...core.logger import logger
+from .plan import PreprocessingPlan
 
 
 def preprocess_image(
     image: np.ndarray,
     denoise_strength: Optional[int] = None,
     block_size: Optional[int] = None,
-    threshold_c: Optional[int] = None
+    threshold_c: Optional[int] = None,
+    plan: Optional[PreprocessingPlan] = None
 ) -> np.ndarray:
     """
     Preprocess image for OCR
@@ -28,6 +30,7 @@ def preprocess_image(
         denoise_strength: Denoising filter strength (default from settings)
         block_size: Size of pixel neighborhood for adaptive threshold
         threshold_c: Constant subtracted from weighted mean
+        plan: Records each step and its timing (stage "preprocess")
         
     Returns:
         Preprocessed binary image
@@ -38,30 +41,35 @@ def preprocess_image(
     c = threshold_c or settings.ADAPTIVE_THRESHOLD_C
     
     logger.debug(f"Preprocessing image with: denoise={h}, block={block}, c={c}")
+    plan = plan if plan is not None else PreprocessingPlan()
     
-    # Step 1: Convert to grayscale
+    # Step 1: Convert to grayscale (images decoded as grayscale skip this)
     if len(image.shape) == 3:
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        with plan.step("grayscale", "preprocess", "gray"):
+            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     else:
-        gray = image.copy()
+        gray = image
     
     # Step 2: Denoise (light denoising to preserve details)
-    denoise = cv2.fastNlMeansDenoising(gray, h=h)
+    with plan.step("denoise", "preprocess", "gray"):
+        denoise = cv2.fastNlMeansDenoising(gray, h=h)
     
     # Step 3: Adaptive threshold (handles varying lighting conditions)
-    thresh = cv2.adaptiveThreshold(
-        denoise, 255,
-        cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-        cv2.THRESH_BINARY,
-        block, c
-    )
+    with plan.step("adaptive_threshold", "preprocess", "binary"):
+        thresh = cv2.adaptiveThreshold(
+            denoise, 255,
+            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+            cv2.THRESH_BINARY,
+            block, c
+        )
     
     return thresh
 
 
 def preprocess_for_ocr(
     image: np.ndarray,
-    apply_preprocessing: bool = True
+    apply_preprocessing: bool = True,
+    plan: Optional[PreprocessingPlan] = None
 ) -> np.ndarray:
     """
     Main preprocessing entry point
@@ -69,6 +77,7 @@ def preprocess_for_ocr(
     Args:
         image: Input image (BGR or grayscale)
         apply_preprocessing: Whether to apply preprocessing
+        plan: Records the steps applied, so the OCR engine can skip them
         
     Returns:
         Image ready for OCR
@@ -76,7 +85,7 @@ def preprocess_for_ocr(
     if not apply_preprocessing:
         return image
     
-    return preprocess_image(image)
+    return preprocess_image(image, plan=plan)
 
 
 def deskew_image(image: np.ndarray, max_angle: float = 10.0) -> np.ndarray:
@@ -0,0 +1,74 @@
+"""
+Preprocessing Plan
+Ordered record of the preprocessing steps applied to one image, shared by
+the preprocessors and the OCR engine so no step runs twice
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+# Steps whose output is a binary (0/255) image
+BINARIZING_STEPS = frozenset(["adaptive_threshold", "binarize"])
+
+
+class PreprocessingPlan:
+    """
+    Steps applied to an image, in order, with the buffer each one wrote
+
+    Preprocessors time their steps with plan.step(); later stages (the OCR
+    engine's own cleanup pass) check what already ran and record the steps
+    they skip instead of repeating them. Plain data, so it can be returned
+    from OCR executor workers.
+    """
+
+    def __init__(self, steps: Optional[List[Dict[str, Any]]] = None):
+        self.steps: List[Dict[str, Any]] = list(steps or [])
+
+    @contextmanager
+    def step(self, name: str, stage: str, buffer: str) -> Iterator[Dict[str, Any]]:
+        """
+        Time one step and record it once it completes
+
+        Args:
+            name: Operation (e.g., "denoise", "adaptive_threshold")
+            stage: Pipeline stage running it (e.g., "preprocess", "engine")
+            buffer: Buffer the step writes ("gray", "binary", ...)
+
+        Yields:
+            The step record; callers may add details (e.g., "factor")
+        """
+        record = {"step": name, "stage": stage, "buffer": buffer, "applied": True}
+        start = time.perf_counter()
+        yield record
+        record["ms"] = round((time.perf_counter() - start) * 1000, 2)
+        self.steps.append(record)
+
+    def skip(self, name: str, stage: str, reason: str) -> None:
+        """Record a step that was not run"""
+        self.steps.append({
+            "step": name,
+            "stage": stage,
+            "applied": False,
+            "reason": reason,
+            "ms": 0.0
+        })
+
+    def extend(self, other: "PreprocessingPlan") -> None:
+        """Append the steps of another plan (e.g., shared preprocessing)"""
+        self.steps.extend(dict(record) for record in other.steps)
+
+    @property
+    def binarized(self) -> bool:
+        """Whether the current image is already binary"""
+        return any(s["applied"] and s["step"] in BINARIZING_STEPS for s in self.steps)
+
+    @property
+    def total_ms(self) -> float:
+        return round(sum(s["ms"] for s in self.steps), 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable summary for API responses"""
+        return {
+            "steps": [dict(s) for s in self.steps],
+            "total_ms": self.total_ms
+        }
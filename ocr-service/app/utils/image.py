@@ -5,20 +5,56 @@ Helper functions for image loading and processing
 import cv2
 import numpy as np
 from pathlib import Path
-from typing import Union, Tuple
+from typing import Union, Tuple, Optional
 import io
+from PIL import Image
+from ..core.config import settings
 from ..core.logger import logger
 
 
-def load_image_from_path(path: Union[str, Path]) -> np.ndarray:
+# OpenCV read flags per reduction factor; for JPEG the reduced flags use
+# libjpeg DCT scaling, so the full-size image is never materialized
+COLOR_READ_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+GRAYSCALE_READ_FLAGS = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+# Reduction of the grayscale probe used to measure text height
+PROBE_REDUCTION = 2
+
+
+def read_flags(grayscale: bool = False, reduction: int = 1) -> int:
+    """OpenCV read flags for the given color mode and reduction (1, 2, 4 or 8)"""
+    return (GRAYSCALE_READ_FLAGS if grayscale else COLOR_READ_FLAGS)[reduction]
+
+
+def load_image_from_path(
+    path: Union[str, Path],
+    grayscale: bool = False,
+    reduction: int = 1
+) -> np.ndarray:
     """
     Load image from file path
     
+    Decoding from the file avoids holding the encoded bytes in memory,
+    and applies the EXIF orientation of phone photos.
+    
     Args:
         path: Path to image file
+        grayscale: Decode straight to a single-channel image (a third of
+            the memory of BGR; JPEGs skip color conversion entirely)
+        reduction: Decode at 1/reduction of the size (1, 2, 4 or 8)
         
     Returns:
-        Image as numpy array (BGR format)
+        Image as numpy array (BGR or grayscale, upright)
         
     Raises:
         FileNotFoundError: If image file doesn't exist
@@ -29,7 +65,7 @@ def load_image_from_path(path: Union[str, Path]) -> np.ndarray:
     if not path.exists():
         raise FileNotFoundError(f"Image not found: {path}")
     
-    image = cv2.imread(str(path))
+    image = cv2.imread(str(path), read_flags(grayscale, reduction))
     
     if image is None:
         raise ValueError(f"Failed to load image: {path}")
@@ -39,21 +75,27 @@ def load_image_from_path(path: Union[str, Path]) -> np.ndarray:
     return image
 
 
-def load_image_from_bytes(data: bytes) -> np.ndarray:
+def load_image_from_bytes(
+    data: bytes,
+    grayscale: bool = False,
+    reduction: int = 1
+) -> np.ndarray:
     """
     Load image from bytes
     
     Args:
         data: Image data as bytes
+        grayscale: Decode straight to a single-channel image
+        reduction: Decode at 1/reduction of the size (1, 2, 4 or 8)
         
     Returns:
-        Image as numpy array (BGR format)
+        Image as numpy array (BGR or grayscale format)
         
     Raises:
         ValueError: If image can't be decoded
     """
     nparr = np.frombuffer(data, np.uint8)
-    image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    image = cv2.imdecode(nparr, read_flags(grayscale, reduction))
     
     if image is None:
         raise ValueError("Failed to decode image from bytes")
@@ -63,6 +105,138 @@ def load_image_from_bytes(data: bytes) -> np.ndarray:
     return image
 
 
+def estimate_text_height(gray: np.ndarray) -> Optional[float]:
+    """
+    Estimate the typical text height of a document image
+    
+    Median height of text-sized connected components after adaptive
+    thresholding. Characters may merge into words at low resolution,
+    which leaves their height unchanged.
+    
+    Args:
+        gray: Grayscale image
+        
+    Returns:
+        Text height in pixels, or None if too few text-like components
+    """
+    height, width = gray.shape[:2]
+    block_size = 2 * (min(height, width) // 30) + 1
+    if block_size < 3:
+        return None
+    
+    binary = cv2.adaptiveThreshold(
+        gray, 255,
+        cv2.ADAPTIVE_THRESH_MEAN_C,
+        cv2.THRESH_BINARY_INV,
+        block_size, 10
+    )
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    
+    w = stats[1:, cv2.CC_STAT_WIDTH]
+    h = stats[1:, cv2.CC_STAT_HEIGHT]
+    # Drop specks, ruled lines and large non-text regions
+    text_like = (h >= 3) & (h <= height // 8) & (w >= 2) & (w <= 25 * h)
+    if np.count_nonzero(text_like) < 20:
+        return None
+    
+    return float(np.median(h[text_like]))
+
+
+def choose_decode_reduction(
+    text_height: Optional[float],
+    long_side: int,
+    dpi: Optional[float] = None
+) -> int:
+    """
+    Pick the largest decode reduction that keeps the image OCR-ready
+    
+    Text must stay at least DECODE_TARGET_TEXT_HEIGHT pixels tall and the
+    long side at least DECODE_MIN_SIDE. Without a text height estimate,
+    a reported DPI above DECODE_TARGET_DPI is used instead.
+    
+    Args:
+        text_height: Estimated text height at full resolution
+        long_side: Longest side at full resolution
+        dpi: Reported image DPI
+        
+    Returns:
+        Reduction factor (1, 2, 4 or 8)
+    """
+    if text_height is not None:
+        limit = text_height / settings.DECODE_TARGET_TEXT_HEIGHT
+    elif dpi:
+        limit = dpi / settings.DECODE_TARGET_DPI
+    else:
+        return 1
+    
+    for reduction in (8, 4, 2):
+        if reduction <= limit and long_side / reduction >= settings.DECODE_MIN_SIDE:
+            return reduction
+    return 1
+
+
+def load_image_for_ocr(
+    source: Union[str, Path, bytes],
+    grayscale: bool = False
+) -> Tuple[np.ndarray, int]:
+    """
+    Load an image at the working resolution OCR needs
+    
+    With IMAGE_DECODE_MODE "reduced", large JPEGs (phone photos) whose
+    text is much taller than OCR needs are decoded directly at 1/2, 1/4
+    or 1/8 scale. The decision comes from a grayscale probe decoded at
+    1/2 scale, which becomes the working image whenever a grayscale
+    image is wanted and a reduction applies. Other images are decoded
+    at full size.
+    
+    Args:
+        source: Image file path or encoded bytes
+        grayscale: Decode to a single-channel image
+        
+    Returns:
+        Tuple of (image, reduction); coordinates on the image map back
+        to the original by multiplying with reduction
+    """
+    def load(gray: bool, reduction: int) -> np.ndarray:
+        if isinstance(source, bytes):
+            return load_image_from_bytes(source, gray, reduction)
+        return load_image_from_path(source, gray, reduction)
+    
+    if settings.IMAGE_DECODE_MODE != "reduced":
+        return load(grayscale, 1), 1
+    
+    try:
+        with Image.open(io.BytesIO(source) if isinstance(source, bytes) else source) as header:
+            image_format = header.format
+            long_side = max(header.size)
+            dpi = header.info.get("dpi")
+    except Exception:
+        # Let OpenCV report unreadable files
+        return load(grayscale, 1), 1
+    
+    # DCT scaling only exists for JPEG, and small images can't be reduced
+    if image_format != "JPEG" or long_side / 2 < settings.DECODE_MIN_SIDE:
+        return load(grayscale, 1), 1
+    
+    # One grayscale decode at 1/2 scale serves both as the probe and, when
+    # the image can be reduced, as the working image
+    probe = load(True, PROBE_REDUCTION)
+    small = cv2.resize(probe, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+    text_height = estimate_text_height(small)
+    if text_height is not None:
+        text_height *= PROBE_REDUCTION * 2
+    
+    reduction = choose_decode_reduction(text_height, long_side, float(dpi[0]) if dpi else None)
+    logger.info(f"Decode reduction {reduction}x (text height: {text_height or 'unknown'}px)")
+    
+    if reduction < PROBE_REDUCTION or not grayscale:
+        return load(grayscale, reduction), reduction
+    if reduction > PROBE_REDUCTION:
+        factor = PROBE_REDUCTION / reduction
+        probe = cv2.resize(probe, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+    return probe, reduction
+
+
 def save_image(image: np.ndarray, path: Union[str, Path]) -> bool:
     """
     Save image to file
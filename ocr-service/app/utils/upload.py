@@ -0,0 +1,95 @@
+"""
+Upload Intake
+Copies received uploads to named files that OCR worker processes can open.
+Starlette has already buffered the whole multipart body (on disk above
+1MB) when a route runs, so oversized uploads are rejected earlier on their
+Content-Length; the limit here only catches uploads sent without one
+"""
+import os
+import hashlib
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional
+from fastapi import UploadFile
+from ..core.config import settings
+
+# Bytes read from the upload per await
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Allowance for multipart boundaries and form fields on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the size limit"""
+
+    def __init__(self, size: int, max_bytes: int):
+        self.size = size
+        self.max_bytes = max_bytes
+        super().__init__(f"File too large. Max: {max_bytes / (1024 * 1024):.0f}MB")
+
+
+class SpooledUpload:
+    """An upload written to a temporary file"""
+
+    def __init__(self, path: Path, size: int, sha256: str):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+
+def max_upload_bytes() -> int:
+    """Largest accepted file, in bytes"""
+    return settings.MAX_FILE_SIZE_MB * 1024 * 1024
+
+
+def max_request_bytes() -> int:
+    """Largest accepted request body (file + multipart overhead), in bytes"""
+    return max_upload_bytes() + MULTIPART_OVERHEAD_BYTES
+
+
+@asynccontextmanager
+async def spool_upload(
+    file: UploadFile,
+    max_bytes: Optional[int] = None
+) -> AsyncIterator[SpooledUpload]:
+    """
+    Copy a received upload to a temporary file, hashing it on the way
+
+    The file lives in UPLOAD_DIR so OCR worker processes can open it,
+    and is deleted when the context exits.
+
+    Args:
+        file: Uploaded file
+        max_bytes: Size limit (default: MAX_FILE_SIZE_MB)
+
+    Yields:
+        SpooledUpload with path, size and SHA-256 of the contents
+
+    Raises:
+        UploadTooLargeError: As soon as more than max_bytes have been copied
+    """
+    limit = max_upload_bytes() if max_bytes is None else max_bytes
+    settings.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    suffix = Path(file.filename or "").suffix
+    fd, name = tempfile.mkstemp(prefix="upload-", suffix=suffix, dir=settings.UPLOAD_DIR)
+    path = Path(name)
+
+    try:
+        digest = hashlib.sha256()
+        size = 0
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > limit:
+                    raise UploadTooLargeError(size, limit)
+                digest.update(chunk)
+                out.write(chunk)
+
+        yield SpooledUpload(path, size, digest.hexdigest())
+    finally:
+        path.unlink(missing_ok=True)
@@ -0,0 +1,304 @@
+"""
+OCR Configuration Autotuner
+Searches Tesseract and preprocessing settings on a labelled corpus and
+writes the accuracy/latency Pareto front plus a profile the service loads
+through OCR_PROFILE.
+
+Each configuration runs the medical extraction path (advanced
+preprocessing, then enhanced OCR) on every corpus image and is scored by
+character error rate against the ground truth and by mean latency per
+image (preprocessing + OCR). Searched settings:
+
+    OCR_PSM, OCR_OEM, OCR_LANGUAGES     Tesseract page segmentation,
+                                        engine mode and language set
+    OCR_TARGET_TEXT_HEIGHT              text height the page is scaled to
+                                        (sets the upscale factor)
+    OCR_BINARIZATION                    gaussian, mean or otsu thresholding
+
+The corpus is a directory of images (.png, .jpg, .jpeg, .tif, .tiff), each
+with its ground-truth text next to it as <image stem>.txt (UTF-8).
+
+Writes to --output:
+    trials.json     every configuration evaluated, with CER and latency
+    pareto.json     the configurations no other one beats on both
+    profile.json    the fastest Pareto configuration within --cer-tolerance
+                    of the best CER; use it with OCR_PROFILE=.../profile.json
+
+Search strategies: "grid" (every combination), "random" (--trials
+samples of the grid) or "tpe" (Bayesian multi-objective search, needs
+optuna). Needs the tesseract binary with the searched languages.
+
+Usage:
+    python scripts/autotune.py --corpus data/prescriptions [--search random --trials 40]
+"""
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import itertools
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.ocr.preprocess.advanced import preprocess_for_medical_ocr  # noqa: E402
+from app.ocr.preprocess.plan import PreprocessingPlan  # noqa: E402
+from app.ocr.engines.tesseract import run_ocr, check_tesseract_installed, get_engine_version  # noqa: E402
+from app.ocr.parsers.tesseract_parser import parse_ocr_data, group_by_lines  # noqa: E402
+
+try:
+    import optuna
+except ImportError:
+    optuna = None
+
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".tif", ".tiff"}
+
+SEARCH_SPACE = {
+    "OCR_PSM": [3, 4, 6, 11],
+    "OCR_OEM": [1, 3],
+    "OCR_LANGUAGES": ["khm+eng+fra", "khm+eng", "khm"],
+    "OCR_TARGET_TEXT_HEIGHT": [20, 24, 32, 40],
+    "OCR_BINARIZATION": ["gaussian", "mean", "otsu"],
+}
+
+# Settings that only change preprocessing; configurations sharing them
+# reuse the preprocessed corpus
+PREPROCESS_KEYS = ("OCR_TARGET_TEXT_HEIGHT", "OCR_BINARIZATION")
+
+Config = Dict[str, Any]
+
+
+def load_corpus(corpus: Path) -> List[Tuple[str, np.ndarray, str]]:
+    """Load (name, grayscale image, ground truth) for every labelled image"""
+    samples = []
+    for path in sorted(corpus.iterdir()):
+        if path.suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        truth_path = path.with_suffix(".txt")
+        if not truth_path.exists():
+            print(f"skipping {path.name}: no {truth_path.name}")
+            continue
+        image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            print(f"skipping {path.name}: cannot decode")
+            continue
+        samples.append((path.name, image, truth_path.read_text(encoding="utf-8")))
+    return samples
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so layout differences don't count as errors"""
+    return " ".join(text.split())
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance between two strings"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        current = [i]
+        for j, char_b in enumerate(b, start=1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        previous = current
+    return previous[-1]
+
+
+def ocr_text(data: Dict[str, List]) -> str:
+    """Page text from Tesseract data, one line per OCR line"""
+    lines = group_by_lines(parse_ocr_data(data, include_low_confidence=True))
+    return "\n".join(" ".join(word["text"] for word in line) for line in lines)
+
+
+class Evaluator:
+    """
+    Scores configurations on the corpus
+
+    The preprocessed corpus of the last preprocessing settings is kept, so
+    trials sorted by those settings preprocess each variant once. Results
+    are memoized per configuration.
+    """
+
+    def __init__(self, samples: List[Tuple[str, np.ndarray, str]]):
+        self.samples = samples
+        self.references = [normalize_text(truth) for _, _, truth in samples]
+        self.results: Dict[Tuple, Dict[str, Any]] = {}
+        self._preprocess_key: Optional[Tuple] = None
+        self._preprocessed: List[Tuple[np.ndarray, PreprocessingPlan, float]] = []
+
+    def _preprocess(self, config: Config) -> List[Tuple[np.ndarray, PreprocessingPlan, float]]:
+        key = tuple(config[name] for name in PREPROCESS_KEYS)
+        if key != self._preprocess_key:
+            self._preprocessed = []
+            for _, image, _ in self.samples:
+                plan = PreprocessingPlan()
+                start = time.perf_counter()
+                processed = preprocess_for_medical_ocr(
+                    image,
+                    upscale_factor=None,
+                    plan=plan,
+                    target_text_height=config["OCR_TARGET_TEXT_HEIGHT"],
+                    binarization=config["OCR_BINARIZATION"]
+                )
+                self._preprocessed.append((processed, plan, (time.perf_counter() - start) * 1000))
+            self._preprocess_key = key
+        return self._preprocessed
+
+    def evaluate(self, config: Config) -> Dict[str, Any]:
+        key = tuple(config[name] for name in SEARCH_SPACE)
+        if key in self.results:
+            return self.results[key]
+
+        errors, preprocess_ms, ocr_ms = 0, 0.0, 0.0
+        for (processed, plan, prep_ms), reference in zip(self._preprocess(config), self.references):
+            start = time.perf_counter()
+            data = run_ocr(
+                processed,
+                languages=config["OCR_LANGUAGES"],
+                oem=config["OCR_OEM"],
+                psm=config["OCR_PSM"],
+                plan=PreprocessingPlan(plan.steps)
+            )
+            ocr_ms += (time.perf_counter() - start) * 1000
+            preprocess_ms += prep_ms
+            errors += edit_distance(normalize_text(ocr_text(data)), reference)
+
+        count = len(self.samples)
+        result = {
+            "config": dict(config),
+            "cer": round(errors / max(1, sum(len(r) for r in self.references)), 4),
+            "ms_per_image": round((preprocess_ms + ocr_ms) / count, 1),
+            "preprocess_ms_per_image": round(preprocess_ms / count, 1),
+            "ocr_ms_per_image": round(ocr_ms / count, 1),
+        }
+        self.results[key] = result
+        print(f"cer={result['cer']:.4f} {result['ms_per_image']:8.1f} ms/image  {format_config(config)}")
+        return result
+
+
+def format_config(config: Config) -> str:
+    return " ".join(f"{name}={config[name]}" for name in SEARCH_SPACE)
+
+
+def grid(space: Dict[str, List]) -> List[Config]:
+    """Every combination, grouped by preprocessing settings"""
+    names = list(space)
+    configs = [dict(zip(names, values)) for values in itertools.product(*space.values())]
+    return sorted(configs, key=lambda c: tuple(str(c[name]) for name in PREPROCESS_KEYS))
+
+
+def search_tpe(evaluator: Evaluator, space: Dict[str, List], trials: int, seed: int) -> None:
+    """Bayesian multi-objective search (CER, latency) with optuna's TPE sampler"""
+    study = optuna.create_study(
+        directions=["minimize", "minimize"],
+        sampler=optuna.samplers.TPESampler(seed=seed)
+    )
+
+    def objective(trial):
+        config = {name: trial.suggest_categorical(name, values) for name, values in space.items()}
+        result = evaluator.evaluate(config)
+        return result["cer"], result["ms_per_image"]
+
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study.optimize(objective, n_trials=trials)
+
+
+def pareto_front(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Results not dominated on (CER, latency), fastest first"""
+    front = []
+    for result in sorted(results, key=lambda r: (r["ms_per_image"], r["cer"])):
+        if not front or result["cer"] < front[-1]["cer"]:
+            front.append(result)
+    return front
+
+
+def recommend(front: List[Dict[str, Any]], cer_tolerance: float) -> Dict[str, Any]:
+    """Fastest Pareto configuration whose CER is within tolerance of the best"""
+    best_cer = min(r["cer"] for r in front)
+    return next(r for r in front if r["cer"] <= best_cer + cer_tolerance)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, required=True, help="Images with <stem>.txt ground truth")
+    parser.add_argument("--output", type=Path, default=Path("results/autotune"))
+    parser.add_argument("--search", choices=["grid", "random", "tpe"], default="grid")
+    parser.add_argument("--trials", type=int, default=40, help="Configurations tried by random/tpe search")
+    parser.add_argument("--cer-tolerance", type=float, default=0.01,
+                        help="CER above the best a faster recommended profile may have")
+    parser.add_argument("--seed", type=int, default=0)
+    for name, values in SEARCH_SPACE.items():
+        parser.add_argument(f"--{name.lower().replace('_', '-')}", nargs="+",
+                            type=type(values[0]), default=values, metavar="VALUE")
+    args = parser.parse_args()
+
+    if args.search == "tpe" and optuna is None:
+        sys.exit("--search tpe needs optuna (pip install optuna)")
+    logging.getLogger("ocr_service").setLevel(logging.WARNING)
+    if not check_tesseract_installed():
+        sys.exit("Tesseract is not installed")
+
+    samples = load_corpus(args.corpus)
+    if not samples:
+        sys.exit(f"No labelled images in {args.corpus}")
+    print(f"{len(samples)} labelled images")
+
+    space = {name: getattr(args, name.lower()) for name in SEARCH_SPACE}
+    evaluator = Evaluator(samples)
+
+    # The current configuration is always scored, as the reference
+    current = {name: getattr(settings, name) for name in SEARCH_SPACE}
+    baseline = evaluator.evaluate(current)
+
+    if args.search == "tpe":
+        search_tpe(evaluator, space, args.trials, args.seed)
+    else:
+        configs = grid(space)
+        if args.search == "random":
+            sampled = random.Random(args.seed).sample(configs, min(args.trials, len(configs)))
+            configs = sorted(sampled, key=configs.index)
+        for config in configs:
+            evaluator.evaluate(config)
+
+    results = list(evaluator.results.values())
+    front = pareto_front(results)
+    chosen = recommend(front, args.cer_tolerance)
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    (args.output / "trials.json").write_text(json.dumps(results, indent=2))
+    (args.output / "pareto.json").write_text(json.dumps(front, indent=2))
+    profile = {
+        "settings": chosen["config"],
+        "metrics": {k: v for k, v in chosen.items() if k != "config"},
+        "baseline": baseline,
+        "cer_tolerance": args.cer_tolerance,
+        "corpus": {"path": str(args.corpus), "images": len(samples)},
+        "engine_version": get_engine_version(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+    }
+    (args.output / "profile.json").write_text(json.dumps(profile, indent=2, ensure_ascii=False))
+
+    print(f"\nPareto front ({len(front)} of {len(results)} configurations):")
+    print(f"{'cer':>7} {'ms/image':>9}  config")
+    for result in front:
+        marker = "*" if result is chosen else " "
+        print(f"{result['cer']:7.4f} {result['ms_per_image']:9.1f} {marker} {format_config(result['config'])}")
+    print(f"\ncurrent:     cer={baseline['cer']:.4f} {baseline['ms_per_image']:.1f} ms/image")
+    print(f"recommended: cer={chosen['cer']:.4f} {chosen['ms_per_image']:.1f} ms/image")
+    print(f"profile: {args.output / 'profile.json'} (set OCR_PROFILE to load it)")
+
+
+if __name__ == "__main__":
+    main()
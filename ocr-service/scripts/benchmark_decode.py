@@ -0,0 +1,64 @@
+"""
+Reduced Decode Benchmark
+Compares full-size decoding against IMAGE_DECODE_MODE="reduced" on
+synthetic phone photos whose text is progressively more oversized
+(zoomed-in crops of a page), timing decode and the default OCR
+preprocessing (grayscale, denoise, adaptive threshold) that follows.
+
+Usage:
+    python scripts/benchmark_decode.py [--width 4000 --height 3000]
+"""
+import sys
+import time
+import random
+import argparse
+import tempfile
+from pathlib import Path
+
+import cv2
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.config import settings  # noqa: E402
+from app.ocr.preprocess.opencv import preprocess_for_ocr  # noqa: E402
+from app.utils.image import load_image_for_ocr  # noqa: E402
+from benchmark_skew import make_page  # noqa: E402
+
+
+def run(path: Path, mode: str):
+    settings.IMAGE_DECODE_MODE = mode
+    start = time.perf_counter()
+    image, reduction = load_image_for_ocr(path, grayscale=True)
+    decoded = time.perf_counter()
+    preprocess_for_ocr(image)
+    done = time.perf_counter()
+    return reduction, image.shape, (decoded - start) * 1000, (done - decoded) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--zooms", type=float, nargs="+", default=[1, 2, 3, 5])
+    args = parser.parse_args()
+
+    page = make_page(1.0, args.width, args.height, random.Random(0))
+    print(f"{args.width}x{args.height} JPEG, text ~35px at zoom 1")
+    print(f"{'zoom':>4} {'mode':<8} {'reduction':>9} {'decode ms':>10} {'preprocess ms':>14}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "photo.jpg"
+        for zoom in args.zooms:
+            h, w = int(args.height / zoom), int(args.width / zoom)
+            top, left = (args.height - h) // 2, (args.width - w) // 2
+            photo = cv2.resize(page[top:top + h, left:left + w], (args.width, args.height),
+                               interpolation=cv2.INTER_CUBIC)
+            cv2.imwrite(str(path), photo, [cv2.IMWRITE_JPEG_QUALITY, 90])
+
+            for mode in ("full", "reduced"):
+                reduction, _, decode_ms, preprocess_ms = run(path, mode)
+                print(f"{zoom:4g} {mode:<8} {reduction:9d} {decode_ms:10.0f} {preprocess_ms:14.0f}")
+
+
+if __name__ == "__main__":
+    main()
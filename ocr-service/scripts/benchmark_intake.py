@@ -0,0 +1,140 @@
+"""
+Upload Intake Memory Benchmark
+Measures peak RSS of the upload path for one large phone photo, old vs new:
+
+- buffered: API process reads the whole upload, pickles the bytes to the
+            worker, worker decodes them with cv2.imdecode
+- streamed: API process spools the upload to disk in 1MB chunks, worker
+            decodes the file with cv2.imread (EXIF orientation applied),
+            to grayscale as with preprocessing on (the default)
+
+Every side runs in a fresh subprocess and reports the growth of its peak
+RSS over its RSS after imports (Linux: the peak is reset through
+/proc/self/clear_refs first).
+
+Usage:
+    python scripts/benchmark_intake.py [--width 4000 --height 3000]
+"""
+import io
+import sys
+import pickle
+import asyncio
+import hashlib
+import argparse
+import subprocess
+import tempfile
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import UploadFile  # noqa: E402
+from app.utils.image import load_image_from_path  # noqa: E402
+from app.utils.upload import spool_upload  # noqa: E402
+
+
+def _status_mb(field: str) -> float:
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith(field + ":"):
+            return int(line.split()[1]) / 1024
+    raise RuntimeError(f"{field} not in /proc/self/status")
+
+
+def reset_peak_rss() -> float:
+    """Reset the peak RSS to the current RSS and return it (MB)"""
+    Path("/proc/self/clear_refs").write_text("5")
+    return _status_mb("VmRSS")
+
+
+def peak_rss_mb() -> float:
+    return _status_mb("VmHWM")
+
+
+# --- Sides of one request ---
+
+def buffered_api(path: Path) -> None:
+    contents = path.read_bytes()  # await file.read()
+    hashlib.sha256(contents).hexdigest()  # cache key
+    blob = pickle.dumps(((contents,), {}), protocol=pickle.HIGHEST_PROTOCOL)  # executor call
+    (path.parent / "job.pkl").write_bytes(blob)
+
+
+def buffered_worker(path: Path) -> None:
+    (contents,), _ = pickle.loads((path.parent / "job.pkl").read_bytes())
+    cv2.imdecode(np.frombuffer(contents, np.uint8), cv2.IMREAD_COLOR)
+
+
+def streamed_api(path: Path) -> None:
+    async def run():
+        with open(path, "rb") as f:
+            async with spool_upload(UploadFile(f, filename=path.name)) as upload:
+                pickle.dumps(((str(upload.path),), {}))
+    asyncio.run(run())
+
+
+def streamed_worker(path: Path) -> None:
+    load_image_from_path(path, grayscale=True)
+
+
+SIDES = {
+    "buffered_api": buffered_api,
+    "buffered_worker": buffered_worker,
+    "streamed_api": streamed_api,
+    "streamed_worker": streamed_worker,
+}
+
+
+# --- Benchmark ---
+
+def make_photo(path: Path, width: int, height: int) -> None:
+    """Write a noisy JPEG tagged with EXIF orientation 6, as phones do"""
+    from PIL import Image
+
+    rng = np.random.default_rng(0)
+    pixels = np.clip(rng.normal(200, 40, (height, width, 3)), 0, 255).astype(np.uint8)
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=92, exif=exif)
+    path.write_bytes(buffer.getvalue())
+
+
+def measure(side: str, path: Path) -> float:
+    output = subprocess.check_output(
+        [sys.executable, __file__, "--side", side, "--image", str(path)],
+        text=True
+    )
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--side", choices=SIDES, help=argparse.SUPPRESS)
+    parser.add_argument("--image", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.side:
+        baseline = reset_peak_rss()
+        SIDES[args.side](args.image)
+        print(f"{peak_rss_mb() - baseline:.1f}")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "photo.jpg"
+        make_photo(path, args.width, args.height)
+        size_mb = path.stat().st_size / (1024 * 1024)
+        print(f"{args.width}x{args.height} JPEG, {size_mb:.1f}MB upload")
+        print(f"{'intake':<10} {'api MB':>8} {'worker MB':>10} {'total MB':>9}")
+
+        for mode in ("buffered", "streamed"):
+            api = measure(f"{mode}_api", path)
+            worker = measure(f"{mode}_worker", path)
+            print(f"{mode:<10} {api:8.1f} {worker:10.1f} {api + worker:9.1f}")
+
+
+if __name__ == "__main__":
+    main()
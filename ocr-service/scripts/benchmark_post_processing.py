@@ -0,0 +1,168 @@
+"""
+Post-processing Microbenchmark
+Compares the columnar post-processing + parsing stage against the previous
+row-by-row implementation on synthetic 2,000-word pages.
+
+Usage:
+    python scripts/benchmark_post_processing.py [--words 2000] [--pages 50]
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from typing import Dict, List, Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.ocr.engines.enhanced_tesseract import post_process_ocr_results  # noqa: E402
+from app.ocr.parsers.tesseract_parser import parse_ocr_data  # noqa: E402
+
+
+# Word mix resembling a prescription page: Khmer, English, French, dosages, noise
+VOCABULARY = [
+    'Paracetamol', 'amoxicillin', 'IBUPROFEN', '500mg', 'mg', 'g', 'tablet', 'capsule',
+    'ថ្ងៃ', 'ព្រឹក', 'ល្ងាច', 'យប់', 'និង', 'សម្រាប់', 'ឈ្មោះ', 'អាយុ', 'ភេទ', 'ៈ',
+    'matin', 'soir', 'nuit', 'comprimé', 'gélule', 'Dr.', 'Patient', 'Date:', '1x3',
+    '2', '10', '12/01/2024', 'Hospital', 'Phnom', 'Penh', '|', '-', '', ' ',
+]
+
+
+# --- Previous row-by-row implementation, kept here only for comparison ---
+
+_LEGACY_KHMER_CORRECTIONS = {c: c for c in 'កខគឃងចឆជញដឋឌឍណតថទធនបផពភមយរលវសហឡអឣឤឥឦឧឪឮឯឰឲឳ឴឵ិីឹឺុូួើឿ'}
+_LEGACY_KHMER_CORRECTIONS['ៈ'] = 'ឈ'
+
+
+def _legacy_fix_khmer_ocr_errors(text: str) -> str:
+    corrected = text
+    for wrong, right in _LEGACY_KHMER_CORRECTIONS.items():
+        corrected = corrected.replace(wrong, right)
+    return corrected
+
+
+def _legacy_fix_medical_terms(text: str) -> str:
+    medical_corrections = {
+        'Paracetamol': 'Paracetamol', 'Amoxicillin': 'Amoxicillin', 'Ibuprofen': 'Ibuprofen',
+        'Metformin': 'Metformin', 'Insulin': 'Insulin', 'Glibenclamide': 'Glibenclamide',
+        'mg': 'mg', 'g': 'g', 'tablet': 'tablet', 'capsule': 'capsule',
+        'ថ្ងៃ': 'ថ្ងៃ', 'ព្រឹក': 'ព្រឹក', 'ល្ងាច': 'ល្ងាច', 'យប់': 'យប់', 'និង': 'និង', 'សម្រាប់': 'សម្រាប់',
+        'matin': 'matin', 'soir': 'soir', 'nuit': 'nuit', 'comprimé': 'comprimé', 'gélule': 'gélule',
+    }
+    corrected = text
+    for wrong, right in medical_corrections.items():
+        if text.lower() == wrong.lower():
+            corrected = right
+            break
+    return corrected
+
+
+def _legacy_is_medical_term(text: str) -> bool:
+    medical_keywords = [
+        'paracetamol', 'amoxicillin', 'ibuprofen', 'metformin', 'insulin',
+        'glibenclamide', 'mg', 'tablet', 'capsule', 'dose', ' dosage',
+        'ថ្ងៃ', 'ព្រឹក', 'ល្ងាច', 'យប់',
+        'matin', 'soir', 'nuit', 'comprimé', 'gélule'
+    ]
+    text_lower = text.lower()
+    return any(keyword in text_lower for keyword in medical_keywords)
+
+
+def legacy_post_process(data: Dict[str, List]) -> Dict[str, List]:
+    keys = ['text', 'conf', 'left', 'top', 'width', 'height', 'block_num', 'par_num', 'line_num', 'word_num']
+    improved = {k: [] for k in keys}
+    for i in range(len(data['text'])):
+        text = data['text'][i]
+        conf = data['conf'][i]
+        if not text or not text.strip() or conf < 20:
+            continue
+        text = _legacy_fix_medical_terms(_legacy_fix_khmer_ocr_errors(text.strip()))
+        if _legacy_is_medical_term(text):
+            conf = min(conf + 15, 100)
+        if conf >= 30 and text:
+            improved['text'].append(text)
+            improved['conf'].append(conf)
+            for k in keys[2:]:
+                improved[k].append(data[k][i])
+    return improved
+
+
+def legacy_parse(data: Dict[str, List]) -> List[Dict[str, Any]]:
+    results = []
+    for i in range(len(data["text"])):
+        text = data["text"][i].strip()
+        if not text:
+            continue
+        results.append({
+            "text": text,
+            "confidence": int(data["conf"][i]),
+            "bbox": {"x": data["left"][i], "y": data["top"][i], "w": data["width"][i], "h": data["height"][i]},
+            "block": data["block_num"][i],
+            "paragraph": data["par_num"][i],
+            "line": data["line_num"][i],
+            "word": data["word_num"][i],
+        })
+    return results
+
+
+# --- Benchmark ---
+
+def make_page(words: int, rng: random.Random) -> Dict[str, List]:
+    """Build a synthetic pytesseract Output.DICT page"""
+    page = {k: [] for k in ['level', 'page_num', 'block_num', 'par_num', 'line_num', 'word_num',
+                            'left', 'top', 'width', 'height', 'conf', 'text']}
+    for i in range(words):
+        text = rng.choice(VOCABULARY)
+        page['level'].append(5)
+        page['page_num'].append(1)
+        page['block_num'].append(i // 200 + 1)
+        page['par_num'].append(1)
+        page['line_num'].append(i // 10 + 1)
+        page['word_num'].append(i % 10 + 1)
+        page['left'].append((i % 10) * 120)
+        page['top'].append((i // 10) * 40)
+        page['width'].append(rng.randint(20, 110))
+        page['height'].append(rng.randint(20, 35))
+        page['conf'].append(-1 if not text.strip() else rng.randint(0, 100))
+        page['text'].append(text)
+    return page
+
+
+def time_stage(stage, pages: List[Dict[str, List]]) -> float:
+    start = time.perf_counter()
+    for page in pages:
+        stage(page)
+    return (time.perf_counter() - start) / len(pages) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=2000, help="Words per page")
+    parser.add_argument("--pages", type=int, default=50, help="Pages to time")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pages = [make_page(args.words, rng) for _ in range(args.pages)]
+
+    def legacy(page):
+        return legacy_parse(legacy_post_process(page))
+
+    def columnar(page):
+        return parse_ocr_data(post_process_ocr_results(page))
+
+    # Both stages must produce identical output
+    for page in pages:
+        assert legacy(page) == columnar(page), "columnar output differs from legacy output"
+
+    legacy_ms = time_stage(legacy, pages)
+    columnar_ms = time_stage(columnar, pages)
+
+    print(f"{args.pages} pages x {args.words} words")
+    print(f"  row-by-row: {legacy_ms:8.2f} ms/page")
+    print(f"  columnar:   {columnar_ms:8.2f} ms/page")
+    print(f"  speedup:    {legacy_ms / columnar_ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
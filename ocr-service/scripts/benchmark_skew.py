@@ -0,0 +1,121 @@
+"""
+Skew Estimation Benchmark
+Compares the coarse-to-fine projection estimator against the previous
+full-resolution estimators on synthetic skewed pages:
+
+- hough:        Canny + HoughLinesP median angle (ocr-service deskew_image_advanced,
+                ocr-service-anti QualityAnalyzer._detect_skew_angle)
+- min_area:     cv2.minAreaRect over all foreground pixels
+                (tesserract-ocr-service-version-1 preprocess.deskew)
+- coarse2fine:  estimate_skew_angle (shared by all three services)
+
+Angles are reported in the correction convention: rotating by the estimate
+straightens the page.
+
+Usage:
+    python scripts/benchmark_skew.py [--width 4000 --height 3000] [--pages 12]
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.ocr.preprocess.advanced import estimate_skew_angle  # noqa: E402
+
+
+# --- Previous estimators, kept here only for comparison ---
+
+def hough_skew(gray: np.ndarray) -> float:
+    edges = cv2.Canny(gray, 50, 150, apertureSize=3)
+    lines = cv2.HoughLinesP(edges, 1, np.pi / 180, 100, minLineLength=100, maxLineGap=10)
+    if lines is None:
+        return 0.0
+    angles = []
+    for x1, y1, x2, y2 in lines.reshape(-1, 4):
+        if x2 - x1 != 0:
+            angle = np.degrees(np.arctan((y2 - y1) / (x2 - x1)))
+            if abs(angle) < 45:
+                angles.append(angle)
+    return float(np.median(angles)) if angles else 0.0
+
+
+def min_area_skew(gray: np.ndarray) -> float:
+    binary = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 15, 3)
+    coords = cv2.findNonZero(cv2.bitwise_not(binary))
+    if coords is None or len(coords) < 10:
+        return 0.0
+    angle = cv2.minAreaRect(coords)[-1]
+    angle = -(90 + angle) if angle < -45 else -angle
+    return float(angle)
+
+
+ESTIMATORS = {
+    "hough": hough_skew,
+    "min_area": min_area_skew,
+    "coarse2fine": estimate_skew_angle,
+}
+
+
+# --- Benchmark ---
+
+def make_page(angle: float, width: int, height: int, rng: random.Random) -> np.ndarray:
+    """Render a page of text lines with a ruled table, rotated by -angle"""
+    img = np.full((height, width), 235, np.uint8)
+    scale = width / 4000
+    line_gap = int(70 * scale)
+
+    for i in range(int(height * 0.85) // line_gap):
+        y = int(150 * scale) + i * line_gap
+        x = int(200 * scale)
+        while x < width - int(600 * scale):
+            word = ''.join(rng.choice('abcdefghkmnpqrstuvwxyz0123456789') for _ in range(rng.randint(2, 9)))
+            cv2.putText(img, word, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 1.6 * scale, 20, max(1, int(3 * scale)))
+            x += int((len(word) * 38 + 40) * scale)
+
+    # A ruled box like a prescription table
+    cv2.rectangle(img, (int(width * 0.1), int(height * 0.55)), (int(width * 0.9), int(height * 0.8)), 20, 3)
+
+    # Uneven lighting + sensor noise, as in phone photos
+    gradient = np.linspace(0, 40, width, dtype=np.float32)[None, :]
+    noise = np.random.default_rng(rng.randint(0, 1 << 30)).normal(0, 6, (height, width))
+    img = np.clip(img.astype(np.float32) - gradient + noise, 0, 255).astype(np.uint8)
+
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), -angle, 1.0)
+    return cv2.warpAffine(img, matrix, (width, height), borderValue=200)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--width", type=int, default=4000)
+    parser.add_argument("--height", type=int, default=3000)
+    parser.add_argument("--pages", type=int, default=12)
+    parser.add_argument("--max-angle", type=float, default=10.0, help="Largest synthetic skew")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    angles = [round(rng.uniform(-args.max_angle, args.max_angle), 2) for _ in range(args.pages)]
+    pages = [make_page(angle, args.width, args.height, rng) for angle in angles]
+
+    print(f"{args.pages} pages, {args.width}x{args.height}, skew in +/-{args.max_angle} deg")
+    print(f"{'estimator':<12} {'ms/page':>9} {'mean err':>9} {'max err':>8} {'>0.5 deg':>9}")
+
+    for name, estimate in ESTIMATORS.items():
+        errors = []
+        start = time.perf_counter()
+        for angle, page in zip(angles, pages):
+            errors.append(abs(estimate(page) - angle))
+        elapsed = (time.perf_counter() - start) / len(pages) * 1000
+
+        errors = np.array(errors)
+        print(f"{name:<12} {elapsed:9.1f} {errors.mean():9.2f} {errors.max():8.2f} {int((errors > 0.5).sum()):9d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Adaptive Scale Benchmark
+Compares the fixed 1.5x upscale of medical preprocessing against the scale
+factor chosen from measured text height, on synthetic pages whose text
+ranges from small (low-res scans) to very large (close-up phone photos).
+
+Reports the measured vs rendered text height, the chosen factor, the
+pixels handed to Tesseract and preprocessing time. With --ocr (needs the
+tesseract binary) OCR time and average confidence are reported as well.
+
+Usage:
+    python scripts/benchmark_upscale.py [--heights 12 24 48 96 160] [--ocr]
+"""
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.ocr.preprocess.advanced import preprocess_for_medical_ocr, choose_scale_factor  # noqa: E402
+
+
+WORDS = ["Paracetamol", "500mg", "tablet", "Amoxicillin", "250mg", "capsule",
+         "morning", "evening", "x3", "days", "Dr.", "Patient", "12/01/2024"]
+
+
+def make_page(text_height: int, rng: random.Random, width: int = 2480) -> np.ndarray:
+    """Render a page of text lines whose capital letters are text_height px tall"""
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    scale = cv2.getFontScaleFromHeight(font, text_height, max(1, text_height // 10))
+    thickness = max(1, text_height // 10)
+    line_gap = int(text_height * 1.8)
+    lines = max(12, 1800 // line_gap)
+    height = line_gap * (lines + 2)
+
+    img = np.full((height, width), 235, np.uint8)
+    for i in range(lines):
+        x, y = text_height, line_gap * (i + 1)
+        while True:
+            word = rng.choice(WORDS)
+            (w, _), _ = cv2.getTextSize(word, font, scale, thickness)
+            if x + w > width - text_height:
+                break
+            cv2.putText(img, word, (x, y), font, scale, 20, thickness)
+            x += w + text_height
+    noise = np.random.default_rng(rng.randint(0, 1 << 30)).normal(0, 4, img.shape)
+    return np.clip(img + noise, 0, 255).astype(np.uint8)
+
+
+def run(page: np.ndarray, factor, ocr: bool):
+    start = time.perf_counter()
+    processed = preprocess_for_medical_ocr(page, upscale_factor=factor)
+    preprocess_ms = (time.perf_counter() - start) * 1000
+
+    ocr_ms, confidence = None, None
+    if ocr:
+        from app.ocr.engines.tesseract import run_ocr
+        from app.ocr.parsers.tesseract_parser import parse_ocr_data, calculate_page_stats
+        start = time.perf_counter()
+        data = run_ocr(processed, languages="eng")
+        ocr_ms = (time.perf_counter() - start) * 1000
+        confidence = calculate_page_stats(parse_ocr_data(data))["avg_confidence"]
+
+    return processed.size / 1e6, preprocess_ms, ocr_ms, confidence
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--heights", type=int, nargs="+", default=[12, 24, 48, 96, 160])
+    parser.add_argument("--ocr", action="store_true", help="Also run Tesseract")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'text px':>7} {'measured':>8} {'factor':>6} | {'mode':<6} {'MPx':>6} {'prep ms':>8}"
+          + (f" {'ocr ms':>8} {'conf':>5}" if args.ocr else ""))
+
+    for text_height in args.heights:
+        page = make_page(text_height, rng)
+        factor, measured = choose_scale_factor(page)
+        for mode, value in (("fixed", 1.5), ("auto", factor)):
+            mpx, prep_ms, ocr_ms, conf = run(page, value, args.ocr)
+            row = f"{text_height:7d} {measured or 0:8.1f} {factor:6.2f} | {mode:<6} {mpx:6.1f} {prep_ms:8.0f}"
+            if args.ocr:
+                row += f" {ocr_ms:8.0f} {conf:5.1f}"
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Tests for confidence-gated line re-OCR."""
+
+import numpy as np
+import cv2
+from unittest.mock import patch
+
+from app.ocr.extractors.line_reocr import page_transform, reocr_low_confidence_lines
+from app.ocr.preprocess.advanced import upscale_image, rotate_image
+from app.ocr.preprocess.plan import PreprocessingPlan
+
+
+def word(text: str, conf: int, x: int, line: int = 1, number: int = 1) -> dict:
+    return {
+        "text": text, "confidence": conf,
+        "bbox": {"x": x, "y": 20 * line, "w": 10 * len(text), "h": 12},
+        "block": 1, "paragraph": 1, "line": line, "word": number,
+    }
+
+
+def tesseract_data(*words) -> dict:
+    """image_to_data output for (text, conf) pairs on one line."""
+    n = len(words)
+    return {
+        "text": [t for t, _ in words], "conf": [c for _, c in words],
+        "left": [20 * i for i in range(n)], "top": [0] * n, "width": [18] * n, "height": [20] * n,
+        "block_num": [1] * n, "par_num": [1] * n, "line_num": [1] * n, "word_num": list(range(1, n + 1)),
+    }
+
+
+def reocr(words, data):
+    source = np.full((200, 400), 255, dtype=np.uint8)
+    with patch("app.ocr.extractors.line_reocr.run_ocr", return_value=data):
+        return reocr_low_confidence_lines(
+            words, source, np.eye(2, 3), source.shape, "eng",
+            confidence_threshold=60, scale=2.0, max_lines=10
+        )
+
+
+class TestMerge:
+    """Tests for merging re-read lines back into the first pass."""
+
+    def setup_method(self):
+        texts = ["Take", "one", "tablet", "after", "meals"]
+        self.weak = [word(t, 40, 60 * i, number=i + 1) for i, t in enumerate(texts)]
+        self.strong = [word("Paracetamol", 95, 0, line=2)]
+
+    def test_better_reading_replaces_line(self):
+        data = tesseract_data(("Take", 90), ("one", 92), ("tablet", 88), ("after", 91), ("meals", 90))
+
+        merged, report = reocr(self.weak + self.strong, data)
+
+        assert [w["text"] for w in merged] == ["Take", "one", "tablet", "after", "meals", "Paracetamol"]
+        assert all(w["confidence"] >= 88 for w in merged)
+        assert report["lines_reocred"] == 1
+        assert report["lines_improved"] == 1
+
+    def test_confident_fragment_does_not_drop_words(self):
+        # One confident word for a five-word line: higher mean, less text
+        merged, report = reocr(self.weak + self.strong, tesseract_data(("tablet", 96)))
+
+        assert merged == self.weak + self.strong
+        assert report["lines_improved"] == 0
+
+    def test_empty_reading_keeps_line(self):
+        merged, report = reocr(self.weak, tesseract_data())
+
+        assert merged == self.weak
+        assert report["lines_improved"] == 0
+
+
+class TestPageTransform:
+    """Tests for rebuilding the source -> processed page geometry."""
+
+    def test_transform_follows_rescale_and_deskew(self):
+        source = np.zeros((300, 500), dtype=np.uint8)
+        cv2.circle(source, (120, 210), 4, 255, -1)
+
+        plan = PreprocessingPlan()
+        with plan.step("rescale", "preprocess", "gray") as record:
+            page = upscale_image(source, 1.5)
+            record["factor"] = 1.5
+        with plan.step("deskew", "preprocess", "binary") as record:
+            page = rotate_image(page, 7.0)
+            record["angle"] = 7.0
+
+        ys, xs = np.nonzero(page > 127)
+        expected = page_transform(plan, source.shape) @ np.array([120, 210, 1.0])
+
+        assert abs(xs.mean() - expected[0]) < 1.5
+        assert abs(ys.mean() - expected[1]) < 1.5
+
+    def test_identity_without_geometry_steps(self):
+        plan = PreprocessingPlan()
+        plan.skip("deskew", "preprocess", "angle below 0.5")
+
+        assert np.allclose(page_transform(plan, (300, 500)), np.eye(2, 3))
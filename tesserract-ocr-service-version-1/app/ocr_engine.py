@@ -57,6 +57,67 @@ def detect_language_hint(text: str) -> Language:
         return Language.ENGLISH_FRENCH
 
 
+# Languages each Tesseract OSD script needs.
+# Khmer prescriptions embed Latin drug names, so Khmer keeps English.
+SCRIPT_LANGUAGES = {
+    "Khmer": ("khm", "eng"),
+    "Latin": ("eng", "fra"),
+}
+
+
+def detect_script_languages(
+    img: np.ndarray,
+    lang: str = "eng+khm+fra",
+    min_confidence: float = 2.0,
+    text_height: int = 20,
+    min_components: int = 12
+) -> Tuple[str, str]:
+    """
+    Script pre-pass: choose the smallest language set for a region.
+    
+    Runs Tesseract OSD on a copy downsampled so text is about text_height
+    pixels tall, before any recognition. Only a confident Khmer or Latin
+    answer narrows `lang`; small regions (fewer than min_components
+    glyphs), OSD errors and unsure answers keep it whole.
+    
+    Returns:
+        (script, lang) where script is "Khmer", "Latin" or "Mixed"
+    """
+    # Deliberate copy of ScriptDetector._decide in ocr-service-anti
+    # (app/ocr/script.py); the services share no code. Keep the glyph
+    # filter, OSD config and thresholds in step with it.
+    if img.size == 0:
+        return "Mixed", lang
+    
+    gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    heights = stats[1:, cv2.CC_STAT_HEIGHT]
+    heights = heights[(stats[1:, cv2.CC_STAT_AREA] >= 4) & (heights >= 3) & (heights < 0.9 * gray.shape[0])]
+    if len(heights) < min_components:
+        return "Mixed", lang
+    
+    factor = text_height / float(np.median(heights))
+    if factor < 1.0:
+        gray = cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA)
+    
+    try:
+        osd = pytesseract.image_to_osd(
+            gray,
+            config="--psm 0 -c min_characters_to_try=10",
+            output_type=pytesseract.Output.DICT
+        )
+    except pytesseract.TesseractError:
+        return "Mixed", lang
+    
+    script = osd.get("script", "")
+    if script not in SCRIPT_LANGUAGES or float(osd.get("script_conf", 0)) < min_confidence:
+        return "Mixed", lang
+    
+    needed = [code for code in lang.split("+") if code in SCRIPT_LANGUAGES[script]]
+    return script, "+".join(needed) if needed else lang
+
+
 def has_khmer(text: str) -> bool:
     """Check if text contains Khmer characters."""
     return any(KHMER_START <= ord(c) <= KHMER_END for c in text)
@@ -139,34 +200,6 @@ def ocr_with_confidence(img: np.ndarray, lang: str = "eng+khm+fra", psm: int = 6
         return {"text": "", "confidence": 0, "words": [], "word_count": 0, "error": str(e)}
 
 
-def ocr_multi_pass(img: np.ndarray) -> Dict:
-    """
-    Multi-pass OCR strategy for mixed-language prescriptions.
-    First pass detects language, second pass optimizes for detected language.
-    """
-    # First pass: quick scan with all languages
-    initial = ocr(img, lang="eng+khm+fra", psm=6)
-    
-    # Detect primary language
-    detected_lang = detect_language_hint(initial)
-    
-    # Second pass: optimized for detected language
-    if detected_lang == Language.KHMER:
-        # Khmer-optimized settings
-        optimized = ocr(img, lang="khm+eng", psm=6)
-    elif detected_lang == Language.ENGLISH_FRENCH:
-        # Latin script optimization
-        optimized = ocr(img, lang="eng+fra", psm=6)
-    else:
-        optimized = initial
-    
-    return {
-        "text": optimized,
-        "detected_language": detected_lang.value,
-        "initial_text": initial
-    }
-
-
 def ocr_region(img: np.ndarray, box: Tuple[int, int, int, int], lang: str = "eng+khm+fra") -> Dict:
     """
     OCR a specific region of the image.
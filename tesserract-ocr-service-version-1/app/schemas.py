@@ -46,6 +46,7 @@ class TextBlock(BaseModel):
     region_type: RegionType = RegionType.BODY
     bounding_box: Optional[BoundingBox] = None
     detected_language: Optional[LanguageCode] = None
+    ocr_languages: Optional[str] = Field(None, description="Tesseract languages the region was read with")
     needs_review: bool = False
 
 
@@ -69,6 +70,10 @@ class OCRResult(BaseModel):
     needs_review: bool = False
     quality_metrics: Optional[QualityMetrics] = None
     processing_time_ms: Optional[int] = None
+    language_times: Dict[str, Dict[str, int]] = Field(
+        default_factory=dict,
+        description="Per language set: regions, OCR time and script detection time in ms"
+    )
     error: Optional[str] = None
     timestamp: str = Field(default_factory=lambda: datetime.utcnow().isoformat())
 
@@ -102,7 +107,8 @@ def build_text_block(region: Dict) -> TextBlock:
 
 
 def build_output(regions: List[Dict], quality_metrics: Dict = None, 
-                 processing_time: int = None, error: str = None) -> Dict:
+                 processing_time: int = None, error: str = None,
+                 language_times: Dict = None) -> Dict:
     """
     Build structured output from pipeline results.
     
@@ -111,6 +117,7 @@ def build_output(regions: List[Dict], quality_metrics: Dict = None,
         quality_metrics: Image quality check results
         processing_time: Processing time in milliseconds
         error: Error message if any
+        language_times: Regions and OCR / script detection time per language set
         
     Returns:
         Dictionary matching OCRResult schema
@@ -149,6 +156,7 @@ def build_output(regions: List[Dict], quality_metrics: Dict = None,
                 "height": region["box"][3]
             } if region.get("box") else None,
             "detected_language": region.get("detected_language"),
+            "ocr_languages": region.get("ocr_languages"),
             "needs_review": region.get("needs_review", False)
         })
         
@@ -169,6 +177,7 @@ def build_output(regions: List[Dict], quality_metrics: Dict = None,
         "needs_review": needs_review,
         "quality_metrics": quality_metrics,
         "processing_time_ms": processing_time,
+        "language_times": language_times or {},
         "error": None,
         "timestamp": datetime.utcnow().isoformat()
     }